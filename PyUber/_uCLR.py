@@ -165,6 +165,10 @@ class UniqeTable(object):
     def __iter__(self):
         return self
 
+    def cancel(self):
+        _uniqe_table = self.UniqeTable
+        return _uniqe_table.CancelJob()
+
     def columns(self):
         _uniqe_table = self.UniqeTable
         cc = self.column_count
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+
+"""asyncio front-end for PyUber.
+
+UniqeClientHelper.ExecuteJob and the chunked row fetches are blocking .NET/COM
+calls, and the helper and its result tables may only be used from the thread
+that created them. An AsyncConnection therefore owns one dedicated worker
+thread: the connection is created on it, and every execute and fetch of its
+cursors is marshalled onto it, one call at a time:
+
+    async with await connect_async(datasource='D1D_PROD_XEUS') as conn:
+        cur = await conn.execute_async('select lot from F_LOT where rownum < 10',
+                                       wait_timeout=300)
+        async for row in cur:
+            ...
+        async for chunk in cur.chunks(5000):
+            ...
+
+Open one AsyncConnection per query that should run concurrently.
+
+If the awaiting task is cancelled or `wait_timeout` expires, the cursor is
+aborted: Cursor.cancel is queued on the connection thread, where it cancels the
+job on the Uber server once the running call returns (a call that is still
+inside ExecuteJob cannot be interrupted from Python), and every later call on
+the cursor raises OperationalError.
+
+Kept in its own module so that core.py stays importable on Python 2.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from ._compat import supress
+from .core import connect
+from .exceptions import InterfaceError, OperationalError
+
+__all__ = ['AsyncConnection', 'AsyncCursor', 'connect_async', ]
+logger = logging.getLogger(__name__)
+
+
+def _init_worker():
+    # win32com backend needs COM initialized on the thread that owns the objects
+    with supress(ImportError):
+        from pythoncom import CoInitialize
+        CoInitialize()
+
+
+class AsyncConnection(object):
+    """PyUber Connection living on its own worker thread.
+
+    Create it with `await connect_async(...)`; the arguments are those of
+    PyUber.connect.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._connect = partial(connect, *args, **kwargs)
+        self._executor = ThreadPoolExecutor(max_workers=1,
+                                            thread_name_prefix='PyUber',
+                                            initializer=_init_worker)
+        self.connection = None
+
+    async def open(self):
+        self.connection = await self.run(self._connect)
+        return self
+
+    def submit(self, func):
+        """Queue `func` on the connection thread (concurrent.futures.Future)."""
+        if self._executor is None:
+            raise InterfaceError("connection is closed")
+        return self._executor.submit(func)
+
+    async def run(self, func, wait_timeout=None, on_abort=None):
+        """Run `func` on the connection thread and await its result.
+
+        on_abort is called on the event loop thread if the wait times out or
+        the awaiting task is cancelled.
+        """
+        cf = self.submit(func)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(cf),
+                                          wait_timeout)
+        except asyncio.TimeoutError:
+            cf.cancel()
+            if on_abort is not None:
+                on_abort()
+            raise OperationalError("Uber call did not finish within %s "
+                                   "seconds" % wait_timeout)
+        except asyncio.CancelledError:
+            cf.cancel()
+            if on_abort is not None:
+                on_abort()
+            raise
+
+    async def cursor(self, datasource=None, row_factory=None, timeout=None,
+                     wait_timeout=None):
+        c = await self.run(partial(self.connection.cursor, datasource,
+                                   row_factory, timeout))
+        return AsyncCursor(self, c, wait_timeout)
+
+    async def execute_async(self, query, parameters=None, datasource=None,
+                            row_factory=None, timeout=None, wait_timeout=None,
+                            **kwargs):
+        """Coroutine equivalent of Connection.execute returning an AsyncCursor.
+
+        timeout = Uber (server side) query timeout, as for Connection.execute
+        wait_timeout = client side limit in seconds for each call (the job,
+            then every fetch); None waits indefinitely
+        """
+        c = await self.cursor(datasource, row_factory, timeout, wait_timeout)
+        logger.info("Queueing async job")
+        return await c.execute(query, parameters, **kwargs)
+
+    async def close(self):
+        """Stop the connection thread once its queued calls are done."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+
+async def connect_async(*args, **kwargs):
+    """Coroutine version of PyUber.connect returning an AsyncConnection."""
+    conn = AsyncConnection(*args, **kwargs)
+    try:
+        return await conn.open()
+    except BaseException:
+        await conn.close()
+        raise
+
+
+class AsyncCursor(object):
+    """Awaitable wrapper around a PyUber Cursor owned by an AsyncConnection.
+
+    `wait_timeout` bounds each individual call (the job, or one fetch) in
+    seconds.
+    """
+
+    def __init__(self, connection, cursor, wait_timeout=None):
+        self.connection = connection
+        self.cursor = cursor
+        self.wait_timeout = wait_timeout
+        self.aborted = False
+
+    @property
+    def description(self):
+        return self.cursor.description
+
+    @property
+    def rowcount(self):
+        return self.cursor.rowcount
+
+    @property
+    def arraysize(self):
+        return self.cursor.arraysize
+
+    async def cancel(self):
+        """Abort the cursor and cancel its job on the Uber server."""
+        self.aborted = True
+        return await self.connection.run(self.cursor.cancel)
+
+    def _abort(self):
+        # Event loop thread: the cancel itself runs on the connection thread
+        # after the call that is still running there
+        self.aborted = True
+        with supress(InterfaceError, RuntimeError):
+            self.connection.submit(self.cursor.cancel)
+
+    async def _call(self, f, *args, **kwargs):
+        if self.aborted:
+            raise OperationalError("cursor was aborted")
+        return await self.connection.run(partial(f, *args, **kwargs),
+                                         self.wait_timeout, self._abort)
+
+    async def execute(self, query, parameters=None, datasource=None,
+                      **kwargs):
+        await self._call(self.cursor.execute, query, parameters, datasource,
+                         **kwargs)
+        return self
+
+    async def executemany(self, query, parameters=None, datasource=None):
+        await self._call(self.cursor.executemany, query, parameters,
+                         datasource)
+        return self
+
+    async def fetchone(self):
+        return await self._call(self.cursor.fetchone)
+
+    async def fetchmany(self, size=None):
+        return await self._call(self.cursor.fetchmany, size)
+
+    async def fetchall(self):
+        return await self._call(self.cursor.fetchall)
+
+    async def chunks(self, size=None):
+        """Yield lists of up to `size` rows (default: cursor.arraysize)."""
+        size = size or self.cursor.arraysize
+        while True:
+            rows = await self.fetchmany(size)
+            if not rows:
+                return
+            yield rows
+
+    def __aiter__(self):
+        return self._rows()
+
+    async def _rows(self):
+        async for chunk in self.chunks(max(self.cursor.arraysize, 1000)):
+            for row in chunk:
+                yield row
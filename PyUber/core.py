@@ -7,6 +7,7 @@
 from __future__ import print_function
 
 import logging
+import time
 from functools import wraps
 from itertools import islice
 from tempfile import NamedTemporaryFile
@@ -62,6 +63,8 @@ class Cursor(object):
         self._rowstream = None
         self._make_row = None
         self._active = False
+        # timings/counters of the current query, see _submit/_rowstreamer
+        self.stats = {}
 
     # Can't use check_active() because these are supposed to return specific
     # values rather than raise Exception if no query has been issued.
@@ -99,6 +102,22 @@ class Cursor(object):
     def close(self):
         pass
 
+    def cancel(self):
+        """Ask the Uber server to cancel the job behind this cursor.
+
+        Only possible once ExecuteJob has returned the result tables; returns
+        True if every table accepted the cancellation."""
+        if self._uniqeTables is None:
+            return False
+        cancelled = True
+        for t in self._uniqeTables:
+            try:
+                cancelled = bool(t.cancel()) and cancelled
+            except (self.be.APIException, NotImplementedError) as e:
+                logger.info("CancelJob rejected: %s", e)
+                cancelled = False
+        return cancelled
+
     def setinputsizes(self, sizes):
         pass
 
@@ -142,8 +161,14 @@ class Cursor(object):
                                      self.timeout)]
 
         logger.info("ExecuteJob starting")
+        start = time.time()
         self._uniqeTables = tuple(self.helper.execute_job(job))
-        logger.info("ExecuteJob done")
+        self.stats.update(datasource=datasource, sql_bytes=len(query),
+                          tables=len(self._uniqeTables),
+                          server_seconds=time.time() - start,
+                          activate_seconds=0.0, fetch_seconds=0.0,
+                          chunks=0, rows=0)
+        logger.info("ExecuteJob done in %.2fs", self.stats['server_seconds'])
         # normally, we force synchronous activation so that we get error msg
         self._activate() if _activate else None
 
@@ -177,6 +202,7 @@ class Cursor(object):
         t = self._uniqeTables[0]
         logger.info("Activating cursor for %d IUberTables",
                     len(self._uniqeTables))
+        start = time.time()
 
         try:
             self._columncount = t.column_count
@@ -191,14 +217,25 @@ class Cursor(object):
         self._make_row = self.row_factory(self._description,
                                           self.be.apidt2pydt)
         self._active = True
+        self.stats['activate_seconds'] = time.time() - start
 
     # generator to fetch chunks from IUberTables and yield rows one-at-a-time
+    # (fetch_seconds only counts the time spent waiting on the backend)
     def _rowstreamer(self):
         self._rownumber = 0
+        stats = self.stats
         for t in self._uniqeTables:
-            for row in t:
-                self._rownumber += 1
-                yield row
+            while True:
+                start = time.time()
+                chunk = t.next_chunk()
+                stats['fetch_seconds'] += time.time() - start
+                if not chunk:
+                    break
+                stats['chunks'] += 1
+                stats['rows'] += len(chunk)
+                for row in chunk:
+                    self._rownumber += 1
+                    yield row
 
     @check_active
     def fetchone(self):
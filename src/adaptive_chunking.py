@@ -0,0 +1,171 @@
+"""
+Adaptive Token Chunking
+
+split_by_byte_size cuts the token IN (...) lists by a fixed SQL byte budget. This
+module adjusts that budget per datasource from the observed query latency:
+
+- Chunks that fail (e.g. time out) are split in half and only those halves are
+  retried; the budget for the remaining tokens is reduced.
+- Chunks slower than slow_seconds shrink the budget for the following chunks.
+- Chunks faster than fast_seconds grow the budget, merging more tokens into
+  the next query (up to max_bytes).
+- The learned budget is remembered per datasource for the next run.
+
+Settings come from the "adaptive_chunking" section of config.json; the feature is
+off unless "enabled" is true.
+
+Example:
+    >>> chunker = AdaptiveChunker('D1D_PROD_XEUS', token_names_list)
+    >>> for token_chunk in chunker:
+    ...     seconds, rows, error = run_query(token_chunk)
+    ...     chunker.report(seconds, rows, error)
+    >>> chunker.save()
+"""
+
+import json
+import os
+from collections import deque
+import file_functions as fi
+
+TOKEN_SEPARATOR = "',\n'"
+LEARNED_SIZES_FILE = 'adaptive_chunk_sizes.json'
+
+DEFAULT_SETTINGS = {
+    'enabled': False,
+    'initial_bytes': 63000,
+    'min_bytes': 2000,
+    'max_bytes': 126000,
+    'fast_seconds': 10,
+    'slow_seconds': 60,
+    'grow_factor': 1.5,
+    'max_retries': 3,
+}
+
+
+def load_settings(config_path=None):
+    """Return the adaptive_chunking settings from config.json merged over the defaults."""
+    return fi.load_config_section('adaptive_chunking', DEFAULT_SETTINGS, config_path)
+
+
+def is_enabled(config_path=None):
+    return bool(load_settings(config_path)['enabled'])
+
+
+def _learned_sizes_path():
+    return os.path.join(fi.get_app_data_dir(), LEARNED_SIZES_FILE)
+
+
+def load_learned_sizes():
+    """Load the byte budgets learned per datasource in previous runs."""
+    try:
+        with open(_learned_sizes_path(), 'r') as sizes_file:
+            return json.load(sizes_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def token_bytes(tokens):
+    """SQL byte size of tokens formatted for an IN (...) list (same measure as split_by_byte_size)."""
+    return sum(len(f"'{token}',\n") for token in tokens)
+
+
+class AdaptiveChunker:
+    """
+    Iterator over token chunks whose size follows the observed query latency.
+
+    Yields chunks in the same "',\\n'"-joined format as split_by_byte_size. After
+    each query the caller must call report() so the next chunk can be sized.
+
+    Args:
+        datasource (str): Datasource the chunks are queried against
+        tokens (list): Token names, or already-joined chunks from split_by_byte_size
+        settings (dict, optional): Overrides for the config.json settings
+    """
+
+    def __init__(self, datasource, tokens, settings=None):
+        self.datasource = datasource
+        self.settings = settings or load_settings()
+        flat_tokens = []
+        for token in tokens:
+            if token:
+                flat_tokens.extend(token.split(TOKEN_SEPARATOR))
+        self.tokens = deque(flat_tokens)
+        self.retry_queue = deque()  # (tokens, attempt) of failed chunk halves
+        learned = load_learned_sizes().get(datasource)
+        self.budget = int(learned or self.settings['initial_bytes'])
+        self.current = None
+        self.failed_tokens = []
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.current is not None:
+            raise RuntimeError("report() must be called for the previous chunk first")
+        if self.retry_queue:
+            self.current = self.retry_queue.popleft()
+        elif self.tokens:
+            chunk, size = [], 0
+            while self.tokens:
+                size += len(f"'{self.tokens[0]}',\n")
+                if chunk and size > self.budget:
+                    break
+                chunk.append(self.tokens.popleft())
+            self.current = (chunk, 0)
+        else:
+            raise StopIteration
+        return TOKEN_SEPARATOR.join(self.current[0])
+
+    def remaining(self):
+        """Number of tokens still waiting to be queried (including retries)."""
+        return len(self.tokens) + sum(len(chunk) for chunk, _ in self.retry_queue)
+
+    def report(self, seconds, rows=0, error=None):
+        """
+        Feed back the outcome of the last yielded chunk.
+
+        Args:
+            seconds (float): Query time of the chunk
+            rows (int): Rows returned
+            error (Exception, optional): Error raised by the query, if any
+
+        Returns:
+            bool: False if the chunk failed and could not be retried (its tokens are
+                  kept in failed_tokens), True otherwise
+        """
+        chunk, attempt = self.current
+        self.current = None
+        settings = self.settings
+        chunk_bytes = token_bytes(chunk)
+
+        if error is not None:
+            self.budget = max(settings['min_bytes'], min(self.budget, chunk_bytes // 2))
+            if len(chunk) > 1 and attempt < settings['max_retries']:
+                middle = len(chunk) // 2
+                # Retry only the halves of the failed chunk, before any new tokens
+                self.retry_queue.appendleft((chunk[middle:], attempt + 1))
+                self.retry_queue.appendleft((chunk[:middle], attempt + 1))
+                print(f"Chunk of {len(chunk)} tokens failed on {self.datasource}, retrying as 2 smaller chunks")
+                return True
+            self.failed_tokens.extend(chunk)
+            print(f"Giving up on {len(chunk)} tokens on {self.datasource}: {error}")
+            return False
+
+        if seconds > settings['slow_seconds']:
+            # Scale the budget so the next chunk lands near the slow limit
+            self.budget = max(settings['min_bytes'], int(chunk_bytes * settings['slow_seconds'] / seconds / 2))
+            print(f"Slow chunk ({seconds:.1f} s), reducing chunk size to {self.budget} bytes")
+        elif seconds < settings['fast_seconds'] and chunk_bytes >= self.budget * 0.9:
+            # Only grow on full-size chunks; a short tail chunk says little about capacity
+            self.budget = min(settings['max_bytes'], int(self.budget * settings['grow_factor']))
+        return True
+
+    def save(self):
+        """Remember the current budget for this datasource."""
+        sizes = load_learned_sizes()
+        sizes[self.datasource] = self.budget
+        try:
+            with open(_learned_sizes_path(), 'w') as sizes_file:
+                json.dump(sizes, sizes_file, indent=2)
+        except OSError as e:
+            print(f"Could not save learned chunk sizes: {e}")
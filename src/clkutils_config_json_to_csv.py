@@ -4,18 +4,168 @@ import os
 import sys
 import re
 import pprint
+from concurrent.futures import ProcessPoolExecutor
 import file_functions as fi
 
 '''NEED TO ADD IN NEW FEATURES FOR STACKED AND IMH, FILTER CHOICE NEEDS TO BE REVISED IN gui,  AND REMOVE ITUFF TOKEN MODIFIER SINCE IT IS BIT BASED'''
 
 
+class ClkUtilsConfig:
+    """
+    A ClkUtils config JSON parsed once, with its test-case regexes precompiled.
+    
+    matching_cases() remembers the matching test-case indices per filter name, so
+    processing many CLKUTILS tests against the same config neither re-reads the
+    JSON nor re-runs every regular expression for every test and die type.
+    field_table() and expansion() do the same for the setup x ratio x field product.
+    
+    Args:
+        config (dict): Parsed config JSON
+        path (str): File the config was read from (default output folder)
+    """
 
-def process_json_to_csv(json_file_path,filter_name=r"(.*)",place_in='',BITBASED=False,filter_choice='NOM',  ITUFF_limit=1433):
+    def __init__(self, config, path=''):
+        self.config = config
+        self.path = path
+        self.test_cases = config['ClkUtils_test_case_config']
+        self.patterns = [re.compile(case["regular_expression"][0]) for case in self.test_cases]
+        self.cbb_values = extract_setups(config["setups"]["setup"]["cbb"])
+        self.top_values = extract_setups(config["setups"]["setup"]["top"])
+        self._matches = {}
+        self._field_tables = {}
+        self._expansions = {}
+
+    def matching_cases(self, filter_name):
+        """Indices of the test cases whose regular expression matches filter_name (same as re.match)."""
+        if filter_name not in self._matches:
+            self._matches[filter_name] = [i for i, pattern in enumerate(self.patterns) if pattern.match(filter_name)]
+        return self._matches[filter_name]
+
+    def field_table(self, i):
+        """
+        Flat (stage_name, field_name, output_enable, default, stage_field) table of test case i.
+        
+        Stages without fields are left out; stage_field is the "stage---field" tail of
+        the combined_string, joined once here instead of for every setup and ratio.
+        """
+        if i not in self._field_tables:
+            table = []
+            for stage in self.test_cases[i]['ctv_sequence']:
+                stage_name = stage["stage"]
+                if stage.get('fields') is None:
+                    continue
+                for field in stage["fields"]:
+                    table.append((stage_name, field["name"], field["output_enable"], field["default"],
+                                  stage_name+'---'+field["name"]))
+            self._field_tables[i] = table
+        return self._field_tables[i]
+
+    def expansion(self, i, word_tb):
+        """
+        Setup x ratio x field expansion of test case i for one die type.
+        
+        The expansion does not depend on the test name, so it is built once and shared
+        by every test case with the same test_config_name, setup, ratios and
+        ctv_sequence. The rows themselves are generated by indexed_rows().
+        
+        Returns:
+            list: (test_config, setups, ratios, fields, big_num) groups - one per CBB key
+                  for cbb '$setup' cases, a single group otherwise. setups holds
+                  (setup_name, test_modifier) pairs, ratios the 'r_<ratio>' names and
+                  fields the field_table() of the case.
+        """
+        case = self.test_cases[i]
+        key = (json.dumps([case['test_config_name'], case['setup'], case['ratios'], case['ctv_sequence']], sort_keys=True), word_tb)
+        if key not in self._expansions:
+            self._expansions[key] = self._expand(i, word_tb)
+        return self._expansions[key]
+
+    def _expand(self, i, word_tb):
+        case = self.test_cases[i]
+        ratios = [f'r_{ratio_num}' for ratio_num in case['ratios'].split(', ')]
+        fields = self.field_table(i)
+        setup_map = self.config['setups']['setup_map']
+
+        def group(setups):
+            return (case['test_config_name'], setups, ratios, fields, len(ratios) * len(setups) * len(fields))
+
+        if case['setup'] != '$setup':
+            return [group([(setup_name, '') for setup_name in case['setup']])]
+        if word_tb == 'cbb':
+            # Each CBB key group gets its own _<mod> counter
+            return [group([(setup_map[setup_num], '_' + cbb_key) for setup_num in setup_nums])
+                    for cbb_key, setup_nums in self.cbb_values.items()]
+        if word_tb == 'top':
+            return [group([(setup_map[setup_num], '') for setup_nums in self.top_values.values() for setup_num in setup_nums])]
+        return [group([])]
+
+
+_loaded_configs = {}
+
+def load_config(json_file_path):
+    """
+    Return the ClkUtilsConfig for a config JSON, parsing the file only when it changed.
+    
+    Loaded configs are kept per path together with the file size and modification
+    time, so repeated process_json_to_csv calls share one parsed config.
+    """
     json_file_path = fi.process_file_input(json_file_path)
-    with open(json_file_path, 'r') as json_file:
-        # load() converts json to nested dictionary
-        config = json.load(json_file)
-        #Tests config nested navigation
+    stat = os.stat(json_file_path)
+    key = os.path.abspath(json_file_path)
+    loaded = _loaded_configs.get(key)
+    if loaded is None or loaded[0] != (stat.st_size, stat.st_mtime):
+        with open(json_file_path, 'r') as json_file:
+            # load() converts json to nested dictionary
+            loaded = ((stat.st_size, stat.st_mtime), ClkUtilsConfig(json.load(json_file), json_file_path))
+        _loaded_configs[key] = loaded
+    return loaded[1]
+
+
+INDEXED_FIELDNAMES = ['Index','DCM','Ratio','Test','Stage','Field','Name','Name_Index','combined_string','output_enable','default']
+
+
+def indexed_rows(groups, ITUFF, BITBASED=False, ITUFF_limit=1433):
+    """
+    Generate the indexed CSV rows (INDEXED_FIELDNAMES order) of one test case expansion.
+    
+    Every ITUFF_limit rows (unless BITBASED) the name gets the next _<mod> suffix;
+    the counter and suffix restart with every group (CBB key).
+    """
+    for test_config, setups, ratios, fields, big_num in groups:
+        #establish ITUFF limit and calculate if ITUFF_limit exceeded
+        if big_num > ITUFF_limit and not BITBASED:
+            mod = 1
+            ITUFF_MOD = f"_{mod}"
+        else:
+            mod = 0
+            ITUFF_MOD = ''
+
+        counter = 0
+        for setup_name, test_modifier in setups:
+            name_base = ITUFF + test_modifier
+            for ratio in ratios:
+                combined_base = setup_name+'---'+ratio+'---'+test_config+'---'
+                for stage_name, field_name, output_enable, default, stage_field in fields:
+                    NAME = name_base + ITUFF_MOD
+                    yield (counter, setup_name, ratio, test_config, stage_name, field_name,
+                           NAME, f"{NAME}_{counter}", combined_base + stage_field, output_enable, default)
+                    counter += 1
+                    if counter > ITUFF_limit-1 and not BITBASED:
+                        counter = 0
+                        mod += 1
+                        ITUFF_MOD = f"_{mod}"
+
+
+def write_indexed_rows(writer, groups, ITUFF, BITBASED=False, ITUFF_limit=1433):
+    """Write the indexed_rows() of one test case expansion with a csv.writer."""
+    writer.writerows(indexed_rows(groups, ITUFF, BITBASED, ITUFF_limit))
+
+
+def process_json_to_csv(json_file_path,filter_name=r"(.*)",place_in='',BITBASED=False,filter_choice='NOM',  ITUFF_limit=1433):
+    # json_file_path may also be an already loaded ClkUtilsConfig
+    clk_config = json_file_path if isinstance(json_file_path, ClkUtilsConfig) else load_config(json_file_path)
+    config = clk_config.config
+    json_file_path = clk_config.path
     if filter_name != r"(.*)":
         if filter_name.find('::') != -1:
             filter_tb = '_'+'_'.join(filter_name.split('::'))
@@ -40,22 +190,17 @@ def process_json_to_csv(json_file_path,filter_name=r"(.*)",place_in='',BITBASED=
     else:
         die_type = ['top', 'base', 'cbb', 'imh']
 
-    cbb_values = extract_setups(config["setups"]["setup"]["cbb"])
-    top_values = extract_setups(config["setups"]["setup"]["top"])
-
     indexed_files = []
     for word_tb in die_type:#this will need to change to include cbb at somepoint along with the unique setup mapping of cbb in configDMR file
         indexed_file = f'{place_in}\\clkutils_{word_tb}{filter_tb}_indexed.csv'
         indexed_file = fi.check_write_permission(indexed_file)
         with open(indexed_file, mode='w', newline='') as file:
-            fieldnames = ['Index','DCM','Ratio','Test','Stage','Field','Name','Name_Index','combined_string','output_enable','default']
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            writer.writeheader()  
+            writer = csv.writer(file)
+            writer.writerow(INDEXED_FIELDNAMES)
 
 
             # deal with regex test names in Marco's json
-            #for i in [i for i, item in enumerate(config['ClkUtils_test_case_config']) if word_tb in item["regular_expression"][0].lower() and re.match(config["ClkUtils_test_case_config"][i]["regular_expression"],filter_name)]:
-            for i in [i for i, item in enumerate(config['ClkUtils_test_case_config']) if re.match(config["ClkUtils_test_case_config"][i]["regular_expression"][0],filter_name)]:
+            for i in clk_config.matching_cases(filter_name):
                 test_config = config['ClkUtils_test_case_config'][i]['test_config_name']
                 print(test_config)
 
@@ -67,115 +212,7 @@ def process_json_to_csv(json_file_path,filter_name=r"(.*)",place_in='',BITBASED=
                     ITUFF = re.sub(r'\(MIN\|MAX\|NOM\)',filter_choice, config["ClkUtils_test_case_config"][i]["regular_expression"][0])
                     ITUFF = re.sub(r"\(?!_\((corerecovery|Profile)\)\)", "", ITUFF)
 
-                
-                #setup the setup name and ratio list before so that ITUFF_MOD can be setup early
-                setup_list=[]
-                test_modifier_list = []
-                if config['ClkUtils_test_case_config'][i]['setup'] == '$setup':
-                    if word_tb == 'cbb':
-                        # Process each CBB key group separately
-                        for cbb_key, setup_nums in cbb_values.items():
-                            for setup_num in setup_nums:
-                                setup_list.append(config['setups']['setup_map'][setup_num])
-                                test_modifier_list.append(cbb_key)
-                    elif word_tb == 'top':
-                        # For top, there's typically only one key group
-                        for top_key, setup_nums in top_values.items():
-                            for setup_num in setup_nums:
-                                setup_list.append(config['setups']['setup_map'][setup_num])
-                                test_modifier_list.append('')                        
-                else:
-                    setup_list = config["ClkUtils_test_case_config"][i]["setup"]
-                    test_modifier_list = [''] * len(setup_list)
-
-                ratio_list = config["ClkUtils_test_case_config"][i]['ratios'].split(', ')
-                
-                # For CBB, calculate big_num and reset counters for each key group
-                if word_tb == 'cbb' and config['ClkUtils_test_case_config'][i]['setup'] == '$setup':
-                    
-                    
-                    for cbb_key, setup_nums in cbb_values.items():
-                        # Calculate big_num for this specific CBB key group
-                        current_setup_count = len(setup_nums)
-                        big_num = 0
-                        for k in range(len(config["ClkUtils_test_case_config"][i]['ctv_sequence'])):
-                            if config["ClkUtils_test_case_config"][i]['ctv_sequence'][k].get('fields') is not None:
-                                big_num += len(ratio_list) * current_setup_count * len(config["ClkUtils_test_case_config"][i]['ctv_sequence'][k]["fields"])
-                        
-                        # Reset counters for each CBB key
-                        if big_num > ITUFF_limit and not BITBASED:
-                            mod = 1
-                            ITUFF_MOD = f"_{mod}"
-                        else:
-                            mod = 0
-                            ITUFF_MOD = ''
-                        
-                        counter = 0
-                        
-                        # Process only setups for this CBB key
-                        for setup_num in setup_nums:
-                            setup_name = config['setups']['setup_map'][setup_num]
-                            test_modifier = '_' + cbb_key
-                            
-                            for ratio_num in ratio_list:
-                                ratio = f'r_{ratio_num}'
-                                for k in range(len(config["ClkUtils_test_case_config"][i]['ctv_sequence'])):
-                                    stage_name = config["ClkUtils_test_case_config"][i]['ctv_sequence'][k]["stage"]
-                                    if config["ClkUtils_test_case_config"][i]['ctv_sequence'][k].get('fields') is not None:
-                                        for l in range(len(config["ClkUtils_test_case_config"][i]['ctv_sequence'][k]["fields"])):
-                                            field_name = config["ClkUtils_test_case_config"][i]['ctv_sequence'][k]["fields"][l]["name"]
-                                            output_enable = config["ClkUtils_test_case_config"][i]['ctv_sequence'][k]["fields"][l]["output_enable"]
-                                            default = config["ClkUtils_test_case_config"][i]['ctv_sequence'][k]["fields"][l]["default"]
-                                            NAME = ITUFF +test_modifier + ITUFF_MOD
-                                            combined_string = setup_name+'---'+ratio+'---'+test_config+'---'+stage_name+'---'+field_name
-                                            row_dict = {'Index': counter, 'DCM': setup_name ,'Ratio': ratio, 'Test': test_config, 'Stage': stage_name ,'Field': field_name,
-                                                        'Name': NAME, 'Name_Index': NAME+"_"+str(counter), 'combined_string':combined_string, 'output_enable': output_enable, 'default': default}
-                                            writer.writerow(row_dict) 
-                                            counter += 1
-                                            if counter > ITUFF_limit-1 and not BITBASED:
-                                                counter = 0
-                                                mod += 1
-                                                ITUFF_MOD = f"_{mod}"
-                else:
-                    # Original logic for non-CBB or non-$setup cases
-                    #establish ITUFF limit and calculate if ITUFF_limit exceeded
-                    big_num = 0
-                    for k in range(len(config["ClkUtils_test_case_config"][i]['ctv_sequence'])):
-                        if config["ClkUtils_test_case_config"][i]['ctv_sequence'][k].get('fields') is not None:
-                            big_num += len(ratio_list)*len(setup_list)*len(config["ClkUtils_test_case_config"][i]['ctv_sequence'][k]["fields"])
-                    if big_num > ITUFF_limit and not BITBASED:
-                        mod = 1
-                        ITUFF_MOD = f"_{mod}"
-                    else:
-                        mod = 0
-                        ITUFF_MOD = ''
-                    
-                    
-                    counter = 0
-                    for setup_name, test_modifier in zip(setup_list, test_modifier_list):
-                        for ratio_num in ratio_list:
-                            ratio = f'r_{ratio_num}'
-                            for k in range(len(config["ClkUtils_test_case_config"][i]['ctv_sequence'])):
-                                stage_name = config["ClkUtils_test_case_config"][i]['ctv_sequence'][k]["stage"]
-                                """if stage_name.upper()=='DFF'  and config["ClkUtils_test_case_config"][i]['ctv_sequence'][k].get('fields') is not None:
-                                    counter+=len(config["ClkUtils_test_case_config"][i]['ctv_sequence'][k]["fields"])
-                                    continue"""
-                                if config["ClkUtils_test_case_config"][i]['ctv_sequence'][k].get('fields') is not None:
-                                    for l in range(len(config["ClkUtils_test_case_config"][i]['ctv_sequence'][k]["fields"])):
-                                        field_name = config["ClkUtils_test_case_config"][i]['ctv_sequence'][k]["fields"][l]["name"]
-                                        output_enable = config["ClkUtils_test_case_config"][i]['ctv_sequence'][k]["fields"][l]["output_enable"]
-                                        default = config["ClkUtils_test_case_config"][i]['ctv_sequence'][k]["fields"][l]["default"]
-                                        #IP = setup_name+'_'+ratio
-                                        NAME = ITUFF + test_modifier+ITUFF_MOD
-                                        combined_string = setup_name+'---'+ratio+'---'+test_config+'---'+stage_name+'---'+field_name
-                                        row_dict = {'Index': counter, 'DCM': setup_name ,'Ratio': ratio, 'Test': test_config, 'Stage': stage_name ,'Field': field_name,
-                                                    'Name': NAME, 'Name_Index': NAME+"_"+str(counter), 'combined_string':combined_string, 'output_enable': output_enable, 'default': default}
-                                        writer.writerow(row_dict) 
-                                        counter += 1
-                                        if counter > ITUFF_limit-1 and not BITBASED:
-                                            counter = 0
-                                            mod += 1
-                                            ITUFF_MOD = f"_{mod}"         
+                write_indexed_rows(writer, clk_config.expansion(i, word_tb), ITUFF, BITBASED, ITUFF_limit)
         indexed_files.append(indexed_file)
         print(f"{indexed_file} is indexed!")
         if len(die_type) == 1:
@@ -183,6 +220,63 @@ def process_json_to_csv(json_file_path,filter_name=r"(.*)",place_in='',BITBASED=
             return indexed_file,tag_header_names
     return indexed_files
 
+
+def _process_test(json_file_path, test, place_in, BITBASED, filter_choice, ITUFF_limit):
+    # Runs in a pool worker process: the config is loaded once per process through load_config()
+    try:
+        return process_json_to_csv(json_file_path, test, place_in, BITBASED, filter_choice, ITUFF_limit), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def process_tests_to_csv(json_file_path, tests, place_in='', BITBASED=False, filter_choice='NOM', ITUFF_limit=1433, max_workers=None):
+    """
+    Index many CLKUTILS tests against one config in a single pass.
+    
+    The config is loaded once and the setup x ratio x stage x field expansion of
+    every test case is built once (ClkUtilsConfig.expansion) and shared by all
+    tests using it; each test then only writes its own indexed file(s), exactly as
+    process_json_to_csv would.
+    
+    Args:
+        json_file_path (str): ClkUtils config JSON path
+        tests (list): CLKUTILS test names
+        place_in (str): Output folder
+        BITBASED (bool): Bit based tokens (no _<mod> rollover)
+        filter_choice (str): MIN/NOM/MAX substitution for the "(.*)" filter
+        ITUFF_limit (int): Rows per token before the _<mod> suffix rolls over
+        max_workers (int, optional): Worker processes; None or 1 indexes in this process
+        
+    Returns:
+        dict: test name -> process_json_to_csv result, for the tests that were indexed
+              (failures are printed and left out)
+    
+    Example:
+        >>> indexed = process_tests_to_csv('configFile_DMR.json', clk_tests, 'C:/out/', True)
+        >>> indexed_file, tag_header_names = indexed[clk_tests[0]]
+    """
+    tests = list(dict.fromkeys(tests))
+    jobs = [(json_file_path, test, place_in, BITBASED, filter_choice, ITUFF_limit) for test in tests]
+    outcomes = None
+    if max_workers and max_workers > 1 and len(tests) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                outcomes = list(executor.map(_process_test, *zip(*jobs)))
+        except Exception as e:
+            print(f"Process pool unavailable ({e}), indexing the tests one by one")
+    if outcomes is None:
+        # One parsed config (and one set of expansions) for all tests
+        clk_config = json_file_path if isinstance(json_file_path, ClkUtilsConfig) else load_config(json_file_path)
+        outcomes = [_process_test(clk_config, *job[1:]) for job in jobs]
+
+    results = {}
+    for test, (result, error) in zip(tests, outcomes):
+        if error:
+            print(f"Could not index ClkUtils test {test}: {error}")
+        else:
+            results[test] = result
+    return results
+
 # Function to extract and join values from a given section
 def extract_setups(section):
     grouped_data = {}
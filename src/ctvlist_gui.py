@@ -64,29 +64,37 @@ def create_notebook(parent, **kwargs):
 # Import your existing modules
 import file_functions as fi
 import mtpl_parser as mt
-import index_ctv as ind
-import smart_json_parser as sm
-import clkutils_config_json_to_csv as clk
 import port_mismatches as pm
+import query_tuning as qt
+import query_trace as qtr
+import pipeline as pl
+import virtual_tree as vt
+import table_filter as tf
+import log_sink as ls
 
-# Import pyuber_query with fallback handling
-PYUBER_AVAILABLE = True
-try:
-    # Add the parent directory to Python path to find PyUber module
-    parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    if parent_dir not in sys.path:
-        sys.path.insert(0, parent_dir)
-    
-    import pyuber_query as py
-    print("PyUber module loaded successfully")
-except ImportError as e:
-    PYUBER_AVAILABLE = False
-    print(f"PyUber not available - some features will be disabled: {e}")
-    # Create a dummy module for fallback
-    class DummyPyUber:
-        def uber_request(self, *args, **kwargs):
-            raise ImportError("PyUber module not available")
-    py = DummyPyUber()
+# Add the parent directory to Python path to find PyUber module
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+# pyuber_query is imported on first use (load_pyuber): importing PyUber starts its CLR
+# backend and loads the Uber DLLs, which is not needed to show the window or browse an MTPL
+py = None
+PYUBER_AVAILABLE = None  # Unknown until load_pyuber() has run
+
+def load_pyuber():
+    """Import pyuber_query on first use; returns the module, or None if PyUber is not available"""
+    global py, PYUBER_AVAILABLE
+    if PYUBER_AVAILABLE is None:
+        try:
+            import pyuber_query
+            py = pyuber_query
+            PYUBER_AVAILABLE = True
+            print("PyUber module loaded successfully")
+        except ImportError as e:
+            PYUBER_AVAILABLE = False
+            print(f"PyUber not available - some features will be disabled: {e}")
+    return py
 
 class CTVListGUI:
     def __init__(self, root):
@@ -142,6 +150,8 @@ class CTVListGUI:
         self.output_folder = ""
         self.all_mtpl_items = []  # Store all items for filtering
         self.last_mtpl_path = "" # Track last MTPL file path
+        self.tp_dir = ""  # Test program directory when a whole program is loaded
+        self.tp_modules = {}  # Module name -> mtpl_parser.discover_tp_modules() entry
         self.is_dark_mode = False  # Track current theme
         self.processing = False
         
@@ -298,15 +308,17 @@ class CTVListGUI:
             self.test_list = []
             self.all_mtpl_items = []
             self.last_mtpl_path = ""
+            self.tp_dir = ""
+            self.tp_modules = {}
             
             # Clear displays
             if hasattr(self, 'material_tree'):
                 for item in self.material_tree.get_children():
                     self.material_tree.delete(item)
             
-            if hasattr(self, 'mtpl_tree'):
-                for item in self.mtpl_tree.get_children():
-                    self.mtpl_tree.delete(item)
+            if hasattr(self, 'mtpl_view'):
+                self.mtpl_view.clear()
+                self.mtpl_filter.set_index(None)
             
             # Clear log
             if hasattr(self, 'log_text'):
@@ -430,7 +442,10 @@ class CTVListGUI:
                     'delete_files': getattr(self, 'delete_files_var', tk.BooleanVar()).get(),
                     'run_jmp': getattr(self, 'run_jmp_var', tk.BooleanVar()).get(),
                     'jmp_mode': getattr(self, 'jmp_mode_var', tk.StringVar()).get(),
-                    'max_workers': getattr(self, 'max_workers_var', tk.IntVar()).get()
+                    'max_workers': getattr(self, 'max_workers_var', tk.IntVar()).get(),
+                    'query_profile': getattr(self, 'query_profile_var', tk.StringVar()).get(),
+                    'compact_stacking': getattr(self, 'compact_stacking_var', tk.BooleanVar()).get(),
+                    'summary_charts': getattr(self, 'summary_charts_var', tk.BooleanVar()).get()
                 }
             }
             import json
@@ -476,7 +491,13 @@ class CTVListGUI:
                 if hasattr(self, 'jmp_mode_var'):
                     self.jmp_mode_var.set(output_settings.get('jmp_mode', 'unified_threaded'))
                 if hasattr(self, 'max_workers_var'):
-                    self.max_workers_var.set(output_settings.get('max_workers', 3))
+                    self.max_workers_var.set(output_settings.get('max_workers', 0))
+                if hasattr(self, 'compact_stacking_var'):
+                    self.compact_stacking_var.set(output_settings.get('compact_stacking', False))
+                if hasattr(self, 'summary_charts_var'):
+                    self.summary_charts_var.set(output_settings.get('summary_charts', False))
+                if hasattr(self, 'query_profile_var'):
+                    self.query_profile_var.set(output_settings.get('query_profile', qt.load_query_tuning()['active_profile']))
                 
                 # Restore last MTPL file path if available
                 last_mtpl_path = preferences.get('last_mtpl_path', "")
@@ -797,21 +818,9 @@ class CTVListGUI:
             if not hasattr(self, 'mtpl_tree') or not self.mtpl_tree.winfo_exists():
                 return
                 
-            # Re-display current filtered items
+            # Re-display current filtered items (the view keeps the filter state)
             if hasattr(self, 'all_mtpl_items') and self.all_mtpl_items:
-                # Get current search text to maintain filter state
-                search_text = self.search_var.get().lower() if hasattr(self, 'search_var') else ""
-                
-                if not search_text:
-                    filtered_items = self.all_mtpl_items
-                else:
-                    filtered_items = []
-                    for item_data in self.all_mtpl_items:
-                        item_text = ' '.join(str(val).lower() for val in item_data['values'][1:])
-                        if search_text in item_text:
-                            filtered_items.append(item_data)
-                
-                self.display_filtered_items(filtered_items)
+                self.mtpl_view.refresh()
                 
         except Exception as e:
             print(f"Error refreshing MTPL data: {e}")
@@ -1693,6 +1702,7 @@ class CTVListGUI:
         load_btn.pack(side='left', padx=(0, 5))
         self.reload_mtpl_button = ttk.Button(button_frame, text="🔄 Reload Last", command=self.reload_mtpl_file, state='disabled')
         self.reload_mtpl_button.pack(side='left')
+        ttk.Button(button_frame, text="Load Test Program", command=self.load_test_program).pack(side='left', padx=(5, 0))
 
         
         # MTPL file info label
@@ -1767,19 +1777,17 @@ class CTVListGUI:
         self.mtpl_tree.grid(row=0, column=0, sticky='nsew')
         
         # Scrollbars with proper grid placement
-        mtpl_v_scrollbar = ttk.Scrollbar(mtpl_tree_frame, orient='vertical', command=self.mtpl_tree.yview)
+        mtpl_v_scrollbar = ttk.Scrollbar(mtpl_tree_frame, orient='vertical')
         mtpl_v_scrollbar.grid(row=0, column=1, sticky='ns')
-        self.mtpl_tree.configure(yscrollcommand=mtpl_v_scrollbar.set)
         
         mtpl_h_scrollbar = ttk.Scrollbar(mtpl_tree_frame, orient='horizontal', command=self.mtpl_tree.xview)
         mtpl_h_scrollbar.grid(row=1, column=0, sticky='ew')
         self.mtpl_tree.configure(xscrollcommand=mtpl_h_scrollbar.set)
         
-        # Add mouse wheel support for the treeview
-        def _on_treeview_mousewheel(event):
-            self.mtpl_tree.yview_scroll(int(-1*(event.delta/120)), "units")
-        
-        self.mtpl_tree.bind("<MouseWheel>", _on_treeview_mousewheel)
+        # Only the rows in view are Treeview items; the view handles the vertical scrolling
+        self.mtpl_view = vt.VirtualTreeview(self.mtpl_tree, mtpl_v_scrollbar)
+        # Search/column filters run on an index off the Tk thread once typing pauses
+        self.mtpl_filter = tf.DebouncedFilter(self.root, self.show_filtered_mtpl_rows)
         
         # Bind click events for test selection
         self.mtpl_tree.bind('<Double-1>', self.toggle_test_selection)
@@ -1997,19 +2005,16 @@ class CTVListGUI:
         self.clkutils_tree.column('Test Name', width=400, minwidth=200)
         
         # Scrollbars
-        clkutils_v_scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.clkutils_tree.yview)
+        clkutils_v_scrollbar = ttk.Scrollbar(list_frame, orient='vertical')
         clkutils_v_scrollbar.grid(row=0, column=1, sticky='ns')
-        self.clkutils_tree.configure(yscrollcommand=clkutils_v_scrollbar.set)
         
         clkutils_h_scrollbar = ttk.Scrollbar(list_frame, orient='horizontal', command=self.clkutils_tree.xview)
         clkutils_h_scrollbar.grid(row=1, column=0, sticky='ew')
         self.clkutils_tree.configure(xscrollcommand=clkutils_h_scrollbar.set)
         
-        # Add mouse wheel support for the treeview
-        def _on_clkutils_mousewheel(event):
-            self.clkutils_tree.yview_scroll(int(-1*(event.delta/120)), "units")
-        
-        self.clkutils_tree.bind("<MouseWheel>", _on_clkutils_mousewheel)
+        # Virtualized like the MTPL table, filtered on an index off the Tk thread
+        self.clkutils_view = vt.VirtualTreeview(self.clkutils_tree, clkutils_v_scrollbar)
+        self.clkutils_filter = tf.DebouncedFilter(self.root, self.show_filtered_clkutils_rows)
         
         # Bind events
         self.clkutils_tree.bind('<Button-1>', self.on_clkutils_tree_click)
@@ -2181,10 +2186,6 @@ class CTVListGUI:
     
     def update_clkutils_display(self):
         """Update the CLKUtils tests display"""
-        # Clear existing items
-        for item in self.clkutils_tree.get_children():
-            self.clkutils_tree.delete(item)
-        
         # Store all items for filtering
         self.all_clkutils_items = []
         
@@ -2197,8 +2198,12 @@ class CTVListGUI:
             }
             self.all_clkutils_items.append(item_data)
         
+        self.clkutils_view.set_items(self.all_clkutils_items)
+        self.clkutils_filter.set_index(tf.TableIndex(pd.DataFrame({'Test Name': self.clkutils_tests})))
+        
         # Apply current search filter
-        self.apply_clkutils_filter()
+        if self.clkutils_search_var.get().strip():
+            self.apply_clkutils_filter(delay_ms=0)
         
         # Update selection count
         self.update_clkutils_selection_count()
@@ -2206,36 +2211,13 @@ class CTVListGUI:
         # Configure alternating row colors
         self.configure_clkutils_tree_colors()
     
-    def apply_clkutils_filter(self):
-        """Apply search filter to CLKUtils tests"""
-        search_text = self.clkutils_search_var.get().lower().strip()
-        
-        # Clear current display
-        for item in self.clkutils_tree.get_children():
-            self.clkutils_tree.delete(item)
-        
-        # Add filtered items
-        for i, item_data in enumerate(self.all_clkutils_items):
-            test_name = item_data['test_name']
-            
-            # Apply search filter
-            if search_text and search_text not in test_name.lower():
-                continue
-            
-            # Determine checkbox state
-            checkbox = '☑' if 'checked' in item_data['tags'] else '☐'
-            tree_text = checkbox
-            values = (test_name,)  # Test name goes in the column
-            
-            # Insert item
-            item_id = self.clkutils_tree.insert('', 'end', text=tree_text, values=values, tags=item_data['tags'])
-            
-            # Apply alternating row colors
-            if i % 2 == 0:
-                current_tags = list(item_data['tags']) + ['evenrow']
-            else:
-                current_tags = list(item_data['tags']) + ['oddrow']
-            self.clkutils_tree.item(item_id, tags=current_tags)
+    def apply_clkutils_filter(self, delay_ms=None):
+        """Apply search filter to CLKUtils tests (in the background, once typing pauses)"""
+        self.clkutils_filter.request(self.clkutils_search_var.get(), delay_ms=delay_ms)
+    
+    def show_filtered_clkutils_rows(self, rows):
+        """Display the rows (positions in all_clkutils_items) matched by the search"""
+        self.clkutils_view.show_rows(rows)
     
     def on_clkutils_search_change(self, *args):
         """Handle search text change"""
@@ -2258,33 +2240,20 @@ class CTVListGUI:
     
     def toggle_clkutils_selection_for_item(self, item):
         """Toggle selection for a specific CLKUtils item"""
-        current_text = self.clkutils_tree.item(item, 'text')
-        values = list(self.clkutils_tree.item(item, 'values'))
-        current_tags = self.clkutils_tree.item(item, 'tags')
-        test_name = values[0]  # Test name is in the first (and only) column
-        
-        # Determine current row type for alternating colors
-        item_index = self.clkutils_tree.index(item)
-        row_tag = 'evenrow' if item_index % 2 == 0 else 'oddrow'
+        item_data = self.clkutils_view.item_for(item)
+        if item_data is None:
+            return
         
-        if 'checked' in current_tags:
+        if 'checked' in item_data['tags']:
             # Uncheck
-            new_text = '☐'
-            new_tags = ('unchecked', row_tag)
+            item_data['tree_text'] = '☐'
+            item_data['tags'] = ('unchecked',)
         else:
             # Check
-            new_text = '☑'
-            new_tags = ('checked', row_tag)
-        
-        self.clkutils_tree.item(item, text=new_text, tags=new_tags)
-        
-        # Update stored data
-        for item_data in self.all_clkutils_items:
-            if item_data['test_name'] == test_name:
-                item_data['tree_text'] = new_text
-                item_data['tags'] = (new_tags[0],)
-                break
+            item_data['tree_text'] = '☑'
+            item_data['tags'] = ('checked',)
         
+        self.clkutils_view.refresh()
         self.update_clkutils_selection_count()
     
     def select_all_clkutils_tests(self):
@@ -2293,7 +2262,7 @@ class CTVListGUI:
             item_data['tree_text'] = '☑'
             item_data['tags'] = ('checked',)
         
-        self.apply_clkutils_filter()
+        self.clkutils_view.refresh()
         self.update_clkutils_selection_count()
     
     def clear_all_clkutils_tests(self):
@@ -2302,7 +2271,7 @@ class CTVListGUI:
             item_data['tree_text'] = '☐'
             item_data['tags'] = ('unchecked',)
         
-        self.apply_clkutils_filter()
+        self.clkutils_view.refresh()
         self.update_clkutils_selection_count()
     
     def remove_selected_clkutils_tests(self):
@@ -2479,10 +2448,17 @@ class CTVListGUI:
         ttk.Checkbutton(options_frame, text="Delete intermediary files", variable=self.delete_files_var).pack(anchor='w', padx=10, pady=5)
         
         # Always stack output files for JMP; option removed
+        self.compact_stacking_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options_frame, text="Compact stacked files (separate unit/label tables, 5-10x smaller)", 
+                        variable=self.compact_stacking_var).pack(anchor='w', padx=10, pady=5)
         
         self.run_jmp_var = tk.BooleanVar(value=False)
         ttk.Checkbutton(options_frame, text="Run JMP on stacked files", variable=self.run_jmp_var).pack(anchor='w', padx=10, pady=5)
         
+        self.summary_charts_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options_frame, text="Chart from Python summaries (raw data opens on demand)", 
+                        variable=self.summary_charts_var).pack(anchor='w', padx=10, pady=5)
+        
         # JMP execution mode selection
         jmp_mode_frame = ttk.LabelFrame(options_frame, text="JMP Execution Mode")
         jmp_mode_frame.pack(fill='x', padx=10, pady=5)
@@ -2495,6 +2471,11 @@ class CTVListGUI:
         ttk.Label(jmp_mode_frame, text="   ↳ Fast JSL creation + Single JMP workspace (optimal)", 
                  font=('Arial', 8), foreground='gray').pack(anchor='w', padx=25)
         
+        ttk.Radiobutton(jmp_mode_frame, text="Unified Session (Preloaded)", 
+                       variable=self.jmp_mode_var, value="preloaded").pack(anchor='w', padx=10, pady=2)
+        ttk.Label(jmp_mode_frame, text="   ↳ Column types and label columns precomputed in Python (fastest JMP load)", 
+                 font=('Arial', 8), foreground='gray').pack(anchor='w', padx=25)
+        
         ttk.Radiobutton(jmp_mode_frame, text="Unified Session", 
                        variable=self.jmp_mode_var, value="unified").pack(anchor='w', padx=10, pady=2)
         ttk.Label(jmp_mode_frame, text="   ↳ Sequential processing + Single JMP workspace (efficient)", 
@@ -2505,13 +2486,34 @@ class CTVListGUI:
         ttk.Label(jmp_mode_frame, text="   ↳ Multiple JMP windows (fast but resource intensive)", 
                  font=('Arial', 8), foreground='gray').pack(anchor='w', padx=25)
         
+        ttk.Radiobutton(jmp_mode_frame, text="Adaptive Parallel Instances", 
+                       variable=self.jmp_mode_var, value="adaptive").pack(anchor='w', padx=10, pady=2)
+        ttk.Label(jmp_mode_frame, text="   ↳ Instances sized to free memory/CPU, biggest datasets first, size-based timeouts", 
+                 font=('Arial', 8), foreground='gray').pack(anchor='w', padx=25)
+        
         # Max workers setting for parallel mode
         workers_frame = ttk.Frame(jmp_mode_frame)
         workers_frame.pack(fill='x', padx=10, pady=5)
         ttk.Label(workers_frame, text="Max concurrent JMP instances:").pack(side='left')
-        self.max_workers_var = tk.IntVar(value=3)
-        workers_spinbox = ttk.Spinbox(workers_frame, from_=1, to=8, width=5, textvariable=self.max_workers_var)
+        self.max_workers_var = tk.IntVar(value=0)
+        workers_spinbox = ttk.Spinbox(workers_frame, from_=0, to=8, width=5, textvariable=self.max_workers_var)
         workers_spinbox.pack(side='left', padx=5)
+        ttk.Label(workers_frame, text="(0 = automatic: 3 for parallel, sized to the machine for adaptive)",
+                 font=('Arial', 8), foreground='gray').pack(side='left')
+        
+        # Query tuning profile (server-side query splitting / compression settings)
+        query_tuning_frame = ttk.LabelFrame(options_frame, text="Query Tuning")
+        query_tuning_frame.pack(fill='x', padx=10, pady=5)
+        
+        profile_frame = ttk.Frame(query_tuning_frame)
+        profile_frame.pack(fill='x', padx=10, pady=5)
+        ttk.Label(profile_frame, text="Tuning profile:").pack(side='left')
+        self.query_profile_var = tk.StringVar(value=qt.load_query_tuning()['active_profile'])
+        ttk.Combobox(profile_frame, textvariable=self.query_profile_var, values=qt.list_profiles(),
+                     state='readonly', width=18).pack(side='left', padx=5)
+        ttk.Button(profile_frame, text="Auto-Tune", command=self.run_query_auto_tune).pack(side='left', padx=5)
+        ttk.Label(query_tuning_frame, text="   ↳ Profiles are defined in config.json; 'auto' uses the fastest settings measured per database", 
+                 font=('Arial', 8), foreground='gray').pack(anchor='w', padx=25)
         
         # Processing mode selection (MTPL vs CLKUtils)
         mode_frame = ttk.LabelFrame(options_frame, text="Processing Mode")
@@ -2571,6 +2573,11 @@ class CTVListGUI:
         
         self.log_text.bind("<MouseWheel>", _on_log_mousewheel)
         
+        # Log lines and progress from any thread are queued and written in batches by the Tk loop
+        self.configure_log_tags()
+        self._tags_configured = True
+        self.log_sink = ls.LogSink(self.root, self.log_text, on_progress=self.progress_var.set)
+        
     def load_csv_filtered(self, file_path):
         """Load CSV file with robust column filtering to handle empty wafer sections and preserve data structure"""
         try:
@@ -3154,41 +3161,8 @@ class CTVListGUI:
                 
                 # Extract data into raw format for processing
                 if not self.material_df.empty:
-                    # Helper function to parse comma-separated values from loaded data
-                    def parse_loaded_value(value):
-                        if pd.isna(value) or not str(value).strip():
-                            return []
-                        return [item.strip() for item in str(value).split(',') if item.strip()]
-                    
-                    # Extract first row data and parse into lists
-                    first_row = self.material_df.iloc[0]
-                    
-                    # Use default values for missing columns
-                    default_values = {
-                        'Lot': ['Not Null'],
-                        'Wafer': ['Not Null'], 
-                        'Program': ['DAB%', 'DAC%'],
-                        'Prefetch': 3,
-                        'Database': ['D1D_PROD_XEUS', 'F24_PROD_XEUS']
-                    }
-                    
-                    self.material_data = {}
-                    for col, default in default_values.items():
-                        if col in first_row:
-                            if col == 'Prefetch':
-                                # Handle Prefetch as integer
-                                value = first_row.get(col, default)
-                                if str(value).strip().isdigit():
-                                    self.material_data[col] = int(value)
-                                else:
-                                    self.material_data[col] = default
-                            else:
-                                # Handle other columns as lists
-                                parsed_value = parse_loaded_value(first_row.get(col, ''))
-                                self.material_data[col] = parsed_value if parsed_value else default
-                        else:
-                            # Use default if column not found
-                            self.material_data[col] = default
+                    # Extract first row data and parse into lists (defaults for missing columns)
+                    self.material_data = pl.material_from_row(self.material_df.iloc[0])
                     
                     self.log_message(f"Parsed material data: {self.material_data}")
                 
@@ -3554,18 +3528,10 @@ class CTVListGUI:
             self.log_message(f"Processed path: {processed_path}")
             self.log_message(f"Final path: {final_path}")
             
-            self.mtpl_csv_path = mt.mtpl_test_to_csv(final_path)
-            self.mtpl_df = pd.read_csv(self.mtpl_csv_path)
-            
-            # Debug: Print MTPL dataframe info
-            print(f"Debug - MTPL columns: {self.mtpl_df.columns.tolist()}")
-            print(f"Debug - MTPL shape: {self.mtpl_df.shape}")
-            if not self.mtpl_df.empty:
-                print(f"Debug - First few rows of MTPL:")
-                print(self.mtpl_df.head())
+            self.load_mtpl_table(final_path)
             
             self.update_mtpl_display()
-            self.log_message(f"MTPL file processed: {self.mtpl_csv_path}", "success")
+            self.log_message(f"MTPL file processed: {os.path.basename(final_path)}", "success")
             
             # Store the successfully loaded path for reload functionality
             self.last_mtpl_path = mtpl_path
@@ -3606,12 +3572,11 @@ class CTVListGUI:
             processed_path = fi.process_file_input(normalized_mtpl_path)
             final_path = self.normalize_unc_path(processed_path)
             
-            # Process the file
-            self.mtpl_csv_path = mt.mtpl_test_to_csv(final_path)
-            self.mtpl_df = pd.read_csv(self.mtpl_csv_path)
+            # Process the file (only blocks changed since the last load are parsed again)
+            self.load_mtpl_table(final_path)
             
             self.update_mtpl_display()
-            self.log_message(f"MTPL file reloaded successfully: {self.mtpl_csv_path}", "success")
+            self.log_message(f"MTPL file reloaded successfully: {os.path.basename(final_path)}", "success")
             
             # Update the info label
             file_name = os.path.basename(self.last_mtpl_path)
@@ -3625,11 +3590,70 @@ class CTVListGUI:
             messagebox.showerror("Error", f"Failed to reload MTPL file: {str(e)}")
             self.log_message(f"Error reloading MTPL: {str(e)}", "error")
             
+    def load_mtpl_table(self, final_path):
+        """Parse the MTPL into self.mtpl_df in memory, using the incremental parse cache"""
+        self.mtpl_df, parsed = pl.load_mtpl_table(final_path)
+        # No .mtpl.csv is written any more; keep its former location for the default output folder
+        self.mtpl_csv_path = os.path.abspath(f"{os.path.basename(final_path)}.csv")
+        self.tp_dir = ""
+        self.tp_modules = {}
+        if parsed['reparsed'] < parsed['blocks']:
+            self.log_message(f"MTPL parse cache: re-parsed {parsed['reparsed']} of {parsed['blocks']} blocks")
+            
+    def load_test_program(self):
+        """Load every module MTPL of a test program into one table (with a Module column)"""
+        mtpl_path = self.mtpl_file_path.get()
+        tp_dir = mt.find_tp_dir(self.normalize_unc_path(mtpl_path)) if mtpl_path else None
+        if not tp_dir or not os.path.isdir(os.path.join(tp_dir, 'Modules')):
+            tp_dir = filedialog.askdirectory(title="Select Test Program Directory (containing Modules)")
+            if not tp_dir:
+                return
+            tp_dir = self.normalize_unc_path(tp_dir)
+            if not os.path.isdir(os.path.join(tp_dir, 'Modules')):
+                messagebox.showerror("Error", f"No Modules folder found in:\n{tp_dir}")
+                return
+        
+        self.log_message(f"Loading all modules of test program: {tp_dir}")
+        self.update_status_indicator(self.mtpl_info_label, f"⏳ Loading test program: {os.path.basename(tp_dir)}", "info")
+        
+        def progress(done, total, module):
+            self.root.after(0, lambda: self.update_progress(done, total, f"Parsed module {module}"))
+        
+        def run_load():
+            try:
+                start_time = time.time()
+                mtpl_df, program = pl.load_test_program_table(tp_dir, progress_callback=progress)
+                self.root.after(0, lambda: finish_load(program, mtpl_df, time.time() - start_time))
+            except Exception as e:
+                error_msg = f"Failed to load test program: {str(e)}"
+                self.root.after(0, lambda: self.log_message(error_msg, "error"))
+                self.root.after(0, lambda: messagebox.showerror("Error", error_msg))
+        
+        def finish_load(program, mtpl_df, seconds):
+            self.mtpl_df = mtpl_df
+            self.tp_dir = tp_dir
+            self.tp_modules = {module['module']: module for module in program['modules']}
+            self.mtpl_csv_path = os.path.abspath(f"{os.path.basename(tp_dir)}.tp.csv")
+            # Processing derives the TP base directory from the text before 'Modules'
+            self.mtpl_file_path.set(os.path.join(tp_dir, 'Modules'))
+            self.update_mtpl_display()
+            
+            for module, error in program['errors'].items():
+                self.log_message(f"Module {module} skipped: {error}", "warning")
+            loaded = len(program['modules']) - len(program['errors'])
+            self.log_message(f"Test program loaded: {loaded} modules, {len(program['instances'])} instances "
+                             f"({seconds:.1f} seconds)", "success")
+            self.update_status_indicator(self.mtpl_info_label,
+                                         f"✅ Loaded test program: {os.path.basename(tp_dir)} ({loaded} modules)", "success")
+            self.set_default_output_folder()
+        
+        threading.Thread(target=run_load, daemon=True).start()
+            
     def update_mtpl_display(self):
         """Update the MTPL data display"""
         # Clear existing data
-        for item in self.mtpl_tree.get_children():
-            self.mtpl_tree.delete(item)
+        self.mtpl_view.clear()
+        self.mtpl_filter.set_index(None)
             
         if self.mtpl_df is not None:
             # Add checkbox column to the original columns
@@ -3637,8 +3661,6 @@ class CTVListGUI:
             self.mtpl_tree['columns'] = columns
             self.mtpl_tree['show'] = 'headings'
             
-            print(f"Debug - Treeview columns: {columns}")
-            
             # Configure column headings
             self.mtpl_tree.heading('Selected', text='✓', anchor='center')
             self.mtpl_tree.column('Selected', width=50, anchor='center')
@@ -3650,23 +3672,16 @@ class CTVListGUI:
             # Create column filters
             self.create_column_filters()
                 
-            # Store all items for filtering
-            self.all_mtpl_items = []
-            for index, row in self.mtpl_df.iterrows():
-                # Start with unchecked (empty checkbox)
-                values = ['☐'] + list(row)
-                item_data = {
-                    'values': values,
-                    'tags': ('unchecked',),
-                    'original_index': index
-                }
-                self.all_mtpl_items.append(item_data)
-                print(f"Debug - Stored item {index}: {values}")
-                
-            print(f"Debug - Total items stored: {len(self.all_mtpl_items)}")
+            # Store all items for filtering, all unchecked (empty checkbox); rows converted in one call
+            self.all_mtpl_items = [
+                {'values': ['☐'] + row, 'tags': ('unchecked',), 'original_index': index}
+                for index, row in zip(self.mtpl_df.index, self.mtpl_df.values.tolist())
+            ]
                 
-            # Display all items initially
-            self.display_filtered_items(self.all_mtpl_items)
+            # Display all items initially and index the table for filtering
+            self.mtpl_view.set_items(self.all_mtpl_items)
+            self.mtpl_filter.set_index(tf.TableIndex(self.mtpl_df))
+            self.configure_treeview_alternating_colors()
             
             # Clear search
             self.search_var.set("")
@@ -3681,44 +3696,21 @@ class CTVListGUI:
                 self.apply_automatic_test_instance_filter()
             
     def display_filtered_items(self, items):
-        """Display the filtered items in the treeview with enhanced resize handling"""
+        """Display the filtered items in the treeview (only the rows in view become Treeview items)"""
         try:
             # Ensure the treeview widget exists and is valid
             if not hasattr(self, 'mtpl_tree') or not self.mtpl_tree.winfo_exists():
-                print("Debug - MTPL tree widget does not exist, skipping display")
                 return
                 
-            # Clear current display
-            for item in self.mtpl_tree.get_children():
-                self.mtpl_tree.delete(item)
-                
-            # Insert filtered items with proper tag combinations
-            for i, item_data in enumerate(items):
-                try:
-                    row_tag = 'evenrow' if i % 2 == 0 else 'oddrow'
-                    
-                    # Preserve checked state and combine with row coloring
-                    existing_tags = item_data['tags']
-                    if 'checked' in existing_tags:
-                        combined_tags = ('checked', row_tag)
-                    else:
-                        combined_tags = ('unchecked', row_tag)
-                        
-                    self.mtpl_tree.insert('', 'end', 
-                                        values=item_data['values'], 
-                                        tags=combined_tags)
-                except Exception as item_error:
-                    print(f"Debug - Error inserting MTPL item {i}: {item_error}")
-                    continue
+            # An explicit item list replaces any filter result still on its way
+            self.mtpl_filter.cancel()
+            self.mtpl_view.show_items(items)
             
             # Configure alternating colors
             self.configure_treeview_alternating_colors()
             
-            # Force widget update to reflect changes
-            self.mtpl_tree.update_idletasks()
-            
         except Exception as e:
-            print(f"Debug - Error in display_filtered_items: {e}")
+            self.log_message(f"Could not display the MTPL rows: {e}", "error")
                                 
     def create_column_filters(self):
         """Create dropdown filters for each column"""
@@ -3795,40 +3787,23 @@ class CTVListGUI:
             self.apply_automatic_test_instance_filter()
             return
             
-        filtered_items = []
-        text_filter_lower = text_filter.lower()
+        column_values = {}
+        if hasattr(self, 'column_filters'):
+            for col, filter_var in self.column_filters.items():
+                filter_value = filter_var.get()
+                if filter_value and filter_value != "All":
+                    column_values[col] = filter_value
         
-        for item_data in self.all_mtpl_items:
-            values = item_data['values']
-            # Skip checkbox column for filtering
-            row_values = values[1:]  
-            
-            # Apply text filter
-            text_match = True
-            if text_filter_lower:
-                item_text = ' '.join(str(val).lower() for val in row_values)
-                text_match = text_filter_lower in item_text
-            
-            # Apply column filters
-            column_match = True
-            if hasattr(self, 'column_filters'):
-                for i, col in enumerate(self.mtpl_df.columns):
-                    if col in self.column_filters:
-                        filter_value = self.column_filters[col].get()
-                        if filter_value != "All":
-                            # Compare with the actual value in this column
-                            if i < len(row_values) and str(row_values[i]) != filter_value:
-                                column_match = False
-                                break
-            
-            # Include item if it passes both filters
-            if text_match and column_match:
-                filtered_items.append(item_data)
-        
-        self.display_filtered_items(filtered_items)
+        # Filtered on the table index in the background; show_filtered_mtpl_rows displays the result
+        self.mtpl_filter.request(text_filter, column_values)
         self.update_filter_status()
         self.update_selected_tests_count()
         
+    def show_filtered_mtpl_rows(self, rows):
+        """Display the rows (positions in all_mtpl_items) matched by the MTPL filters"""
+        self.mtpl_view.show_rows(rows)
+        self.configure_treeview_alternating_colors()
+        
     def clear_all_filters(self):
         """Clear all filters including text search and column filters"""
         # Clear text search
@@ -3895,16 +3870,15 @@ class CTVListGUI:
         
     def export_visible_tests(self):
         """Export currently visible (filtered) tests to CSV"""
-        if not hasattr(self, 'mtpl_tree') or not self.mtpl_tree.get_children():
+        if not hasattr(self, 'mtpl_view') or not self.mtpl_view.rows:
             messagebox.showwarning("Warning", "No visible tests to export")
             return
             
-        # Get all visible items from treeview
+        # Get all filtered items, including those scrolled out of view
         visible_items = []
-        for item_id in self.mtpl_tree.get_children():
-            values = self.mtpl_tree.item(item_id, 'values')
+        for item_data in self.mtpl_view.visible_items():
             # Remove checkbox column
-            row_data = values[1:]  # Skip checkbox column
+            row_data = item_data['values'][1:]  # Skip checkbox column
             visible_items.append(row_data)
             
         if not visible_items:
@@ -4005,60 +3979,26 @@ class CTVListGUI:
             
     def toggle_test_selection_for_item(self, item):
         """Toggle selection for a specific item"""
-        current_tags = self.mtpl_tree.item(item, 'tags')
-        values = list(self.mtpl_tree.item(item, 'values'))
-        
-        print(f"Debug - Toggling item with current tags: {current_tags}")
-        print(f"Debug - Current values: {values}")
-        
-        # Determine current row type (odd/even) for alternating colors
-        item_index = self.mtpl_tree.index(item)
-        row_tag = 'evenrow' if item_index % 2 == 0 else 'oddrow'
+        # The stored item shown in this row; the view redraws it from the stored state
+        item_data = self.mtpl_view.item_for(item)
+        if item_data is None:
+            return
+        values = list(item_data['values'])
         
-        if 'checked' in current_tags:
+        if 'checked' in item_data['tags']:
             # Uncheck: change to empty checkbox
             values[0] = '☐'
-            new_tags = ('unchecked', row_tag)
-            self.mtpl_tree.item(item, values=values, tags=new_tags)
-            print("Debug - Unchecked item")
+            new_tags = ('unchecked',)
         else:
             # Check: change to filled checkbox
             values[0] = '☑'
-            new_tags = ('checked', row_tag)
-            self.mtpl_tree.item(item, values=values, tags=new_tags)
-            print("Debug - Checked item")
+            new_tags = ('checked',)
             
-        # Update the stored item data to maintain state during filtering
-        self.update_stored_item_state(values, new_tags)
+        item_data['values'] = values
+        item_data['tags'] = new_tags
+        self.mtpl_view.refresh()
         self.update_selected_tests_count()
         
-    def update_stored_item_state(self, updated_values, new_tags):
-        """Update the stored item state for filtering consistency"""
-        # Find the matching item in stored data by comparing the non-checkbox values
-        test_identifier = updated_values[1:]  # Skip checkbox column
-        
-        print(f"Debug - Looking for item with identifier: {test_identifier}")
-        
-        for i, item_data in enumerate(self.all_mtpl_items):
-            stored_values = item_data['values'][1:]  # Skip checkbox column
-            
-            # Compare with type conversion for robust matching
-            if len(stored_values) == len(test_identifier):
-                match = True
-                for j, (stored_val, search_val) in enumerate(zip(stored_values, test_identifier)):
-                    # Convert both to strings for comparison to handle type differences
-                    if str(stored_val) != str(search_val):
-                        match = False
-                        break
-                
-                if match:
-                    print(f"Debug - Found matching item at index {i}, updating from {item_data['tags']} to {new_tags}")
-                    item_data['values'] = updated_values
-                    item_data['tags'] = new_tags
-                    return
-        
-        print("Debug - No matching item found!")
-        
     def select_all_tests(self):
         """Select all tests in the MTPL (including filtered ones)"""
         try:
@@ -4070,7 +4010,6 @@ class CTVListGUI:
                 values[0] = '☑'  # Set checkbox to checked
                 item_data['values'] = values
                 item_data['tags'] = ('checked',)
-                print(f"Debug - Updated item to checked: {values}")
                 
             # Refresh the current display - handle auto-filter case properly
             search_text = self.search_var.get().strip()
@@ -4082,18 +4021,8 @@ class CTVListGUI:
                 self.apply_automatic_test_instance_filter()
                 self.log_message("Selected all tests (including auto-filtered ones)", "success")
             else:
-                # Normal filtering logic for manual filters
-                search_text_lower = search_text.lower()
-                if not search_text_lower:
-                    filtered_items = self.all_mtpl_items
-                else:
-                    filtered_items = []
-                    for item_data in self.all_mtpl_items:
-                        item_text = ' '.join(str(val).lower() for val in item_data['values'][1:])
-                        if search_text_lower in item_text:
-                            filtered_items.append(item_data)
-                            
-                self.display_filtered_items(filtered_items)
+                # The filtered rows are unchanged, only redraw their checkboxes
+                self.mtpl_view.refresh()
                 self.log_message("Selected all tests", "success")
                 
             self.update_selected_tests_count()
@@ -4122,18 +4051,8 @@ class CTVListGUI:
                 self.apply_automatic_test_instance_filter()
                 self.log_message("Cleared selections for auto-filtered tests", "success")
             else:
-                # Normal filtering logic for manual filters
-                search_text_lower = search_text.lower()
-                if not search_text_lower:
-                    filtered_items = self.all_mtpl_items
-                else:
-                    filtered_items = []
-                    for item_data in self.all_mtpl_items:
-                        item_text = ' '.join(str(val).lower() for val in item_data['values'][1:])
-                        if search_text_lower in item_text:
-                            filtered_items.append(item_data)
-                            
-                self.display_filtered_items(filtered_items)
+                # The filtered rows are unchanged, only redraw their checkboxes
+                self.mtpl_view.refresh()
                 self.log_message("Cleared all test selections", "success")
                 
             self.update_selected_tests_count()
@@ -4151,7 +4070,6 @@ class CTVListGUI:
             if 'checked' in item_data['tags']:
                 count += 1
                 checked_items.append(f"Item {i}: {item_data['values'][1] if len(item_data['values']) > 1 else 'Unknown'}")
-                print(f"Debug - Checked item {i}: {item_data['values']}")
         
         print(f"Debug - Total checked count: {count}")
         if count > 0:
@@ -4260,84 +4178,19 @@ class CTVListGUI:
             search_text = self.search_var.get().strip()
             is_auto_filtered = (search_text.upper() == "AUTO-FILTERED BY MATERIAL DATA")
             
+            # The view holds every filtered row, including those scrolled out of the window
+            visible_items = self.mtpl_view.visible_items()
+            for item_data in visible_items:
+                values = list(item_data['values'])
+                values[0] = '☑'  # Set checkbox to checked
+                item_data['values'] = values
+                item_data['tags'] = ('checked',)
+            self.mtpl_view.refresh()
+            
             if is_auto_filtered:
-                # When auto-filter is active, get currently displayed items from treeview
-                # This ensures we work with the actual filtered results
-                self.log_message("Auto-filter detected - selecting all currently displayed tests", "info")
-                
-                # Get all currently displayed items from the treeview
-                visible_items = []
-                updates_made = 0
-                
-                for item_id in self.mtpl_tree.get_children():
-                    item_values = list(self.mtpl_tree.item(item_id, 'values'))
-                    # Mark as selected
-                    item_values[0] = '☑'
-                    
-                    # Find corresponding item in all_mtpl_items to update the source data
-                    # Use more robust matching with type conversion
-                    match_found = False
-                    for item_data in self.all_mtpl_items:
-                        # Compare all values except the checkbox column with type conversion
-                        stored_values = [str(v) for v in item_data['values'][1:]]
-                        current_values = [str(v) for v in item_values[1:]]
-                        
-                        if stored_values == current_values:
-                            item_data['values'][0] = '☑'
-                            item_data['tags'] = ('checked',)
-                            updates_made += 1
-                            match_found = True
-                            print(f"Debug - Updated stored item: {item_data['values']}")
-                            break
-                    
-                    if not match_found:
-                        print(f"Debug - No match found for treeview item: {item_values}")
-                    
-                    # Update the treeview item immediately
-                    row_tag = 'evenrow' if len(visible_items) % 2 == 0 else 'oddrow'
-                    self.mtpl_tree.item(item_id, values=item_values, tags=('checked', row_tag))
-                    visible_items.append(item_values)
-                
-                self.log_message(f"Selected {len(visible_items)} auto-filtered tests (updated {updates_made} stored items)", "success")
-                print(f"Debug - Auto-filter mode: visible items={len(visible_items)}, stored updates={updates_made}")
-                
+                self.log_message(f"Selected {len(visible_items)} auto-filtered tests", "success")
             else:
-                # Normal filtering logic for manual filters
-                search_text_lower = search_text.lower()
-                
-                # Apply current filters to get visible items
-                filtered_items = self.all_mtpl_items.copy()
-                
-                # Apply search filter
-                if search_text_lower:
-                    filtered_items = [
-                        item for item in filtered_items
-                        if search_text_lower in ' '.join(str(val).lower() for val in item['values'][1:])
-                    ]
-                
-                # Apply column filters
-                if hasattr(self, 'column_filters'):
-                    for col_name, filter_var in self.column_filters.items():
-                        filter_value = filter_var.get()
-                        if filter_value and filter_value != "All":
-                            col_index = self.get_column_index(col_name)
-                            if col_index is not None:
-                                filtered_items = [
-                                    item for item in filtered_items
-                                    if str(item['values'][col_index]).strip() == filter_value.strip()
-                                ]
-                
-                # Mark filtered items as selected
-                for item_data in filtered_items:
-                    values = list(item_data['values'])
-                    values[0] = '☑'  # Set checkbox to checked
-                    item_data['values'] = values
-                    item_data['tags'] = ('checked',)
-                
-                # Refresh display
-                self.display_filtered_items(filtered_items)
-                self.log_message(f"Selected {len(filtered_items)} manually filtered tests", "success")
-                print(f"Debug - Manual filter mode: selected {len(filtered_items)} items")
+                self.log_message(f"Selected {len(visible_items)} manually filtered tests", "success")
             
             # Update the selected tests count
             self.update_selected_tests_count()
@@ -4353,87 +4206,20 @@ class CTVListGUI:
             search_text = self.search_var.get().strip()
             is_auto_filtered = (search_text.upper() == "AUTO-FILTERED BY MATERIAL DATA")
             
+            # Invert selection for every filtered row, including those scrolled out of the window
+            visible_items = self.mtpl_view.visible_items()
+            for item_data in visible_items:
+                values = list(item_data['values'])
+                current_state = values[0]
+                values[0] = '☐' if current_state == '☑' else '☑'
+                item_data['values'] = values
+                item_data['tags'] = ('unchecked' if current_state == '☑' else 'checked',)
+            self.mtpl_view.refresh()
+            
             if is_auto_filtered:
-                # When auto-filter is active, work with currently displayed items from treeview
-                self.log_message("Auto-filter detected - inverting selection for currently displayed tests", "info")
-                
-                # Get all currently displayed items from the treeview and invert their selection
-                visible_items = []
-                updates_made = 0
-                
-                for item_id in self.mtpl_tree.get_children():
-                    item_values = list(self.mtpl_tree.item(item_id, 'values'))
-                    current_state = item_values[0]
-                    
-                    # Invert selection
-                    item_values[0] = '☐' if current_state == '☑' else '☑'
-                    new_tag = 'unchecked' if current_state == '☑' else 'checked'
-                    
-                    # Find corresponding item in all_mtpl_items to update the source data
-                    # Use more robust matching with type conversion
-                    match_found = False
-                    for item_data in self.all_mtpl_items:
-                        # Compare all values except the checkbox column with type conversion
-                        stored_values = [str(v) for v in item_data['values'][1:]]
-                        current_values = [str(v) for v in item_values[1:]]
-                        
-                        if stored_values == current_values:
-                            item_data['values'][0] = item_values[0]
-                            item_data['tags'] = (new_tag,)
-                            updates_made += 1
-                            match_found = True
-                            print(f"Debug - Updated stored item during invert: {item_data['values']}")
-                            break
-                    
-                    if not match_found:
-                        print(f"Debug - No match found during invert for treeview item: {item_values}")
-                    
-                    # Update the treeview item immediately
-                    row_tag = 'evenrow' if len(visible_items) % 2 == 0 else 'oddrow'
-                    self.mtpl_tree.item(item_id, values=item_values, tags=(new_tag, row_tag))
-                    visible_items.append(item_values)
-                
-                self.log_message(f"Inverted selection for {len(visible_items)} auto-filtered tests (updated {updates_made} stored items)", "success")
-                print(f"Debug - Auto-filter invert: visible items={len(visible_items)}, stored updates={updates_made}")
-                
+                self.log_message(f"Inverted selection for {len(visible_items)} auto-filtered tests", "success")
             else:
-                # Normal filtering logic for manual filters
-                search_text_lower = search_text.lower()
-                
-                # Apply current filters to get visible items
-                filtered_items = self.all_mtpl_items.copy()
-                
-                # Apply search filter
-                if search_text_lower:
-                    filtered_items = [
-                        item for item in filtered_items
-                        if search_text_lower in ' '.join(str(val).lower() for val in item['values'][1:])
-                    ]
-                
-                # Apply column filters
-                if hasattr(self, 'column_filters'):
-                    for col_name, filter_var in self.column_filters.items():
-                        filter_value = filter_var.get()
-                        if filter_value and filter_value != "All":
-                            col_index = self.get_column_index(col_name)
-                            if col_index is not None:
-                                filtered_items = [
-                                    item for item in filtered_items
-                                    if str(item['values'][col_index]).strip() == filter_value.strip()
-                                ]
-                
-                # Invert selection for visible items
-                for item_data in filtered_items:
-                    values = list(item_data['values'])
-                    current_state = values[0]
-                    values[0] = '☐' if current_state == '☑' else '☑'
-                    item_data['values'] = values
-                    item_data['tags'] = ('unchecked' if current_state == '☑' else 'checked',)
-                
-                # Refresh display
-                self.display_filtered_items(filtered_items)
-                self.log_message(f"Inverted selection for {len(filtered_items)} manually filtered tests", "success")
-                print(f"Debug - Manual filter invert: inverted {len(filtered_items)} items")
+                self.log_message(f"Inverted selection for {len(visible_items)} manually filtered tests", "success")
             
             # Update the selected tests count
             self.update_selected_tests_count()
@@ -4684,8 +4470,8 @@ class CTVListGUI:
     def get_testtimes(self):
         """Get test times using the pyuber_query get_testtimes function"""
         try:
-            # Check if PyUber is available
-            if not PYUBER_AVAILABLE:
+            # Check if PyUber is available (imports it on first use)
+            if load_pyuber() is None:
                 messagebox.showerror("Error", "PyUber module is not available. Please ensure PyUber is properly installed.")
                 return
             
@@ -4773,6 +4559,7 @@ class CTVListGUI:
                 try:
                     # Call the get_testtimes function from pyuber_query
                     self.log_message("Calling get_testtimes function...")
+                    qtr.start_run(place_in)
                     
                     '''py.get_testtimes(
                         tests=selected_tests,
@@ -4791,7 +4578,8 @@ class CTVListGUI:
                         programs=programs,
                         prefetch=prefetch,
                         databases=databases,
-                        place_in=place_in
+                        place_in=place_in,
+                        query_profile=self.query_profile_var.get()
                     )
                     # Log success
                     self.log_message("✅ Test times retrieval completed successfully!")
@@ -4809,6 +4597,8 @@ class CTVListGUI:
                     error_msg = f"Error getting test times: {str(e)}"
                     self.log_message(f"❌ {error_msg}")
                     self.root.after(0, lambda: messagebox.showerror("Error", error_msg))
+                finally:
+                    self.log_query_trace_summary()
             
             # Start the thread
             thread = threading.Thread(target=run_testtimes, daemon=True)
@@ -4819,6 +4609,32 @@ class CTVListGUI:
             self.log_message(f"❌ {error_msg}")
             messagebox.showerror("Error", error_msg)
     
+    def run_query_auto_tune(self):
+        """Probe the selected databases with a few connection settings and remember the fastest for the 'auto' profile"""
+        if load_pyuber() is None:
+            messagebox.showerror("Error", "PyUber module not available - cannot auto-tune queries")
+            return
+        
+        databases_str = self.database_var.get() if hasattr(self, 'database_var') and self.database_var.get() else 'D1D_PROD_XEUS'
+        databases = [item.strip() for item in databases_str.split(',') if item.strip()]
+        
+        def run_auto_tune():
+            tuned_any = False
+            for database in databases:
+                self.log_message(f"Auto-tuning query settings for {database}...")
+                try:
+                    best = qt.auto_tune(database)
+                except Exception as e:
+                    self.log_message(f"❌ Auto-tuning failed for {database}: {str(e)}")
+                    continue
+                if best:
+                    tuned_any = True
+                    self.log_message(f"✅ {database}: {best['settings'] or 'PyUber defaults'} ({best['seconds']:.2f} seconds)")
+            if tuned_any:
+                self.root.after(0, lambda: self.query_profile_var.set(qt.AUTO_PROFILE))
+        
+        threading.Thread(target=run_auto_tune, daemon=True).start()
+    
     def run_mtpl_verification(self):
         """Run MTPL verification using the port_mismatches module"""
         try:
@@ -4848,7 +4664,11 @@ class CTVListGUI:
             place_in = output_folder + os.sep if not output_folder.endswith(os.sep) else output_folder
             
             # Log the verification start
-            self.log_message(f"🔍 Starting MTPL verification for: {os.path.basename(mtpl_path)}")
+            tp_dir = self.tp_dir
+            if tp_dir:
+                self.log_message(f"🔍 Starting whole test program verification for: {os.path.basename(tp_dir)}")
+            else:
+                self.log_message(f"🔍 Starting MTPL verification for: {os.path.basename(mtpl_path)}")
             self.log_message(f"📁 Output directory: {output_folder}")
             
             # Run verification in a separate thread to avoid blocking the UI
@@ -4857,7 +4677,10 @@ class CTVListGUI:
             def run_verification():
                 try:
                     # Call the mtpl_verification function from port_mismatches module
-                    pm.mtpl_verification(mtpl_path, place_in)
+                    if tp_dir:
+                        pm.tp_verification(tp_dir, place_in)
+                    else:
+                        pm.mtpl_verification(mtpl_path, place_in)
                     
                     # Show success message
                     self.root.after(0, lambda: messagebox.showinfo(
@@ -4881,22 +4704,11 @@ class CTVListGUI:
             messagebox.showerror("Error", error_msg)
         
     def update_progress(self, current_test, total_tests, step_description=""):
-        """Update progress bar with detailed information and smooth animation"""
+        """Update progress bar with detailed information (safe from any thread)"""
         target_progress = (current_test / total_tests) * 100
-        current_progress = self.progress_var.get()
-        
-        # Smooth animation - gradually increase progress
-        def animate_progress():
-            nonlocal current_progress
-            if current_progress < target_progress:
-                current_progress = min(current_progress + 2, target_progress)
-                self.progress_var.set(current_progress)
-                self.root.after(50, animate_progress)  # 50ms intervals for smooth animation
-            else:
-                self.progress_var.set(target_progress)
         
-        # Start animation
-        animate_progress()
+        # Shown by the log sink at its next drain (latest value wins)
+        self.log_sink.progress(target_progress)
         
         # Calculate proper test number display (handle fractional progress)
         if isinstance(current_test, float):
@@ -4919,470 +4731,35 @@ class CTVListGUI:
             formatted_message += f" - {step_description}"
             
         self.log_message(formatted_message)
-        self.root.update_idletasks()
         
     def process_data(self, test_list, place_in):
-        """Process the data (adapted from master.py with enhanced SmartCTV and CTV processing)"""
+        """Process the data through the shared processing pipeline (pipeline.Pipeline, also used by osmosis_batch.py)"""
         try:
             self.log_message("Starting data processing...")
-            self.progress_var.set(0)
-            
-            # Default values
-            default_values = {
-                'Lot': ['Not Null'],
-                'Wafer': ['Not Null'],
-                'Program': ['DAB%', 'DAC%'],
-                'Prefetch': 3,
-                'Database': ['D1D_PROD_XEUS', 'F24_PROD_XEUS']
+            self.log_sink.progress(0)
+            options = {
+                'run_clkutils': hasattr(self, 'run_clkutils_var') and self.run_clkutils_var.get(),
+                'clkutils_config': self.clkutils_config_path.get(),
+                'query_profile': self.query_profile_var.get() if hasattr(self, 'query_profile_var') else '',
+                'compact_stacking': self.compact_stacking_var.get(),
+                'run_jmp': self.run_jmp_var.get(),
+                'jmp_mode': getattr(self, 'jmp_mode_var', tk.StringVar()).get(),
+                'max_workers': getattr(self, 'max_workers_var', tk.IntVar()).get(),
+                'summary_charts': self.summary_charts_var.get(),
+                'delete_files': self.delete_files_var.get(),
             }
-            
-            # Use the raw material data if available, otherwise use defaults
-            if hasattr(self, 'material_data') and self.material_data:
-                lot_list = self.material_data.get('Lot', default_values['Lot'])
-                wafer_list = self.material_data.get('Wafer', default_values['Wafer'])
-                program_list = self.material_data.get('Program', default_values['Program'])
-                prefetch = self.material_data.get('Prefetch', default_values['Prefetch'])
-                databases = self.material_data.get('Database', default_values['Database'])
-            else:
-                # Fallback to defaults if no material data
-                lot_list = default_values['Lot']
-                wafer_list = default_values['Wafer']
-                program_list = default_values['Program']
-                prefetch = default_values['Prefetch']
-                databases = default_values['Database']
-            
-            # Convert wafer list items to integers where possible
-            processed_wafer_list = []
-            for w in wafer_list:
-                try:
-                    if str(w).strip() and str(w).strip().isdigit():
-                        processed_wafer_list.append(int(w))
-                    else:
-                        processed_wafer_list.append(str(w))  # Keep as string if not numeric
-                except:
-                    processed_wafer_list.append(str(w))
-            wafer_list = processed_wafer_list
-            
-            # Log the extracted values for debugging
-            self.log_message(f"Using material data - Lot: {lot_list}, Wafer: {wafer_list}, Program: {program_list}, Prefetch: {prefetch}, Database: {databases}")
-            
-            # Use the single loaded MTPL file
-            mtpl_path = self.mtpl_file_path.get()
-            
-            # Normalize path separators for Windows, but preserve UNC paths (from master.py)
-            mtpl_path = self.normalize_unc_path(mtpl_path)
-            
-            # Get base directory from the loaded MTPL path (enhanced from master.py)
-            if 'Modules' in mtpl_path:
-                base_dir = mtpl_path.split('Modules')[0].rstrip(os.sep)
-                # Ensure we have a valid directory path
-                if not base_dir or base_dir == '.' or len(base_dir) < 3:
-                    # Fallback to parent directory of MTPL file
-                    base_dir = os.path.dirname(os.path.dirname(mtpl_path))
-            else:
-                base_dir = os.path.dirname(mtpl_path)
-            
-            # Normalize the base directory path
-            base_dir = os.path.normpath(base_dir)
-            self.log_message(f"Base directory: {base_dir}")
-            
-            # Validate base directory exists
-            if not os.path.exists(base_dir):
-                raise ValueError(f"Base directory does not exist: {base_dir}")
-            if not os.path.isdir(base_dir):
-                raise ValueError(f"Base path is not a directory: {base_dir}")
-            
-            total_iterations = len(test_list)  # Progress based on tests, not programs × tests
-            current_iteration = 0
-            
-            # Process for each program with the single loaded MTPL (enhanced logic from master.py)
-            place_temp = place_in
-            for program in program_list:
-                if not self.processing:
-                    break
-                    
-                self.log_message(f"Processing program: {program}")
-                
-                # Create output folder if specified (from master.py)
-                place_in = place_temp
-                if place_in:
-                    place_in = os.path.normpath(place_in)
-                    os.makedirs(place_in, exist_ok=True)
-                    place_in = place_in + os.sep
-                    if len(program_list) >1:
-                        place_in = os.path.normpath(place_in + f'{program}_output')
-                        os.makedirs(place_in, exist_ok=True)
-                        place_in = place_in + os.sep
-                else:
-                    place_in = os.path.normpath(os.getcwd() + os.sep + f'{program}_output')
-                    os.makedirs(place_in, exist_ok=True)
-                    place_in = place_in + os.sep
-                    
-                self.log_message(f"Output directory: {place_in}")
-                intermediary_file_list = []
-                output_files = []
-                tag_header_names = []  # Initialize for stacking functionality
-                tag_header_names_chunks = []
-                # Reset iteration counter for each program
-                current_iteration = 0
-                
-                for test in test_list:
-                    if not self.processing:
-                        break
-                        
-                    if str(test).lower() == 'nan':
-                        current_iteration += 1
-                        self.update_progress(current_iteration, total_iterations, f"Skipped invalid test entry")
-                        continue
-                        
-                    self.log_message(f"Processing test: {test} ({current_iteration + 1}/{total_iterations})")
-                    self.update_progress(current_iteration, total_iterations, f"Starting test: {test}")
-
-                    # Check if CLKUtils processing is enabled and test contains CLKUTILS
-                    if (hasattr(self, 'run_clkutils_var') and self.run_clkutils_var.get()):
-                        if 'CLKUTILS' in test.upper():
-                            # ClkUtils do not require mtpl parsing
-                            self.log_message(f"Processing ClkUtils for test: {test}")
-                            
-                            # Get config file path from user input
-                            config_file = self.clkutils_config_path.get().strip()
-                            if not config_file:
-                                # Fallback to default if empty
-                                config_file = 'configFile_DMR.json'
-                                self.log_message(f"No config file specified, using default: {config_file}")
-                            
-                            # Check if the specified config file exists
-                            if not os.path.exists(config_file):
-                                # If it's a relative path, try looking in the script directory
-                                if not os.path.isabs(config_file):
-                                    script_dir_config = os.path.join(os.path.dirname(__file__), config_file)
-                                    if os.path.exists(script_dir_config):
-                                        config_file = script_dir_config
-                                        self.log_message(f"Using config file from script directory: {script_dir_config}")
-                                    else:
-                                        # Try current working directory
-                                        cwd_config = os.path.join(os.getcwd(), config_file)
-                                        if os.path.exists(cwd_config):
-                                            config_file = cwd_config
-                                            self.log_message(f"Using config file from current directory: {cwd_config}")
-                                        else:
-                                            error_msg = (f"Error: Config file '{config_file}' not found!\n"
-                                                       f"Checked locations:\n"
-                                                       f"  • Specified path: {self.clkutils_config_path.get()}\n"
-                                                       f"  • Script directory: {script_dir_config}\n"
-                                                       f"  • Current directory: {cwd_config}\n"
-                                                       f"Please specify a valid config file path in the CLKUtils tab.")
-                                            self.log_message(error_msg, "error")
-                                            continue
-                                else:
-                                    error_msg = (f"Error: Config file '{config_file}' not found!\n"
-                                               f"Please specify a valid config file path in the CLKUtils tab.")
-                                    self.log_message(error_msg, "error")
-                                    continue
-                            else:
-                                self.log_message(f"Using config file: {os.path.abspath(config_file)}")
-                            
-                            bitbased = True
-                            indexed_file,tag_header_names = clk.process_json_to_csv(config_file,test,place_in,bitbased)
-                            tag_header_names_chunks.append(tag_header_names)
-                            intermediary_file_list.append(indexed_file)
-                            self.log_message(f"Performing data request for test: {test}")
-                            datainput_file,datacombine_file=py.uber_request(indexed_file,test,'ClkUtils',place_in,program, '', lot_list, wafer_list, prefetch, databases)
-                            intermediary_file_list.append(datainput_file)
-                            output_files.append(datacombine_file)
-                            current_iteration += 1
-                            self.update_progress(current_iteration, total_iterations, f"Completed test: {test}")
-                        continue
-                 
-                    # Find matching row in MTPL dataframe (enhanced from master.py)
-                    matching_rows = self.mtpl_df[self.mtpl_df.iloc[:, 1] == test]  # Assuming test name is in column 1
-                    
-                    if matching_rows.empty:
-                        self.log_message(f"No matching MTPL entry found for test: {test}")
-                        current_iteration += 1
-                        self.update_progress(current_iteration, total_iterations, f"Skipped test: {test} (no MTPL entry)")
-                        continue
-                        
-                    row = matching_rows.iloc[0]
-
-                    # Check for SIO and process user variables
-                    if 'sio' in row.iloc[2].lower():
-                        self.log_message(f"Processing SIO for test: {test}")
-                        
-                        # Extract the module name from the MTPL path to find the .usrv file
-                        mtpl_dir = os.path.dirname(mtpl_path)
-                        module_name_from_path = os.path.basename(mtpl_dir)
-                        usrv_file_path = os.path.join(mtpl_dir, f"{module_name_from_path}.usrv")
-                        
-                        if os.path.exists(usrv_file_path):
-                            self.log_message(f"Found .usrv file: {usrv_file_path}")
-                            
-                            # Parse the .usrv file and resolve the configuration file path
-                            try:
-                                resolved_config_path = self.resolve_sio_config_path(row.iloc[2], usrv_file_path, base_dir)
-                                if resolved_config_path:
-                                    self.log_message(f"Resolved SIO config path: {resolved_config_path}")
-                                    # Override the config_path for SIO processing
-                                    config_path = resolved_config_path.replace(base_dir, "").lstrip(os.sep)
-                                    config_path = config_path.replace("\\", "/")  # Normalize path separators
-                                else:
-                                    self.log_message(f"Failed to resolve SIO config path for: {row.iloc[2]}")
-                                    current_iteration += 1
-                                    self.update_progress(current_iteration, total_iterations, f"Skipped test: {test} (SIO config resolution failed)")
-                                    continue
-                            except Exception as e:
-                                self.log_message(f"Error processing SIO config: {str(e)}")
-                                current_iteration += 1
-                                self.update_progress(current_iteration, total_iterations, f"Skipped test: {test} (SIO processing error)")
-                                continue
-                        else:
-                            self.log_message(f"Warning: .usrv file not found: {usrv_file_path}")
-                            # Fall back to original processing
-                            config_path = fi.process_file_input(row.iloc[2][row.iloc[2].find('Modules'):].strip('\"'))
-                    else:
-                        # Original processing for non-SIO tests
-                        config_path = fi.process_file_input(row.iloc[2][row.iloc[2].find('Modules'):].strip('\"'))
-                     
-                    test_type = row.iloc[0]  # Assuming test type is in column 0
-                    mode = row.iloc[4]  # Assuming mode is in column 4
-                    mode=str(mode)
-                    module_name = fi.get_module_name(config_path).strip('\\').strip('//')
-                    test_file = os.path.join(base_dir, config_path)
-                    
-                    # Check if config file exists (from master.py)
-                    if not os.path.exists(test_file):
-                        self.log_message(f"Config file not found: {test_file}")
-                        current_iteration += 1
-                        self.update_progress(current_iteration, total_iterations, f"Skipped test: {test} (config file not found)")
-                        continue
-                        
-                    self.log_message(f"Found config file: {test_file}")
-                    self.update_progress(current_iteration + 0.2, total_iterations, f"Processing config for: {test}")
-                    
-                    # Enhanced processing based on test type (from master.py)
-                    indexed_file = ''
-                    csv_identifier = ''
-                    
-                    try:
-                        if "ctvdecoder" in test_type.lower():  # simple CTV indexing
-                            self.log_message(f"Processing CtvDecoderSpm for test: {test}")
-                            self.update_progress(current_iteration + 0.4, total_iterations, f"Indexing CTV for: {test}")
-                            indexed_file,csv_identifier,tag_header_names = ind.index_CTV(test_file, test,module_name,place_in)
-                            tag_header_names_chunks.append(tag_header_names)
-                            intermediary_file_list.append(indexed_file)
-                            self.log_message(f"Performing data request for test: {test}")
-                            datainput_file,datacombine_file = py.uber_request(indexed_file,test,test_type,place_in,program, csv_identifier,lot_list,wafer_list,prefetch,databases)
-                            intermediary_file_list.append(datainput_file)
-                            output_files.append(datacombine_file)
-
-                        elif "smartctv" in test_type.lower():  # SMART CTV loop/check logic and indexing
-                            if "ctvtag" in str(mode).lower():
-                                mode = mode.strip('\"\'')
-                                config_number = ''
-                                self.log_message(f"Processing CTV Tag SmartCtvDc for test: {test}")
-                                self.log_message(f"Config number: {config_number}")
-                                self.update_progress(current_iteration + 0.3, total_iterations, f"Processing SmartCTV for: {test}")
-                                try:
-                                    ctv_files, ITUFF_suffixes, config_numbers = sm.process_SmartCTV(base_dir, test_file, config_number, place_in)
-                                    for ctv_file, ITUFF_suffix in zip(ctv_files, ITUFF_suffixes):
-                                        intermediary_file_list.append(ctv_file)
-                                        test = test + ITUFF_suffix
-                                        self.update_progress(current_iteration + 0.6, total_iterations, f"Indexing SmartCTV for: {test}")
-                                        indexed_file,csv_identifier,tag_header_names = ind.index_CTV(ctv_file, test,module_name,place_in,mode,config_number)
-                                        tag_header_names_chunks.append(tag_header_names)
-                                        intermediary_file_list.append(indexed_file)
-                                        self.log_message(f"Performing data request for test: {test}")
-                                        # Set need_suffix to True for SmartCTV processing
-                                        need_suffix = True
-                                        datainput_file,datacombine_file = py.uber_request(indexed_file,test,test_type,place_in,program, csv_identifier,lot_list,wafer_list,prefetch,databases,config_number,mode)
-                                        intermediary_file_list.append(datainput_file)
-                                        output_files.append(datacombine_file)
-                                        test = test.replace(ITUFF_suffix, '')
-
-                                except Exception as e:
-                                    self.log_message(f"❌ Error in SmartCTV processing for test {test}: {str(e)}")
-                                    current_iteration += 1
-                                    self.update_progress(current_iteration, total_iterations, f"Failed test: {test} (SmartCTV error)")
-                                    continue
-                            else:
-                                config_number = str(int(row.iloc[3]))                    
-                                try:
-                                    ctv_file, ITUFF_suffixes, config_numbers = sm.process_SmartCTV(base_dir, test_file,config_number,place_in)
-                                    if isinstance(ctv_file,list):
-                                        ctv_file = ctv_file[0]  # Use the first file if multiple are returned
-                                        ITUFF_suffix = ITUFF_suffixes[0] 
-                                        test = test + ITUFF_suffix
-                                        config_numbers = config_numbers[0]
-                                except:
-                                    ctv_file = sm.process_SmartCTV(base_dir, test_file,config_number,place_in)
-                                    if isinstance(ctv_file,tuple):
-                                        ctv_file = ctv_file[0][0]
-                                # When config_number is provided, process_SmartCTV returns only the ctv_file path
-                                intermediary_file_list.append(ctv_file)
-                                self.update_progress(current_iteration + 0.6, total_iterations, f"Indexing SmartCTV for: {test}")
-                                indexed_file,csv_identifier,tag_header_names = ind.index_CTV(ctv_file, test,module_name,place_in)
-                                tag_header_names_chunks.append(tag_header_names)
-                                intermediary_file_list.append(indexed_file)
-                                self.log_message(f"Performing data request for test: {test}")
-                                # Set need_suffix to True for SmartCTV processing
-                                need_suffix = True
-                                datainput_file,datacombine_file = py.uber_request(indexed_file,test,test_type,place_in,program, csv_identifier,lot_list,wafer_list,prefetch,databases)
-                                intermediary_file_list.append(datainput_file)
-                                output_files.append(datacombine_file)
-                        else:
-                            self.log_message(f"Unknown test type: {test_type}")
-                            current_iteration += 1
-                            self.update_progress(current_iteration, total_iterations, f"Skipped test: {test} (unknown type)")
-                            continue
-                            
-                        if indexed_file:
-                         
-                            self.log_message(f"Completed processing for test: {test}")
-                        
-                    except Exception as test_error:
-                        self.log_message(f"Error processing test {test}: {str(test_error)}")
-                        
-                    # Update progress after each test
-                    current_iteration += 1
-                    self.update_progress(current_iteration, total_iterations, f"Completed test: {test}")
-                    
-                    # Add a small delay to make progress visible
-                    import time
-                    time.sleep(0.2)  # Slightly longer delay for visibility
-                
-                # Stack output files if requested (from master.py)
-                stacked_files = []
-                if output_files:
-                    self.log_message("Stacking output files for JMP...")
-                    try:
-                        import jmp_python as jmp
-                        for output_file, tag_header_names in zip(output_files, tag_header_names_chunks):
-                            if os.path.exists(output_file):
-                                self.log_message(f"Stacking file: {os.path.basename(output_file)}")
-                                stacked_file = jmp.stack_and_split_file(output_file, tag_header_names)
-                                stacked_files.append(stacked_file)
-                                self.log_message(f"Created stacked file: {os.path.basename(stacked_file)}")
-                        self.log_message(f"Successfully stacked {len(stacked_files)} files")
-                    except ImportError:
-                        self.log_message("Warning: jmp_python module not found - cannot stack files", "warning")
-                    except Exception as e:
-                        self.log_message(f"Error stacking files: {str(e)}", "error")
-                
-                # Run JMP on stacked files if requested (from master.py)
-                if self.run_jmp_var.get() and stacked_files:
-                    jmp_mode = getattr(self, 'jmp_mode_var', tk.StringVar()).get() or "unified_threaded"
-                    max_workers = getattr(self, 'max_workers_var', tk.IntVar()).get() or 3
-                    
-                    self.log_message(f"🚀 Starting JMP analysis in {jmp_mode} mode...")
-                    if jmp_mode == "parallel":
-                        self.log_message(f"🔧 Using {max_workers} concurrent JMP instances")
-                    
-                    try:
-                        import jmp_python as jmp
-                        jmp_executable_path = fi.find_latest_jmp_pro_path()
-                        
-                        if jmp_executable_path:
-                            self.log_message(f"Found JMP executable: {jmp_executable_path}")
-                            
-                            # Verify JMP executable exists and is accessible
-                            if not os.path.exists(jmp_executable_path):
-                                self.log_message(f"Error: JMP executable not found at {jmp_executable_path}", "error")
-                                return
-                            
-                            # Test JMP executable access
-                            try:
-                                import subprocess
-                                test_result = subprocess.run([jmp_executable_path, "-h"], 
-                                                           capture_output=True, timeout=10)
-                                self.log_message("JMP executable access test passed")
-                            except subprocess.TimeoutExpired:
-                                self.log_message("JMP executable test timed out (this may be normal)")
-                            except PermissionError as pe:
-                                self.log_message(f"Permission error accessing JMP: {pe}", "error")
-                                self.log_message("Try running as administrator or check JMP permissions", "warning")
-                                return
-                            except Exception as test_e:
-                                self.log_message(f"JMP access test warning: {test_e}", "warning")
-                            
-                            # Progress callback for threading modes
-                            def jmp_progress_callback(current, total, description):
-                                progress = (current / total) * 100
-                                self.root.after(0, lambda: self.log_message(f"� JMP Progress: {current}/{total} ({progress:.1f}%) - {description}"))
-                            
-                            try:
-                                # Get output folder for JSL scripts
-                                output_folder = place_in if place_in else os.getcwd()
-                                
-                                # Execute JMP with selected mode
-                                if jmp_mode == "parallel":
-                                    self.log_message(f"📊 Running {len(stacked_files)} JMP instances in parallel...")
-                                    results = jmp.run_jmp_with_options(
-                                        stacked_files, 
-                                        jmp_executable_path, 
-                                        mode="parallel", 
-                                        max_workers=max_workers,
-                                        progress_callback=jmp_progress_callback
-                                    )
-                                    
-                                    # Report results
-                                    success_count = sum(1 for r in results.values() if r["status"] == "success")
-                                    total_count = len(results)
-                                    
-                                    if success_count > 0:
-                                        self.log_message(f"✅ JMP Parallel Execution completed!")
-                                        self.log_message(f"📊 Successfully processed: {success_count}/{total_count} files")
-                                        self.log_message(f"🖥️ {success_count} JMP windows opened")
-                                        
-                                        if success_count < total_count:
-                                            self.log_message(f"⚠️ {total_count - success_count} files failed to process", "warning")
-                                    else:
-                                        self.log_message("❌ No files were processed successfully", "error")
-                                
-                                elif jmp_mode in ["unified", "unified_threaded"]:
-                                    self.log_message(f"� Processing {len(stacked_files)} files for unified JMP session...")
-                                    
-                                    success = jmp.run_jmp_with_options(
-                                        stacked_files, 
-                                        jmp_executable_path, 
-                                        mode=jmp_mode,
-                                        progress_callback=jmp_progress_callback
-                                    )
-                                    
-                                    if success:
-                                        self.log_message("🎯 JMP Unified Session launched successfully!")
-                                        self.log_message("💡 All your stacked files are now analyzed in one organized JMP session")
-                                        self.log_message(f"📊 {len(stacked_files)} datasets each have their own analysis window")
-                                        self.log_message("⚡ Resource efficient: Single JMP process instead of multiple instances")
-                                    else:
-                                        self.log_message("❌ Failed to launch JMP Unified Session", "error")
-                                        
-                            except Exception as jmp_e:
-                                self.log_message(f"Error during JMP execution: {jmp_e}", "error")
-                            
-                        else:
-                            self.log_message("JMP executable path not found - cannot run JMP", "warning")
-                            self.log_message("Please ensure JMP Pro is installed and accessible", "warning")
-                    except ImportError:
-                        self.log_message("Warning: Required modules not found - cannot run JMP", "warning")
-                    except Exception as e:
-                        self.log_message(f"Error running JMP: {str(e)}", "error")
-                        self.log_message(f"Error type: {type(e).__name__}", "error")
-                elif self.run_jmp_var.get() and not stacked_files:
-                    self.log_message("No stacked files available - cannot run JMP", "warning")
-                
-                # Clean up intermediary files if requested (from master.py)
-                if self.delete_files_var.get():
-                    self.log_message("Cleaning up intermediary files...")
-                    for intermediary in intermediary_file_list:
-                        try:
-                            if os.path.exists(intermediary) and not ( 'decoded.csv' in intermediary or "datastack" in intermediary ):
-                                os.remove(intermediary)
-                                self.log_message(f"Deleted: {os.path.basename(intermediary)}")
-                        except Exception as e:
-                            self.log_message(f"Could not delete {intermediary}: {str(e)}")
+            pipeline = pl.Pipeline(
+                self.mtpl_df, self.mtpl_file_path.get(),
+                material=getattr(self, 'material_data', None),
+                options=options,
+                tp_modules=self.tp_modules if self.tp_dir else None,
+                log=self.log_message,
+                progress=self.update_progress,
+                should_stop=lambda: not self.processing)
+            pipeline.run(test_list, place_in)
             
             if self.processing:
-                self.progress_var.set(100)
+                self.log_sink.progress(100)
                 self.log_message("Processing completed successfully!")
                 messagebox.showinfo("Success", "Data processing completed successfully!")
             
@@ -5394,6 +4771,12 @@ class CTVListGUI:
             self.processing = False
             self.root.after(0, lambda: self.stop_button.configure(state='disabled'))
             
+    def log_query_trace_summary(self):
+        """End the active query trace and write its summary table to the log"""
+        summary = qtr.end_run()
+        for line in summary.splitlines():
+            self.log_message(line)
+            
     def update_treeview_row_colors(self, treeview):
         """Update the row colors of the treeview to alternate between two colors"""
         try:
@@ -5406,7 +4789,7 @@ class CTVListGUI:
             print(f"Could not update treeview row colors: {e}")
     
     def log_message(self, message, level="info"):
-        """Add message to log with timestamp, formatting, and color coding"""
+        """Add message to log with timestamp, formatting, and color coding (safe from any thread)"""
         import datetime
         timestamp = datetime.datetime.now().strftime("%H:%M:%S")
         
@@ -5423,34 +4806,14 @@ class CTVListGUI:
         emoji = level_emojis.get(level, "ℹ️")
         formatted_message = f"[{timestamp}] {emoji} {message}\n"
         
-        try:
-            # Insert message with color coding based on level
-            start_index = self.log_text.index(tk.END + "-1c")
-            self.log_text.insert(tk.END, formatted_message)
-            
-            # Configure text tags for different log levels
-            if not hasattr(self, '_tags_configured'):
-                self.configure_log_tags()
-                self._tags_configured = True
-            
-            # Apply tag based on level
-            end_index = self.log_text.index(tk.END + "-1c")
-            if level in ["error"]:
-                self.log_text.tag_add("error", start_index, end_index)
-            elif level in ["warning"]:
-                self.log_text.tag_add("warning", start_index, end_index)
-            elif level in ["success"]:
-                self.log_text.tag_add("success", start_index, end_index)
-            elif level in ["progress"]:
-                self.log_text.tag_add("progress", start_index, end_index)
-                
-            self.log_text.see(tk.END)
-            self.root.update_idletasks()
-        except:
-            # Fallback to simple insertion
-            self.log_text.insert(tk.END, formatted_message)
-            self.log_text.see(tk.END)
-            self.root.update_idletasks()
+        if not hasattr(self, 'log_sink'):
+            # Log widget not created yet
+            print(formatted_message, end='')
+            return
+        
+        # Queued with its color tag; the Tk loop inserts queued messages in batches
+        tag = level if level in ["error", "warning", "success", "progress"] else None
+        self.log_sink.log(formatted_message, tag)
     
     def configure_log_tags(self):
         """Configure text tags for log message coloring with proper contrast"""
@@ -5478,6 +4841,8 @@ class CTVListGUI:
         self.mtpl_csv_path = ""
         self.mtpl_file_path = tk.StringVar()
         self.last_mtpl_path = ""  # 🔄 ADD THIS LINE
+        self.tp_dir = ""
+        self.tp_modules = {}
         self.test_list = []
         
         # Clear CLKUtils data
@@ -5491,13 +4856,13 @@ class CTVListGUI:
         # Clear displays
         for item in self.material_tree.get_children():
             self.material_tree.delete(item)
-        for item in self.mtpl_tree.get_children():
-            self.mtpl_tree.delete(item)
+        self.mtpl_view.clear()
+        self.mtpl_filter.set_index(None)
         
         # Clear CLKUtils display
-        if hasattr(self, 'clkutils_tree'):
-            for item in self.clkutils_tree.get_children():
-                self.clkutils_tree.delete(item)
+        if hasattr(self, 'clkutils_view'):
+            self.clkutils_view.clear()
+            self.clkutils_filter.set_index(None)
             
         # Clear entry fields
         self.mtpl_file_path.set("")
@@ -5559,174 +4924,6 @@ class CTVListGUI:
         """Check if a value is considered undefined (from master.py)"""
         return value is None or value == '' or value == '-'
         
-    def resolve_sio_config_path(self, config_expression, usrv_file_path, base_dir):
-        """
-        Parse the .usrv file and resolve the SIO configuration file path.
-        
-        Args:
-            config_expression: String like 'GetEnvironmentVariable("~HDMT_TP_BASE_DIR") + SIO_PCIE.inputFilePath + UCC.DNELB'
-            usrv_file_path: Path to the .usrv file
-            base_dir: Base directory for the project
-            
-        Returns:
-            Resolved absolute path to the configuration file
-        """
-        try:
-            # Parse the .usrv file to extract variable definitions
-            user_vars = self.parse_usrv_file(usrv_file_path)
-            
-            # Clean the config expression
-            config_expr = config_expression.strip().strip('"\'')
-            
-            self.log_message(f"Resolving SIO config: {config_expr}")
-            self.log_message(f"Base directory: {base_dir}")
-            
-            # Handle GetEnvironmentVariable("~HDMT_TP_BASE_DIR") - replace with base_dir
-            if 'GetEnvironmentVariable("~HDMT_TP_BASE_DIR")' in config_expr:
-                # Normalize the base_dir for UNC paths
-                normalized_base_dir = self.normalize_unc_path(base_dir)
-                config_expr = config_expr.replace('GetEnvironmentVariable("~HDMT_TP_BASE_DIR")', f'"{normalized_base_dir}"')
-                self.log_message(f"After base_dir replacement: {config_expr}")
-            
-            # Split the expression by '+' and process each part
-            parts = [part.strip() for part in config_expr.split('+')]
-            resolved_parts = []
-            
-            self.log_message(f"Processing parts: {parts}")
-            
-            for part in parts:
-                part = part.strip(' "\'')
-                self.log_message(f"Processing part: '{part}'")
-                
-                if part.startswith('"') and part.endswith('"'):
-                    # It's a literal string
-                    literal_value = part.strip('"')
-                    resolved_parts.append(literal_value)
-                    self.log_message(f"  -> Literal string: '{literal_value}'")
-                elif '.' in part and not part.startswith('\\\\'):
-                    # It's a variable reference like SIO_PCIE.inputFilePath or UCC.DNELB
-                    # But not a UNC path (which starts with \\)
-                    namespace, var_name = part.split('.', 1)
-                    if namespace in user_vars and var_name in user_vars[namespace]:
-                        var_value = user_vars[namespace][var_name].strip(' "\'')
-                        resolved_parts.append(var_value)
-                        self.log_message(f"  -> Variable {namespace}.{var_name}: '{var_value}'")
-                    else:
-                        self.log_message(f"Warning: Variable {part} not found in .usrv file")
-                        return None
-                else:
-                    # Direct reference or literal (including UNC paths that might have been substituted)
-                    resolved_parts.append(part)
-                    self.log_message(f"  -> Direct reference: '{part}'")
-            
-            # Join all parts to form the final path
-            resolved_path = ''.join(resolved_parts)
-            self.log_message(f"Joined path: '{resolved_path}'")
-            
-            # Normalize path separators and make it absolute
-            resolved_path = resolved_path.replace('/', os.sep)
-            
-            if not os.path.isabs(resolved_path):
-                resolved_path = os.path.join(base_dir, resolved_path)
-            
-            # Final normalization for UNC paths
-            resolved_path = self.normalize_unc_path(resolved_path)
-            
-            self.log_message(f"SIO config resolution: {config_expression} -> {resolved_path}")
-            
-            return resolved_path
-            
-        except Exception as e:
-            self.log_message(f"Error resolving SIO config path: {str(e)}")
-            return None
-    
-    def parse_usrv_file(self, usrv_file_path):
-        """
-        Parse a .usrv file and extract user variable definitions.
-        
-        Args:
-            usrv_file_path: Path to the .usrv file
-            
-        Returns:
-            Dictionary with namespace -> {variable_name: value}
-        """
-        user_vars = {}
-        current_namespace = None
-        
-        try:
-            with open(usrv_file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-            
-            # Split into lines and process
-            lines = content.split('\n')
-            in_namespace = False
-            brace_count = 0
-            
-            for line in lines:
-                line = line.strip()
-                
-                # Skip empty lines and comments
-                if not line or line.startswith('//') or line.startswith('#'):
-                    continue
-                
-                # Check for namespace declaration like "UserVars SIO_PCIE"
-                if line.startswith('UserVars ') and '{' in line:
-                    namespace_line = line.replace('UserVars ', '').replace('{', '').strip()
-                    current_namespace = namespace_line
-                    user_vars[current_namespace] = {}
-                    in_namespace = True
-                    brace_count = 1
-                    continue
-                elif line.startswith('UserVars '):
-                    namespace_line = line.replace('UserVars ', '').strip()
-                    current_namespace = namespace_line
-                    user_vars[current_namespace] = {}
-                    in_namespace = False
-                    continue
-                
-                # Handle opening braces
-                if '{' in line and not in_namespace:
-                    in_namespace = True
-                    brace_count = line.count('{')
-                    continue
-                
-                # Handle closing braces
-                if '}' in line:
-                    brace_count -= line.count('}')
-                    if brace_count <= 0:
-                        in_namespace = False
-                        current_namespace = None
-                    continue
-                
-                # Parse variable definitions inside namespace
-                if in_namespace and current_namespace and '=' in line:
-                    # Remove semicolon and split by =
-                    line = line.rstrip(';')
-                    
-                    # Handle different variable declaration formats
-                    if 'String ' in line:
-                        var_part = line.replace('String ', '').strip()
-                    elif 'Const String ' in line:
-                        var_part = line.replace('Const String ', '').strip()
-                    else:
-                        var_part = line.strip()
-                    
-                    if '=' in var_part:
-                        var_name, var_value = var_part.split('=', 1)
-                        var_name = var_name.strip()
-                        var_value = var_value.strip(' "\'')  # Remove quotes and spaces
-                        user_vars[current_namespace][var_name] = var_value
-            
-            self.log_message(f"Parsed .usrv file: {len(user_vars)} namespaces found")
-            for ns, vars_dict in user_vars.items():
-                self.log_message(f"  Namespace {ns}: {len(vars_dict)} variables")
-            
-            return user_vars
-            
-        except Exception as e:
-            self.log_message(f"Error parsing .usrv file {usrv_file_path}: {str(e)}")
-            return {}
-        
     def switch_to_light_mode(self, event=None):
         """Switch application to light mode with enhanced design consistency"""
         if not self.is_dark_mode:
@@ -6280,19 +5477,7 @@ class CTVListGUI:
                 
             # Refresh MTPL display if data exists  
             if hasattr(self, 'all_mtpl_items') and self.all_mtpl_items:
-                # Get current search text
-                search_text = self.search_var.get().lower() if hasattr(self, 'search_var') else ""
-                
-                if not search_text:
-                    filtered_items = self.all_mtpl_items
-                else:
-                    filtered_items = []
-                    for item_data in self.all_mtpl_items:
-                        item_text = ' '.join(str(val).lower() for val in item_data['values'][1:])
-                        if search_text in item_text:
-                            filtered_items.append(item_data)
-                            
-                self.display_filtered_items(filtered_items)
+                self.mtpl_view.refresh()
                 
             print("Debug - Force widget refresh completed")
             
@@ -3,7 +3,6 @@ import json
 import os
 import sys
 import re
-import winreg
 import pandas as pd
 
 def txt_to_list(file_path):
@@ -86,6 +85,47 @@ def process_file_input(input_string):
         # For regular paths, use standard normalization
         return os.path.normpath(raw_input)
 
+def get_app_data_dir(subfolder=''):
+    """Return (and create) the per-user Osmosis folder used for caches and learned settings."""
+    local_app_data = os.environ.get('LOCALAPPDATA')
+    if local_app_data:
+        app_dir = os.path.join(local_app_data, 'Osmosis', subfolder)
+    else:
+        app_dir = os.path.join(os.path.expanduser('~'), '.osmosis', subfolder)
+    os.makedirs(app_dir, exist_ok=True)
+    return app_dir
+
+def find_config_file():
+    """Locate config.json next to the sources, in the application root, or in the working directory."""
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    for folder in (src_dir, os.path.dirname(src_dir), os.getcwd()):
+        config_path = os.path.join(folder, 'config.json')
+        if os.path.exists(config_path):
+            return config_path
+    return None
+
+def load_config_section(section_name, defaults=None, config_path=None):
+    """
+    Read one section of config.json merged over its defaults.
+
+    Args:
+        section_name (str): Top-level key of config.json, e.g. 'pipeline'
+        defaults (dict, optional): Values for the keys the section does not set
+        config_path (str, optional): Explicit config.json path (searched for if omitted)
+
+    Returns:
+        dict: A new dict with the defaults updated by the section
+    """
+    section = dict(defaults or {})
+    config_path = config_path or find_config_file()
+    if config_path:
+        try:
+            with open(config_path, 'r') as config_file:
+                section.update(json.load(config_file).get(section_name, {}))
+        except (OSError, ValueError) as e:
+            print(f"Could not read {section_name} settings from {config_path}: {e}")
+    return section
+
 def get_file_extension(file_path):
     """Return the file extension of the given file path."""
     _, file_extension = os.path.splitext(file_path)
@@ -123,6 +163,8 @@ def delete_files(file_list):
             print(f"An error occurred while deleting {file}: {e}")
 
 def find_latest_jmp_pro_path():
+    import winreg  # Windows only, and only needed when JMP is started
+    
     locations = [
         r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall",
         r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall",
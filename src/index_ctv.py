@@ -31,6 +31,8 @@ import re                          # Regular expression operations for pattern m
 import xml.etree.ElementTree as ET # XML parsing (not currently used)
 import pandas as pd                # Data manipulation and analysis library
 import time                        # Time-related functions (not currently used)
+import tempfile                    # Scratch location for the per-call log file
+import threading                   # Thread id for the per-call log file name
 import file_functions as fi        # Custom file handling utilities
 
 def process_CTV(csv_input_file, log_file, test_name_prefix, MAX_VALUE_PRINT=1433):
@@ -271,7 +273,7 @@ def index_CTV(input_file, test_name, module_name='', place_in='', mode='', confi
             
     Side Effects:
         - Creates indexed CSV output file in specified directory
-        - Creates and removes temporary 'log.csv' file during processing
+        - Creates and removes a temporary log CSV (unique per process and thread) during processing
         - Prints completion message with output file path
         
     Processing Pipeline:
@@ -294,10 +296,14 @@ def index_CTV(input_file, test_name, module_name='', place_in='', mode='', confi
         
     # Step 1: Process the input CSV file and create temporary log file
     # This handles token replacement, sorting, and basic indexing
-    process_CTV(input_file, 'log.csv', test_name)
+    # The log file is unique per process and thread so tests can be indexed concurrently
+    log_file = os.path.join(tempfile.gettempdir(), f'ctv_index_log_{os.getpid()}_{threading.get_ident()}.csv')
+    if os.path.exists(log_file):
+        os.remove(log_file)  # Stale file from an interrupted run (process_CTV would pick another name)
+    process_CTV(input_file, log_file, test_name)
     
     # Step 2: Load processed data into pandas DataFrame for advanced manipulation
-    combined_df = pd.read_csv('log.csv')  # Read the temporary log file
+    combined_df = pd.read_csv(log_file)  # Read the temporary log file
     
     # Create composite identifier combining test name with index for uniqueness
     combined_df['Name_Index'] = combined_df['Name'] + '_' + combined_df['Index'].astype(str)
@@ -409,7 +415,7 @@ def index_CTV(input_file, test_name, module_name='', place_in='', mode='', confi
     print(out_file, "is indexed!")  # Confirm successful completion
     
     # Clean up temporary log file
-    os.remove('log.csv')  # Remove temporary processing file
+    os.remove(log_file)  # Remove temporary processing file
 
     # Step 7: Extract CSV identifier from input filename for return value
     # This helps identify the source file in downstream processing
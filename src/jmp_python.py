@@ -25,27 +25,61 @@ Last Updated: 2025-08-11
 """
 
 import pandas as pd
+import numpy as np
+import json
 import os
+import shutil
 import subprocess
 from pathlib import Path
-import winreg
 import file_functions as fi
 import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import queue
 
+# psutil is optional: without it the adaptive launcher sizes by CPU only and reports no RSS
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
 
-def create_jsl_script(csv_file_path):
+# ID columns kept on every stacked row; all other columns are '---' separated labels
+STACK_ID_COLUMNS = ['Lot_WafXY','LOT','WAFER_ID','SORT_X','SORT_Y','INTERFACE_BIN','FUNCTIONAL_BIN']
+# Unit rows melted per block by stack_and_split_file
+STACK_BLOCK_ROWS = 200
+# Stacked rows copied per block by combine_stacked_files
+COMBINE_BLOCK_ROWS = 200000
+# Quantiles written by summarize_stacked_file (column name -> probability)
+SUMMARY_QUANTILES = {'Q1': 0.25, 'Median': 0.5, 'Q3': 0.75}
+SUMMARY_STATISTICS = ['N', 'Mean', 'Std Dev', 'Min'] + list(SUMMARY_QUANTILES) + ['Max']
+
+# Cost model for run_jmp_adaptive_instances (JMP memory/time per MB of CSV)
+JMP_BASE_MEMORY_MB = 400
+JMP_MEMORY_PER_CSV_MB = 4
+JMP_BASE_TIMEOUT = 60
+JMP_SECONDS_PER_CSV_MB = 3
+JMP_MAX_TIMEOUT = 1800
+JMP_COMPACT_EXPANSION = 7
+JMP_MEMORY_HEADROOM = 0.8
+JMP_POLL_SECONDS = 0.5
+
+
+def create_jsl_script(csv_file_path, use_summary=False):
     """
     Create JSL (JMP Scripting Language) script for individual CSV file analysis.
     
     This function generates a JSL script that opens a CSV file in JMP and creates
     variability charts using columns between FUNCTIONAL_BIN and Data as label columns.
     The script includes enhanced column detection logic for better analysis setup.
+    Compact stacked files (*_datafacts.csv) are joined with their unit and label
+    tables on load.
     
     Args:
         csv_file_path (str): Absolute path to the CSV file to analyze
+        use_summary (bool, optional): Chart the per-level statistics computed by
+                                      summarize_stacked_file() instead of the raw rows;
+                                      the raw data and full chart open from a button
         
     Returns:
         str: Path to the created JSL script file
@@ -58,10 +92,7 @@ def create_jsl_script(csv_file_path):
         >>> print(f"JSL script created at: {jsl_path}")
     """
     # Create JSL code as a string
-    jsl_code = f"""
-Names Default To Here( 1 );
-dt = Open( "{csv_file_path}" );
-"""
+    jsl_code = _jsl_open_dataset(csv_file_path)
     jsl_code += """
 // Specify the column to be used for the y-axis
 yColumn = Column(dt, "Data");
@@ -121,6 +152,10 @@ Variability Chart(
     Summary Report()
 );
 """
+    if use_summary:
+        jsl_code = _jsl_summary_session(csv_file_path, jsl_code)
+    else:
+        jsl_code = "\nNames Default To Here( 1 );\n" + jsl_code
     # Save JSL code to a file
     jsl_file_path = f"{csv_file_path.replace('.csv', '')}.jsl"
     with open(jsl_file_path, "w") as file:
@@ -183,7 +218,50 @@ def run_jsl(csv_path, jmp_executable_path):
         raise
 
 
-def combine_stacked_files(stacked_file_list, output_folder=""):
+def _stacked_file_columns(file_path):
+    """Return the (expanded) stacked column names of a file from its header only."""
+    if is_compact_stacked_file(file_path):
+        label_header = pd.read_csv(compact_table_paths(file_path)['labels'], nrows=0).columns
+        return STACK_ID_COLUMNS + [col for col in label_header if col != 'Label_ID'] + ['Data']
+    return pd.read_csv(file_path, nrows=0).columns.tolist()
+
+
+def _stacked_label_columns(columns):
+    """Return the label columns of a stacked file: those between FUNCTIONAL_BIN and Data."""
+    if 'FUNCTIONAL_BIN' in columns and 'Data' in columns and columns.index('FUNCTIONAL_BIN') < columns.index('Data'):
+        return columns[columns.index('FUNCTIONAL_BIN') + 1:columns.index('Data')]
+    # Fallback: if column structure is different, use Label-containing columns
+    return [col for col in columns if 'Label' in col]
+
+
+def _iter_stacked_blocks(file_path, block_rows):
+    """Yield blocks of a stacked file as text columns, expanding compact files on the fly."""
+    if not is_compact_stacked_file(file_path):
+        yield from pd.read_csv(file_path, dtype=str, chunksize=block_rows)
+        return
+    paths = compact_table_paths(file_path)
+    units = pd.read_csv(paths['units'], dtype=str)
+    label_table = pd.read_csv(paths['labels'], dtype=str)
+    for facts in pd.read_csv(file_path, dtype=str, chunksize=block_rows):
+        yield facts.merge(units, on='Unit_ID', how='left').merge(label_table, on='Label_ID', how='left')
+
+
+def _write_combined_part(file_index, file_path, columns, part_path, block_rows):
+    """Copy one stacked file into a header-less part file with the combined schema; returns the row count."""
+    source_name = os.path.splitext(os.path.basename(file_path))[0]
+    rows = 0
+    with open(part_path, 'w', newline='') as part_file:
+        for block in _iter_stacked_blocks(file_path, block_rows):
+            block = block.reindex(columns=columns)
+            # Add a source file identifier column
+            block['Source_File'] = source_name
+            block['File_Index'] = file_index
+            block.to_csv(part_file, header=False, index=False)
+            rows += len(block)
+    return rows
+
+
+def combine_stacked_files(stacked_file_list, output_folder="", max_workers=4, block_rows=COMBINE_BLOCK_ROWS):
     """
     Combine multiple stacked CSV files into a single master CSV for unified JMP analysis.
     
@@ -195,6 +273,8 @@ def combine_stacked_files(stacked_file_list, output_folder=""):
         stacked_file_list (list): List of paths to CSV files to combine
         output_folder (str, optional): Directory for output file. Uses first file's 
                                      directory if not specified.
+        max_workers (int, optional): Number of files read and converted in parallel
+        block_rows (int, optional): Rows read per block from each file
         
     Returns:
         str or None: Path to the combined CSV file, or None if combination fails
@@ -204,6 +284,15 @@ def combine_stacked_files(stacked_file_list, output_folder=""):
         - Handles missing files gracefully with error logging
         - Generates unique output filenames to prevent overwrites
         - Provides detailed file breakdown summary
+        - Streaming: files are never loaded whole, memory stays at one block per worker
+        
+    Streaming Workflow:
+        1. Union schema from the file headers only (columns in order of first
+           appearance, Data last, then Source_File and File_Index)
+        2. Each file is copied block by block into a temporary part file with the
+           missing columns left empty (parallel across files)
+        3. Part files are appended to a temporary combined file in input order,
+           which replaces the output only if at least one file was added
         
     Example:
         >>> files = ["data1.csv", "data2.csv", "data3.csv"]
@@ -214,38 +303,27 @@ def combine_stacked_files(stacked_file_list, output_folder=""):
         print("No stacked files to combine")
         return None
     
-    combined_data = []
-    file_source_mapping = []
-    
+    # Pass 1: union schema from the headers
+    valid_files = []
+    columns = []
     for i, file_path in enumerate(stacked_file_list):
         try:
             if os.path.exists(file_path):
-                print(f"Reading {os.path.basename(file_path)}...")
-                df = pd.read_csv(file_path)
-                
-                # Add a source file identifier column
-                df['Source_File'] = os.path.splitext(os.path.basename(file_path))[0]
-                df['File_Index'] = i + 1
-                
-                combined_data.append(df)
-                file_source_mapping.append({
-                    'file_index': i + 1,
-                    'filename': os.path.basename(file_path),
-                    'full_path': file_path,
-                    'rows': len(df)
-                })
-                print(f"  Added {len(df)} rows from {os.path.basename(file_path)}")
-                
+                file_columns = _stacked_file_columns(file_path)
+                columns.extend(col for col in file_columns if col not in columns)
+                valid_files.append((i + 1, file_path))
         except Exception as e:
             print(f"Error reading {file_path}: {e}")
             continue
     
-    if not combined_data:
+    if not valid_files:
         print("No valid data found in stacked files")
         return None
     
-    # Combine all dataframes
-    master_df = pd.concat(combined_data, ignore_index=True, sort=False)
+    if 'Data' in columns:
+        columns.remove('Data')
+        columns.append('Data')
+    columns = [col for col in columns if col not in ('Source_File', 'File_Index')]
     
     # Generate output filename
     if output_folder:
@@ -258,11 +336,51 @@ def combine_stacked_files(stacked_file_list, output_folder=""):
     # Ensure unique filename
     output_file = fi.check_write_permission(output_file)
     
-    # Save combined data
-    master_df.to_csv(output_file, index=False)
+    # Pass 2: convert every file into a part file in parallel
+    part_paths = {file_index: f"{output_file}.part{file_index}.tmp" for file_index, _ in valid_files}
+    combined_path = f"{output_file}.tmp"
+    file_source_mapping = []
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = [(file_index, file_path,
+                        executor.submit(_write_combined_part, file_index, file_path, columns,
+                                        part_paths[file_index], block_rows))
+                       for file_index, file_path in valid_files]
+            
+            # Pass 3: append the parts in input order
+            with open(combined_path, 'w', newline='') as outfile:
+                pd.DataFrame(columns=columns + ['Source_File', 'File_Index']).to_csv(outfile, index=False)
+                for file_index, file_path, future in futures:
+                    try:
+                        rows = future.result()
+                    except Exception as e:
+                        print(f"Error reading {file_path}: {e}")
+                        continue
+                    with open(part_paths[file_index], 'r', newline='') as part_file:
+                        shutil.copyfileobj(part_file, outfile)
+                    file_source_mapping.append({
+                        'file_index': file_index,
+                        'filename': os.path.basename(file_path),
+                        'full_path': file_path,
+                        'rows': rows
+                    })
+                    print(f"  Added {rows} rows from {os.path.basename(file_path)}")
+        if file_source_mapping:
+            os.replace(combined_path, output_file)
+    finally:
+        for part_path in list(part_paths.values()) + [combined_path]:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+    
+    if not file_source_mapping:
+        # check_write_permission left an empty output file behind
+        if os.path.exists(output_file):
+            os.remove(output_file)
+        print("No valid data found in stacked files")
+        return None
     
     # Print summary
-    total_rows = len(master_df)
+    total_rows = sum(mapping['rows'] for mapping in file_source_mapping)
     total_files = len(file_source_mapping)
     print(f"\nCombined {total_files} files into {os.path.basename(output_file)}")
     print(f"Total rows: {total_rows}")
@@ -273,7 +391,7 @@ def combine_stacked_files(stacked_file_list, output_folder=""):
     return output_file
 
 
-def create_combined_jsl_script(combined_csv_path):
+def create_combined_jsl_script(combined_csv_path, use_summary=False):
     """
     Generate comprehensive JSL script for analyzing combined CSV data from multiple sources.
     
@@ -284,6 +402,9 @@ def create_combined_jsl_script(combined_csv_path):
     
     Args:
         combined_csv_path (str): Path to the combined CSV file to analyze
+        use_summary (bool, optional): Start from a chart of the per-level statistics
+                                      computed in Python (by Source_File and label);
+                                      the full analysis below runs from a button
         
     Returns:
         str: Path to the created JSL script file
@@ -308,9 +429,7 @@ def create_combined_jsl_script(combined_csv_path):
         >>> print(f"Combined analysis script: {jsl_path}")
     """
     # Create enhanced JSL code for combined data analysis
-    jsl_code = f"""
-Names Default To Here( 1 );
-
+    analysis_jsl = f"""
 // Open the combined dataset
 dt = Open( "{combined_csv_path}" );
 
@@ -465,6 +584,10 @@ Print( "  3. Data Distribution - Statistical analysis" );
 Print( "  4. Distribution by Source - Per-file statistics" );
 Print( "  5. Summary Table - Numerical summary by source file" );
 """
+    if use_summary:
+        jsl_code = _jsl_summary_session(combined_csv_path, analysis_jsl, "Combined CTV Data Analysis")
+    else:
+        jsl_code = "\nNames Default To Here( 1 );\n" + analysis_jsl
     
     # Save JSL code to a file
     jsl_file_path = "combined_variability_script.jsl"
@@ -543,7 +666,7 @@ def run_combined_jsl(combined_csv_path, jmp_executable_path):
         raise
 
 
-def create_multiple_jsl_scripts(stacked_files, output_folder=""):
+def create_multiple_jsl_scripts(stacked_files, output_folder="", use_summary=False):
     """
     Create individual JSL scripts for multiple stacked files without executing them.
     
@@ -555,6 +678,7 @@ def create_multiple_jsl_scripts(stacked_files, output_folder=""):
     Args:
         stacked_files (list): List of paths to stacked CSV files
         output_folder (str, optional): Directory for JSL script output
+        use_summary (bool, optional): Chart Python-computed summaries (see create_jsl_script)
         
     Returns:
         list: Paths to successfully created JSL script files
@@ -588,7 +712,7 @@ def create_multiple_jsl_scripts(stacked_files, output_folder=""):
         try:
             if os.path.exists(stacked_file):
                 print(f"Creating JSL script for: {os.path.basename(stacked_file)}")
-                jsl_file_path = create_jsl_script(stacked_file)
+                jsl_file_path = create_jsl_script(stacked_file, use_summary)
                 jsl_scripts.append(jsl_file_path)
                 print(f"✅ JSL script created: {os.path.basename(jsl_file_path)}")
             else:
@@ -833,7 +957,49 @@ def stack_file(unstacked_input_file):
     return stacked_data_out_file
 
 
-def stack_and_split_file(unstacked_input_file, label_column_names=None):
+def _label_column_names(num_split_cols, label_column_names=None):
+    """Return the names of the split label columns (custom names extended with LabelN defaults)."""
+    if not label_column_names:
+        return ["Label" + str(i + 1) for i in range(num_split_cols)]
+    if len(label_column_names) < num_split_cols:
+        # Extend with default names if not enough provided
+        return label_column_names + [f"Label{i+len(label_column_names)+1}"
+                                     for i in range(num_split_cols - len(label_column_names))]
+    # Use only the needed number of names
+    return label_column_names[:num_split_cols]
+
+
+def build_label_lookup(labels):
+    """
+    Split each distinct '---' label once into a tuple of label fields.
+
+    Args:
+        labels (list): Data column names of an unstacked file
+
+    Returns:
+        tuple: (dict label -> padded tuple of fields, number of split columns)
+    """
+    split_labels = {label: str(label).split('---') for label in labels}
+    num_split_cols = max((len(parts) for parts in split_labels.values()), default=1)
+    # Pad short labels with None like str.split(expand=True) does
+    lookup = {label: tuple(parts) + (None,) * (num_split_cols - len(parts))
+              for label, parts in split_labels.items()}
+    return lookup, num_split_cols
+
+
+def _stack_layout(unstacked_input_file, label_column_names=None):
+    """Read the header of an unstacked file and return (labels, split column names, label lookup)."""
+    # Labels are the column names, so the split lookup only needs the header
+    columns = pd.read_csv(unstacked_input_file, nrows=0).columns.tolist()
+    missing_ids = [col for col in STACK_ID_COLUMNS if col not in columns]
+    if missing_ids:
+        raise KeyError(f"{unstacked_input_file} is missing ID columns: {missing_ids}")
+    labels = [col for col in columns if col not in STACK_ID_COLUMNS]
+    lookup, num_split_cols = build_label_lookup(labels)
+    return labels, _label_column_names(num_split_cols, label_column_names), lookup
+
+
+def stack_and_split_file(unstacked_input_file, label_column_names=None, block_rows=STACK_BLOCK_ROWS):
     """
     Advanced stacking function with custom label column naming support.
     
@@ -844,6 +1010,7 @@ def stack_and_split_file(unstacked_input_file, label_column_names=None):
     Args:
         unstacked_input_file (str): Path to the unstacked CSV file
         label_column_names (list, optional): Custom names for label columns
+        block_rows (int, optional): Number of unit rows melted per block
         
     Returns:
         str: Path to the created stacked and split CSV file
@@ -853,6 +1020,15 @@ def stack_and_split_file(unstacked_input_file, label_column_names=None):
         - Automatic name extension if insufficient names provided
         - Preserves all original ID variables
         - Intelligent file naming with write permission checking
+        - Streaming: peak memory is proportional to one block, not the whole file
+        
+    Streaming Behavior:
+        - The unstacked file is read in blocks of block_rows units (as text, values
+          are copied unchanged)
+        - Each distinct label is split on '---' once, from the header, instead of
+          once per stacked row
+        - Each melted block is appended to the stacked file, so rows are grouped
+          by unit block first and label second
         
     Label Column Handling:
         - If label_column_names provided: Uses custom names for split columns
@@ -871,44 +1047,443 @@ def stack_and_split_file(unstacked_input_file, label_column_names=None):
     """
     stacked_data_out_file = str(unstacked_input_file).replace("dataoutput", "datastacked")
     stacked_data_out_file = fi.check_write_permission(stacked_data_out_file)
-    df = pd.read_csv(unstacked_input_file)
     
-    # Melt the dataframe to stack it
-    df_stacked = df.melt(id_vars=['Lot_WafXY','LOT','WAFER_ID','SORT_X','SORT_Y','INTERFACE_BIN','FUNCTIONAL_BIN'], 
-                        var_name='Label', value_name='Data')
+    labels, split_names, lookup = _stack_layout(unstacked_input_file, label_column_names)
+    label_fields = [np.array([lookup[label][i] for label in labels], dtype=object)
+                    for i in range(len(split_names))]
+    
+    total_rows = 0
+    with open(stacked_data_out_file, 'w', newline='') as outfile:
+        first_block = True
+        for block in pd.read_csv(unstacked_input_file, dtype=str, chunksize=max(1, int(block_rows))):
+            unit_count = len(block)
+            # Same layout as df.melt: all units for the first label, then the next label...
+            stacked = {col: np.tile(block[col].to_numpy(dtype=object), len(labels)) for col in STACK_ID_COLUMNS}
+            for name, fields in zip(split_names, label_fields):
+                stacked[name] = np.repeat(fields, unit_count)
+            stacked['Data'] = block[labels].to_numpy(dtype=object).T.reshape(-1)
+            pd.DataFrame(stacked).to_csv(outfile, header=first_block, index=False)
+            first_block = False
+            total_rows += unit_count * len(labels)
+        
+        if first_block:
+            # No units - write the header only
+            pd.DataFrame(columns=STACK_ID_COLUMNS + split_names + ['Data']).to_csv(outfile, index=False)
+    
+    print(f"{stacked_data_out_file} has been stacked and split! ({total_rows} rows)")
+    return stacked_data_out_file
+
+
+def compact_table_paths(facts_file):
+    """Return the unit and label table paths that belong to a compact facts file."""
+    folder, name = os.path.split(str(facts_file))
+    return {
+        'facts': str(facts_file),
+        'units': os.path.join(folder, name.replace('datafacts', 'dataunits')),
+        'labels': os.path.join(folder, name.replace('datafacts', 'datalabels')),
+    }
+
+
+def is_compact_stacked_file(file_path):
+    """True if file_path is the facts table of a compact stacked output."""
+    return 'datafacts' in os.path.basename(str(file_path))
+
+
+def stack_to_compact_files(unstacked_input_file, label_column_names=None, block_rows=STACK_BLOCK_ROWS):
+    """
+    Stack an unstacked CSV into a compact set of units, labels and facts tables.
+    
+    Instead of repeating the ID columns and every split label string on each stacked
+    row, the compact format stores each unit and each distinct label once and keeps
+    only integer keys plus the value in the long table:
     
-    # Split the Label column by '---'
-    label_split = df_stacked['Label'].str.split('---', expand=True)
+        *_dataunits.csv   Unit_ID, Lot_WafXY, LOT, WAFER_ID, SORT_X, SORT_Y, INTERFACE_BIN, FUNCTIONAL_BIN
+        *_datalabels.csv  Label_ID, Label1..LabelN (or the custom label names)
+        *_datafacts.csv   Unit_ID, Label_ID, Data
     
-    # Apply custom column names if provided
-    if label_column_names:
-        # Ensure we have enough names for all split columns
-        num_split_cols = label_split.shape[1]
-        if len(label_column_names) < num_split_cols:
-            # Extend with default names if not enough provided
-            extended_names = label_column_names + [f"Label{i+len(label_column_names)+1}" 
-                                                  for i in range(num_split_cols - len(label_column_names))]
-            label_split.columns = extended_names
-        else:
-            # Use only the needed number of names
-            label_split.columns = label_column_names[:num_split_cols]
+    The JSL generated by create_jsl_script joins the unit and label tables back onto
+    the facts table when the file is opened, so the JMP analysis sees the same
+    columns as for a regular stacked file.
+    
+    Args:
+        unstacked_input_file (str): Path to the unstacked CSV file
+        label_column_names (list, optional): Custom names for label columns
+        block_rows (int, optional): Number of unit rows processed per block
+        
+    Returns:
+        str: Path to the facts table (see compact_table_paths() for the others)
+        
+    Notes:
+        - Streams in blocks like stack_and_split_file, values are copied unchanged
+        - Facts with an empty Data value are not written (they carry no data points)
+        
+    Example:
+        >>> facts_file = stack_to_compact_files("test_dataoutput.csv", ["Tag", "Corner"])
+        >>> print(compact_table_paths(facts_file)['labels'])
+        # Output: "test_datalabels.csv"
+    """
+    unstacked_input_file = str(unstacked_input_file)
+    if 'dataoutput' in os.path.basename(unstacked_input_file):
+        facts_file = unstacked_input_file.replace("dataoutput", "datafacts")
     else:
-        # Use default naming
-        label_split.columns = ["Label" + str(i + 1) for i in range(label_split.shape[1])]
+        base, ext = os.path.splitext(unstacked_input_file)
+        facts_file = f"{base}_datafacts{ext}"
+    facts_file = fi.check_write_permission(facts_file)
+    paths = compact_table_paths(facts_file)
+    
+    labels, split_names, lookup = _stack_layout(unstacked_input_file, label_column_names)
+    label_ids = np.arange(1, len(labels) + 1)
+    label_table = pd.DataFrame([lookup[label] for label in labels], columns=split_names)
+    label_table.insert(0, 'Label_ID', label_ids)
+    label_table.to_csv(paths['labels'], index=False)
+    
+    unit_count = 0
+    fact_count = 0
+    with open(paths['units'], 'w', newline='') as units_out, open(facts_file, 'w', newline='') as facts_out:
+        first_block = True
+        for block in pd.read_csv(unstacked_input_file, dtype=str, chunksize=max(1, int(block_rows))):
+            unit_ids = np.arange(unit_count + 1, unit_count + len(block) + 1)
+            units = block[STACK_ID_COLUMNS].copy()
+            units.insert(0, 'Unit_ID', unit_ids)
+            units.to_csv(units_out, header=first_block, index=False)
+            
+            facts = pd.DataFrame({
+                'Unit_ID': np.tile(unit_ids, len(labels)),
+                'Label_ID': np.repeat(label_ids, len(block)),
+                'Data': block[labels].to_numpy(dtype=object).T.reshape(-1),
+            })
+            facts = facts[facts['Data'].notna()]
+            facts.to_csv(facts_out, header=first_block, index=False)
+            
+            first_block = False
+            unit_count += len(block)
+            fact_count += len(facts)
+        
+        if first_block:
+            # No units - write the headers only
+            pd.DataFrame(columns=['Unit_ID'] + STACK_ID_COLUMNS).to_csv(units_out, index=False)
+            pd.DataFrame(columns=['Unit_ID', 'Label_ID', 'Data']).to_csv(facts_out, index=False)
+    
+    print(f"{facts_file} has been stacked in compact form! "
+          f"({unit_count} units, {len(labels)} labels, {fact_count} facts)")
+    return facts_file
+
+
+def _jsl_open_dataset(csv_file_path, table_variable="dt"):
+    """JSL snippet that opens a stacked CSV, joining the unit/label tables for compact files."""
+    if not is_compact_stacked_file(csv_file_path):
+        return f'{table_variable} = Open( "{csv_file_path}" );\n'
+    paths = compact_table_paths(csv_file_path)
+    table_name = os.path.splitext(os.path.basename(csv_file_path))[0].replace('datafacts', 'datastacked')
+    return f"""{table_variable} = Open( "{paths['facts']}" );
+dtUnits = Open( "{paths['units']}", Invisible );
+dtLabels = Open( "{paths['labels']}", Invisible );
+// Compact stacked file: join the unit and label tables back onto the facts
+{table_variable} << Update( With( dtUnits ), Match Columns( :Unit_ID = :Unit_ID ) );
+{table_variable} << Update( With( dtLabels ), Match Columns( :Label_ID = :Label_ID ) );
+Close( dtUnits, NoSave );
+Close( dtLabels, NoSave );
+// Keep the stacked layout (labels between FUNCTIONAL_BIN and Data)
+{table_variable} << Move Selected Columns( {{"Data"}}, To Last );
+{table_variable} << Set Name( "{table_name}" );
+"""
+
+
+def _manifest_path(csv_file_path):
+    return f"{os.path.splitext(str(csv_file_path))[0]}.manifest.json"
+
+
+def build_dataset_manifest(csv_file_path, block_rows=COMBINE_BLOCK_ROWS):
+    """
+    Precompute the column types and label cardinalities JMP would otherwise scan for.
     
-    # Get the data column
-    df_data = df_stacked['Data']
+    The stacked file is read once in blocks. Every column is classified as Numeric
+    (all non-empty values parse as numbers) or Character, and the number of distinct
+    values (empty counted as a value, like JMP's Associative Array) is counted for the
+    label columns between FUNCTIONAL_BIN and Data. Label columns with at least two
+    values become the X columns of the variability chart.
     
-    # Remove original Label and Data columns
-    df_stacked = df_stacked.drop(columns=['Label','Data'])
+    Args:
+        csv_file_path (str): Path to a stacked (or compact facts) CSV file
+        block_rows (int, optional): Rows read per block
+        
+    Returns:
+        dict: Manifest, also written next to the file as <name>.manifest.json
+        
+    Manifest Structure:
+        - dataset: path of the CSV file
+        - rows: number of data rows
+        - columns: list of {name, data_type, modeling_type}
+        - label_cardinality: {label column: distinct value count}
+        - x_columns: label columns used for the variability chart
+        - y_column: 'Data'
+    """
+    columns = _stacked_file_columns(csv_file_path)
+    label_columns = _stacked_label_columns(columns)
+    
+    numeric = {col: True for col in columns}
+    unique_values = {col: set() for col in label_columns}
+    rows = 0
+    for block in _iter_stacked_blocks(csv_file_path, block_rows):
+        rows += len(block)
+        for col in columns:
+            values = block[col]
+            if numeric[col]:
+                non_empty = values.dropna()
+                if len(non_empty) and pd.to_numeric(non_empty, errors='coerce').isna().any():
+                    numeric[col] = False
+            if col in unique_values:
+                unique_values[col].update(values.fillna('').unique())
+    
+    manifest = {
+        'dataset': str(csv_file_path),
+        'rows': rows,
+        'columns': [{'name': col,
+                     'data_type': 'Numeric' if numeric[col] else 'Character',
+                     'modeling_type': 'Continuous' if numeric[col] else 'Nominal'}
+                    for col in columns],
+        'label_cardinality': {col: len(values) for col, values in unique_values.items()},
+        'x_columns': [col for col in label_columns if len(unique_values[col]) >= 2],
+        'y_column': 'Data',
+    }
+    with open(_manifest_path(csv_file_path), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    return manifest
+
+
+def _jsl_open_with_manifest(csv_file_path, manifest, table_variable="dt"):
+    """JSL Open() with explicit column types, so JMP does not scan the file to guess them."""
+    if is_compact_stacked_file(csv_file_path):
+        # Compact files are assembled from three tables; the join needs the regular open
+        return _jsl_open_dataset(csv_file_path, table_variable)
+    column_specs = []
+    for column in manifest['columns']:
+        if column['data_type'] == 'Numeric':
+            column_specs.append(f'        New Column( "{column["name"]}", Numeric, "{column["modeling_type"]}", Format( "Best", 12 ) )')
+        else:
+            column_specs.append(f'        New Column( "{column["name"]}", Character, "{column["modeling_type"]}" )')
+    column_block = ',\n'.join(column_specs)
+    return f"""{table_variable} = Open( "{csv_file_path}",
+    columns(
+{column_block}
+    ),
+    Import Settings(
+        End Of Line( CRLF, CR, LF ),
+        End Of Field( Comma ),
+        Strip Quotes( 1 ),
+        Use Apostrophe as Quotation Mark( 0 ),
+        Scan Whole File( 0 ),
+        Labels( 1 ),
+        Column Names Start( 1 ),
+        Data Starts( 2 ),
+        Lines To Read( "All" ),
+        Year Rule( "20xx" )
+    )
+);
+"""
+
+
+def create_manifest_jsl_script(csv_file_path):
+    """
+    Create a JSL script that opens a stacked CSV using a precomputed dataset manifest.
     
-    # Concatenate everything together
-    df_stacked = pd.concat([df_stacked, label_split, df_data], axis=1)
+    Same variability chart as create_jsl_script, but the column types and the label
+    columns come from build_dataset_manifest(): JMP opens the file with explicit
+    column types and skips the Get Values / Associative Array loops over every
+    label column, which dominate load time for large sessions.
     
-    # Save to CSV
-    df_stacked.to_csv(stacked_data_out_file, index=False)
-    print(f"{stacked_data_out_file} has been stacked and split!")
-    return stacked_data_out_file
+    Args:
+        csv_file_path (str): Absolute path to the CSV file to analyze
+        
+    Returns:
+        str: Path to the created JSL script file
+        
+    Example:
+        >>> jsl_path = create_manifest_jsl_script("data/test_datastacked.csv")
+        >>> print(f"JSL script created at: {jsl_path}")
+    """
+    manifest = build_dataset_manifest(csv_file_path)
+    x_columns = ', '.join(f'Column( dt, "{col}" )' for col in manifest['x_columns'])
+    cardinality = ', '.join(f"{col}={count}" for col, count in manifest['label_cardinality'].items())
+    
+    jsl_code = f"""
+Names Default To Here( 1 );
+{_jsl_open_with_manifest(csv_file_path, manifest)}
+// Label columns precomputed by Python ({cardinality})
+yColumn = Column( dt, "{manifest['y_column']}" );
+xColumns = {{{x_columns}}};
+
+Show(xColumns);
+
+// Create a variability chart using the specified y-axis and x-axis columns with point jitter
+Variability Chart(
+    Y(yColumn),
+    X(Eval List(xColumns)),
+    Data Table(dt),
+    Points Jitter(1), // Add point jitter with a specified amount
+	Show Averages(),
+    Summary Report()
+);
+"""
+    jsl_file_path = f"{csv_file_path.replace('.csv', '')}.jsl"
+    with open(jsl_file_path, "w") as file:
+        file.write(jsl_code)
+
+    print(f"JSL script created at: {jsl_file_path} ({manifest['rows']} rows, {len(manifest['x_columns'])} label columns)")
+    return jsl_file_path
+
+
+def summary_table_path(csv_file_path):
+    """Return the path of the per-level summary table written next to a stacked file."""
+    folder, name = os.path.split(str(csv_file_path))
+    for marker in ('datastacked', 'datafacts'):
+        if marker in name:
+            return os.path.join(folder, name.replace(marker, 'datasummary'))
+    base, ext = os.path.splitext(name)
+    return os.path.join(folder, f"{base}_datasummary{ext}")
+
+
+def _group_statistics(group_codes, values, group_count):
+    """Vectorized N/Mean/Std Dev/Min/quantiles/Max per group code (quantiles as JMP computes them)."""
+    if not len(values):
+        return pd.DataFrame(columns=SUMMARY_STATISTICS)
+    counts = np.bincount(group_codes, minlength=group_count)
+    means = np.bincount(group_codes, weights=values, minlength=group_count) / counts
+    squared = np.bincount(group_codes, weights=(values - means[group_codes]) ** 2, minlength=group_count)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std_devs = np.where(counts > 1, np.sqrt(squared / np.maximum(counts - 1, 1)), np.nan)
+    
+    # Sort once by group then value; each group is then a contiguous sorted run
+    sorted_values = values[np.lexsort((values, group_codes))]
+    starts = np.cumsum(counts) - counts
+    statistics = {'N': counts, 'Mean': means, 'Std Dev': std_devs, 'Min': sorted_values[starts]}
+    for name, probability in SUMMARY_QUANTILES.items():
+        # JMP uses the (n + 1) * p rank, clamped to the first/last value
+        rank = np.clip((counts + 1) * probability, 1, counts)
+        lower = np.floor(rank).astype(np.int64)
+        upper = np.minimum(lower + 1, counts)
+        lower_values = sorted_values[starts + lower - 1]
+        statistics[name] = lower_values + (rank - lower) * (sorted_values[starts + upper - 1] - lower_values)
+    statistics['Max'] = sorted_values[starts + counts - 1]
+    return pd.DataFrame(statistics)
+
+
+def summarize_stacked_file(csv_file_path, block_rows=COMBINE_BLOCK_ROWS):
+    """
+    Compute the per-level statistics of a stacked file in Python, before JMP sees it.
+    
+    Rows are grouped by every label column (plus Source_File for combined files)
+    and the count, mean, standard deviation, min, quartiles and max of the numeric
+    Data values are written to a small side table (*_datasummary.csv). This is
+    the aggregation the Variability Chart Summary Report would otherwise do over
+    every raw row inside JMP.
+    
+    Args:
+        csv_file_path (str): Path to a stacked (or compact facts) CSV file
+        block_rows (int, optional): Rows read per block
+        
+    Returns:
+        str: Path to the summary table
+        
+    Notes:
+        - Only the label and Data columns are read; values that are empty or not
+          numeric are left out, like JMP does for a continuous Y
+        - Compact files are grouped on Label_ID and joined with the label table
+        - Quantiles use JMP's definition, so the numbers match its reports
+        
+    Example:
+        >>> summary_file = summarize_stacked_file("test_datastacked.csv")
+        >>> print(summary_file)
+        # Output: "test_datasummary.csv"
+    """
+    if is_compact_stacked_file(csv_file_path):
+        label_table = pd.read_csv(compact_table_paths(csv_file_path)['labels'], dtype=str)
+        label_columns = [col for col in label_table.columns if col != 'Label_ID']
+        key_columns = ['Label_ID']
+    else:
+        columns = _stacked_file_columns(csv_file_path)
+        label_columns = _stacked_label_columns(columns)
+        if 'Source_File' in columns:
+            label_columns = ['Source_File'] + label_columns
+        key_columns = label_columns
+    
+    group_ids = {}
+    code_blocks = []
+    value_blocks = []
+    for block in pd.read_csv(csv_file_path, usecols=key_columns + ['Data'], dtype=str, chunksize=max(1, int(block_rows))):
+        values = pd.to_numeric(block['Data'], errors='coerce').to_numpy(dtype=float)
+        keep = ~np.isnan(values)
+        if key_columns:
+            codes, uniques = pd.MultiIndex.from_frame(block.loc[keep, key_columns].fillna('')).factorize()
+            # Map the block-local codes onto ids shared by all blocks
+            block_ids = np.array([group_ids.setdefault(key, len(group_ids)) for key in uniques], dtype=np.int64)
+            code_blocks.append(block_ids[codes] if len(codes) else codes.astype(np.int64))
+        else:
+            # A single group, created with its first numeric value so it is never empty
+            if keep.any():
+                group_ids.setdefault((), 0)
+            code_blocks.append(np.zeros(int(keep.sum()), dtype=np.int64))
+        value_blocks.append(values[keep])
+    
+    keys = pd.DataFrame(list(group_ids), columns=key_columns)
+    if group_ids:
+        statistics = _group_statistics(np.concatenate(code_blocks), np.concatenate(value_blocks), len(group_ids))
+    else:
+        statistics = pd.DataFrame(columns=SUMMARY_STATISTICS)
+    summary = pd.concat([keys, statistics], axis=1)
+    if key_columns == ['Label_ID']:
+        summary = label_table.merge(summary, on='Label_ID', how='inner').drop(columns='Label_ID')
+    if label_columns:
+        summary = summary.sort_values(label_columns, kind='stable')
+    
+    summary_file = fi.check_write_permission(summary_table_path(csv_file_path))
+    summary.to_csv(summary_file, index=False)
+    print(f"{summary_file} has been summarized! ({len(summary)} levels, "
+          f"{int(summary['N'].sum()) if len(summary) else 0} values)")
+    return summary_file
+
+
+def _jsl_summary_session(csv_file_path, raw_jsl, title=""):
+    """
+    JSL that charts the Python summary table and opens the raw rows only on request.
+    
+    raw_jsl is the regular analysis script (without Names Default To Here); it is
+    wrapped in a function behind a button so the large file is not loaded by default.
+    """
+    summary_file = summarize_stacked_file(csv_file_path)
+    summary_columns = pd.read_csv(summary_file, nrows=0).columns.tolist()
+    level_columns = summary_columns[:summary_columns.index('N')]
+    levels = pd.read_csv(summary_file, usecols=level_columns, dtype=str) if level_columns else pd.DataFrame()
+    x_columns = ', '.join(f'Column( dtSummary, "{col}" )' for col in level_columns
+                          if levels[col].fillna('').nunique() >= 2)
+    title = title or os.path.splitext(os.path.basename(csv_file_path))[0]
+    return f"""
+Names Default To Here( 1 );
+
+// Per-level statistics computed in Python (N, Mean, Std Dev, Min, {', '.join(SUMMARY_QUANTILES)}, Max)
+dtSummary = Open( "{summary_file}" );
+dtSummary << Set Name( "{title} Summary" );
+xColumns = {{{x_columns}}};
+
+Show(xColumns);
+
+// Chart the level means; the summary table itself replaces the Summary Report
+Variability Chart(
+    Y( :Mean ),
+    X( Eval List( xColumns ) ),
+    Data Table( dtSummary ),
+    Show Range Bars( 0 ),
+    Connect Means( 1 )
+);
+
+// The raw stacked rows are only loaded on request
+openRawData = Function( {{}},
+{raw_jsl}
+);
+New Window( "{title} Raw Data",
+    Button Box( "Open raw data and full variability chart", openRawData() )
+);
+"""
 
 
 # Main execution block for testing and development
@@ -931,7 +1506,7 @@ if __name__ == "__main__":
     jmp_executable_path = Path("C:\\Program Files\\SAS\\JMPPRO\\17\\jmp.exe")
 
 
-def run_jmp_threaded_instances(csv_files, jmp_executable_path, max_workers=3, progress_callback=None):
+def run_jmp_threaded_instances(csv_files, jmp_executable_path, max_workers=3, progress_callback=None, use_summary=False):
     """
     Run multiple JMP instances in parallel using threading for faster processing.
     
@@ -944,6 +1519,7 @@ def run_jmp_threaded_instances(csv_files, jmp_executable_path, max_workers=3, pr
         jmp_executable_path (str): Path to the JMP executable
         max_workers (int, optional): Maximum number of concurrent JMP instances. Defaults to 3.
         progress_callback (callable, optional): Callback function for progress updates
+        use_summary (bool, optional): Chart Python-computed summaries (see create_jsl_script)
         
     Returns:
         dict: Results dictionary with success/failure status for each file
@@ -986,7 +1562,7 @@ def run_jmp_threaded_instances(csv_files, jmp_executable_path, max_workers=3, pr
             print(f"📊 Processing: {os.path.basename(csv_file)}")
             
             # Create JSL script for this CSV
-            jsl_path = create_jsl_script(csv_file)
+            jsl_path = create_jsl_script(csv_file, use_summary)
             
             # Run JMP with timeout
             result = subprocess.run(
@@ -1047,7 +1623,224 @@ def run_jmp_threaded_instances(csv_files, jmp_executable_path, max_workers=3, pr
     return results
 
 
-def run_jmp_unified_session_threaded(csv_files, jmp_executable_path, progress_callback=None):
+def estimate_jmp_job(csv_file):
+    """
+    Estimate the memory footprint and a timeout for opening one dataset in JMP.
+    
+    Args:
+        csv_file (str): Path to the stacked CSV file
+        
+    Returns:
+        dict: {'file', 'size_mb', 'memory_mb', 'timeout'}
+    """
+    size_mb = os.path.getsize(csv_file) / 1048576 if os.path.exists(csv_file) else 0.0
+    if is_compact_stacked_file(csv_file):
+        # Compact files are expanded by the join in JMP
+        size_mb *= JMP_COMPACT_EXPANSION
+    return {
+        'file': csv_file,
+        'size_mb': size_mb,
+        'memory_mb': JMP_BASE_MEMORY_MB + size_mb * JMP_MEMORY_PER_CSV_MB,
+        'timeout': min(JMP_MAX_TIMEOUT, JMP_BASE_TIMEOUT + size_mb * JMP_SECONDS_PER_CSV_MB),
+    }
+
+
+def get_jmp_concurrency(jobs, max_workers=None):
+    """
+    Size the number of concurrent JMP instances from free memory and CPU count.
+    
+    Args:
+        jobs (list): Job estimates from estimate_jmp_job()
+        max_workers (int, optional): Upper limit set by the user
+        
+    Returns:
+        tuple: (concurrency, memory budget in MB or None when psutil is unavailable)
+    """
+    cpu_slots = max(1, (os.cpu_count() or 2) - 1)
+    concurrency = cpu_slots
+    memory_budget_mb = None
+    if PSUTIL_AVAILABLE and jobs:
+        memory_budget_mb = psutil.virtual_memory().available / 1048576 * JMP_MEMORY_HEADROOM
+        average_mb = sum(job['memory_mb'] for job in jobs) / len(jobs)
+        concurrency = min(concurrency, max(1, int(memory_budget_mb // average_mb)))
+    if max_workers:
+        concurrency = min(concurrency, max_workers)
+    return max(1, min(concurrency, len(jobs) or 1)), memory_budget_mb
+
+
+def _run_jmp_job(job, jmp_executable_path, timeout):
+    """Run one JMP instance, polling its peak RSS until it exits or times out."""
+    start_time = time.time()
+    peak_rss = 0
+    status, message = "error", ""
+    try:
+        process = subprocess.Popen([jmp_executable_path, job['jsl_path']],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except Exception as e:
+        return {"status": "error", "message": f"Error launching JMP: {str(e)}",
+                "wall_seconds": 0.0, "peak_rss_mb": None}
+    
+    monitored = psutil.Process(process.pid) if PSUTIL_AVAILABLE else None
+    while True:
+        try:
+            returncode = process.wait(timeout=JMP_POLL_SECONDS)
+            if returncode == 0:
+                status, message = "success", "JMP analysis completed successfully"
+            else:
+                status, message = "error", f"JMP returned error code {returncode}"
+            break
+        except subprocess.TimeoutExpired:
+            if monitored is not None:
+                try:
+                    rss = monitored.memory_info().rss + sum(child.memory_info().rss for child in monitored.children(recursive=True))
+                    peak_rss = max(peak_rss, rss)
+                except psutil.Error:
+                    pass
+            if time.time() - start_time > timeout:
+                process.kill()
+                process.wait()
+                status, message = "timeout", f"JMP execution timed out after {timeout:.0f} seconds"
+                break
+    
+    return {"status": status, "message": message,
+            "wall_seconds": round(time.time() - start_time, 1),
+            "peak_rss_mb": round(peak_rss / 1048576, 1) if monitored is not None else None}
+
+
+def _schedule_jmp_jobs(jobs, jmp_executable_path, concurrency, memory_budget_mb, timeout_factor, on_done):
+    """Run jobs biggest-first, starting a job only when a slot and enough memory budget are free."""
+    pending = sorted(jobs, key=lambda job: job['memory_mb'], reverse=True)
+    state = {'running': 0, 'memory_mb': 0.0}
+    slot_freed = threading.Condition()
+    
+    def fits(job):
+        if state['running'] >= concurrency:
+            return False
+        # A job that is larger than the whole budget still runs, just on its own
+        return memory_budget_mb is None or state['running'] == 0 or \
+            state['memory_mb'] + job['memory_mb'] <= memory_budget_mb
+    
+    def worker(job):
+        try:
+            result = _run_jmp_job(job, jmp_executable_path, job['timeout'] * timeout_factor)
+        finally:
+            with slot_freed:
+                state['running'] -= 1
+                state['memory_mb'] -= job['memory_mb']
+                slot_freed.notify_all()
+        on_done(job, result)
+    
+    threads = []
+    while pending:
+        with slot_freed:
+            job = next((job for job in pending if fits(job)), None)
+            while job is None:
+                slot_freed.wait()
+                job = next((job for job in pending if fits(job)), None)
+            pending.remove(job)
+            state['running'] += 1
+            state['memory_mb'] += job['memory_mb']
+        print(f"📊 Launching JMP: {os.path.basename(job['file'])} ({job['size_mb']:.1f} MB, "
+              f"~{job['memory_mb']:.0f} MB RAM, timeout {job['timeout'] * timeout_factor:.0f}s)")
+        thread = threading.Thread(target=worker, args=(job,), daemon=True)
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+
+
+def run_jmp_adaptive_instances(csv_files, jmp_executable_path, max_workers=None, progress_callback=None, use_summary=False):
+    """
+    Run JMP instances with concurrency sized to the machine and the datasets.
+    
+    Unlike run_jmp_threaded_instances (fixed worker count, fixed 60s timeout), this
+    launcher estimates each job from its CSV size and schedules around the free
+    memory and CPU of the machine.
+    
+    Args:
+        csv_files (list): List of paths to CSV files to analyze
+        jmp_executable_path (str): Path to the JMP executable
+        max_workers (int, optional): Upper limit for concurrent JMP instances
+        progress_callback (callable, optional): Callback function for progress updates
+        use_summary (bool, optional): Chart Python-computed summaries (see create_jsl_script)
+        
+    Returns:
+        dict: Results per file with status, message, wall_seconds, peak_rss_mb, attempts
+        
+    Features:
+        - JSL scripts are created up front in parallel, not inside the JMP workers
+        - Concurrency from free memory (psutil, optional) and CPU count
+        - Biggest datasets first, smaller ones fill the remaining memory budget
+        - Timeouts scale with dataset size
+        - Timed-out jobs are retried once at half the concurrency with twice the timeout
+        - Per-job wall time and peak RSS (RSS needs psutil) in the results and summary
+        
+    Example:
+        >>> results = run_jmp_adaptive_instances(files, "C:/JMP/jmp.exe")
+        >>> for file, result in results.items():
+        ...     print(f"{file}: {result['status']} in {result['wall_seconds']}s")
+    """
+    if not csv_files:
+        print("No CSV files provided for JMP analysis")
+        return {}
+    
+    if not os.path.exists(jmp_executable_path):
+        raise FileNotFoundError(f"JMP executable not found at: {jmp_executable_path}")
+    
+    results = {}
+    jobs = []
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        future_to_file = {executor.submit(create_jsl_script, csv_file, use_summary): csv_file for csv_file in csv_files}
+        for future in as_completed(future_to_file):
+            csv_file = future_to_file[future]
+            try:
+                job = estimate_jmp_job(csv_file)
+                job['jsl_path'] = future.result()
+                jobs.append(job)
+            except Exception as e:
+                results[csv_file] = {"status": "error", "message": f"Error creating JSL: {str(e)}",
+                                     "wall_seconds": 0.0, "peak_rss_mb": None, "attempts": 0}
+    
+    concurrency, memory_budget_mb = get_jmp_concurrency(jobs, max_workers)
+    budget_text = f"{memory_budget_mb:.0f} MB memory budget" if memory_budget_mb else "no memory data (psutil not installed)"
+    print(f"🚀 Starting adaptive JMP analysis for {len(jobs)} files")
+    print(f"🔧 Using up to {concurrency} concurrent JMP instances, {budget_text}")
+    
+    total_files = len(csv_files)
+    results_lock = threading.Lock()
+    
+    def on_done(job, result):
+        with results_lock:
+            attempts = results.get(job['file'], {}).get('attempts', 0) + 1
+            results[job['file']] = dict(result, attempts=attempts)
+            completed_count = sum(1 for r in results.values() if r['status'] != 'timeout' or r['attempts'] > 1)
+        print(f"✅ {os.path.basename(job['file'])}: {result['status']} in {result['wall_seconds']}s")
+        if progress_callback:
+            progress_callback(min(completed_count, total_files), total_files, f"Processed {os.path.basename(job['file'])}")
+    
+    _schedule_jmp_jobs(jobs, jmp_executable_path, concurrency, memory_budget_mb, 1, on_done)
+    
+    timed_out = [job for job in jobs if results[job['file']]['status'] == 'timeout']
+    if timed_out:
+        retry_concurrency = max(1, concurrency // 2)
+        print(f"🔁 Retrying {len(timed_out)} timed-out jobs with {retry_concurrency} concurrent instances")
+        _schedule_jmp_jobs(timed_out, jmp_executable_path, retry_concurrency, memory_budget_mb, 2, on_done)
+    
+    # Summary
+    success_count = sum(1 for r in results.values() if r["status"] == "success")
+    print(f"\n📊 Adaptive JMP Summary:")
+    print(f"   ✅ Successful: {success_count}")
+    print(f"   ❌ Failed: {len(results) - success_count}")
+    for csv_file, result in results.items():
+        rss_text = f"{result['peak_rss_mb']:.0f} MB" if result['peak_rss_mb'] is not None else "n/a"
+        print(f"   {os.path.basename(csv_file)}: {result['status']}, {result['wall_seconds']}s, "
+              f"peak RSS {rss_text}, attempts {result['attempts']}")
+    
+    return results
+
+
+def run_jmp_unified_session_threaded(csv_files, jmp_executable_path, progress_callback=None, use_manifest=False,
+                                     use_summary=False):
     """
     Create JSL scripts in parallel, then launch unified JMP session with all datasets.
     
@@ -1059,6 +1852,11 @@ def run_jmp_unified_session_threaded(csv_files, jmp_executable_path, progress_ca
         csv_files (list): List of paths to CSV files to analyze
         jmp_executable_path (str): Path to the JMP executable  
         progress_callback (callable, optional): Callback function for progress updates
+        use_manifest (bool, optional): Precompute column types and label columns in
+                                       Python (create_manifest_jsl_script) so JMP skips
+                                       its scanning loops
+        use_summary (bool, optional): Chart Python-computed summaries (see create_jsl_script);
+                                      takes precedence over use_manifest
         
     Returns:
         bool: True if unified session launched successfully, False otherwise
@@ -1098,7 +1896,10 @@ def run_jmp_unified_session_threaded(csv_files, jmp_executable_path, progress_ca
         """Create JSL script for a single CSV file"""
         try:
             print(f"📝 Creating JSL: {os.path.basename(csv_file)}")
-            jsl_path = create_jsl_script(csv_file)
+            if use_manifest and not use_summary:
+                jsl_path = create_manifest_jsl_script(csv_file)
+            else:
+                jsl_path = create_jsl_script(csv_file, use_summary)
             return {"file": csv_file, "jsl_path": jsl_path, "status": "success"}
         except Exception as e:
             return {"file": csv_file, "jsl_path": None, "status": "error", "message": str(e)}
@@ -1141,7 +1942,8 @@ def run_jmp_unified_session_threaded(csv_files, jmp_executable_path, progress_ca
         return False
 
 
-def run_jmp_with_options(csv_files, jmp_executable_path, mode="unified", max_workers=3, progress_callback=None):
+def run_jmp_with_options(csv_files, jmp_executable_path, mode="unified", max_workers=3, progress_callback=None,
+                         use_summary=False):
     """
     Flexible JMP execution with multiple threading options.
     
@@ -1149,16 +1951,22 @@ def run_jmp_with_options(csv_files, jmp_executable_path, mode="unified", max_wor
     - "unified": Single JMP session with all datasets (recommended)
     - "parallel": Multiple JMP instances running in parallel  
     - "unified_threaded": Parallel JSL creation + unified session (optimal)
+    - "preloaded": Like unified_threaded, with column types and label columns
+      precomputed in Python so JMP opens each dataset without scanning it
+    - "adaptive": Separate instances with concurrency, order and timeouts sized
+      from free memory, CPU and dataset size
     
     Args:
         csv_files (list): List of paths to CSV files to analyze
         jmp_executable_path (str): Path to the JMP executable
-        mode (str): Execution mode - "unified", "parallel", or "unified_threaded"
+        mode (str): Execution mode - "unified", "parallel", "unified_threaded", "preloaded" or "adaptive"
         max_workers (int): Maximum concurrent workers for parallel modes
         progress_callback (callable, optional): Progress update callback
+        use_summary (bool, optional): Chart per-level statistics computed in Python
+                                      instead of the raw rows (raw data opens on demand)
         
     Returns:
-        bool or dict: Success status (bool) for unified modes, results dict for parallel
+        bool or dict: Success status (bool) for unified modes, results dict for parallel/adaptive
         
     Mode Recommendations:
         - "unified_threaded": Best balance of speed and resources (recommended)
@@ -1174,15 +1982,21 @@ def run_jmp_with_options(csv_files, jmp_executable_path, mode="unified", max_wor
         >>> results = run_jmp_with_options(files, jmp_exe, mode="parallel", max_workers=2)
     """
     if mode == "parallel":
-        return run_jmp_threaded_instances(csv_files, jmp_executable_path, max_workers, progress_callback)
+        return run_jmp_threaded_instances(csv_files, jmp_executable_path, max_workers, progress_callback, use_summary)
     elif mode == "unified_threaded":
-        return run_jmp_unified_session_threaded(csv_files, jmp_executable_path, progress_callback)
+        return run_jmp_unified_session_threaded(csv_files, jmp_executable_path, progress_callback,
+                                                use_summary=use_summary)
+    elif mode == "adaptive":
+        return run_jmp_adaptive_instances(csv_files, jmp_executable_path, max_workers, progress_callback, use_summary)
+    elif mode == "preloaded":
+        return run_jmp_unified_session_threaded(csv_files, jmp_executable_path, progress_callback, use_manifest=True,
+                                                use_summary=use_summary)
     elif mode == "unified":
         # Original unified approach (no threading for JSL creation)
         print(f"🚀 Creating JSL scripts sequentially for {len(csv_files)} files")
         try:
             output_folder = os.path.dirname(csv_files[0]) if csv_files else os.getcwd()
-            jsl_scripts = create_multiple_jsl_scripts(csv_files, output_folder)
+            jsl_scripts = create_multiple_jsl_scripts(csv_files, output_folder, use_summary)
             if jsl_scripts:
                 return run_master_jsl_workspace(jsl_scripts, jmp_executable_path, output_folder)
             return False
@@ -1190,7 +2004,7 @@ def run_jmp_with_options(csv_files, jmp_executable_path, mode="unified", max_wor
             print(f"❌ Error in unified mode: {e}")
             return False
     else:
-        raise ValueError(f"Invalid mode: {mode}. Choose from 'unified', 'parallel', or 'unified_threaded'")
+        raise ValueError(f"Invalid mode: {mode}. Choose from 'unified', 'parallel', 'unified_threaded', 'preloaded' or 'adaptive'")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,93 @@
+"""
+Batched Log Sink
+
+Thread-safe log and progress output for the GUI. Any thread (the processing
+pipeline, loaders, query workers) pushes lines and progress values into a queue;
+the Tk main loop drains it every interval_ms and writes the whole batch into the
+log Text widget with a single insert, so a run logging thousands of lines no
+longer waits on a widget update per line. The widget keeps at most max_lines
+lines, dropping the oldest ones like a ring buffer.
+
+Progress is latest-wins: only the last value pushed since the previous drain is
+shown.
+
+Example:
+    >>> sink = LogSink(root, log_text, on_progress=progress_var.set)
+    >>> sink.log("[12:00:00] Starting\\n", 'progress')   # from any thread
+    >>> sink.progress(42.0)
+"""
+
+import queue
+import tkinter as tk
+
+DEFAULT_INTERVAL_MS = 100
+DEFAULT_MAX_LINES = 5000
+
+
+class LogSink:
+    """
+    Queue between worker threads and the log widget, drained on the Tk thread.
+
+    Args:
+        root: Tk widget whose main loop drains the queue
+        text_widget (tk.Text): Log widget (lines are appended at the end)
+        on_progress (callable, optional): Called on the Tk thread with the latest progress value
+        interval_ms (int, optional): Time between drains
+        max_lines (int, optional): Lines kept in the widget
+    """
+
+    def __init__(self, root, text_widget, on_progress=None,
+                 interval_ms=DEFAULT_INTERVAL_MS, max_lines=DEFAULT_MAX_LINES):
+        self.root = root
+        self.text_widget = text_widget
+        self.on_progress = on_progress
+        self.interval_ms = interval_ms
+        self.max_lines = max_lines
+        self._queue = queue.SimpleQueue()
+        self.root.after(self.interval_ms, self._drain)
+
+    def log(self, line, tag=None):
+        """Queue a line (ending in a newline) with an optional text tag; safe from any thread."""
+        self._queue.put(('log', line, tag))
+
+    def progress(self, value):
+        """Queue a progress value; only the latest one per drain is shown."""
+        self._queue.put(('progress', value, None))
+
+    def drain(self):
+        """Write everything queued so far to the widget (Tk thread only)."""
+        chunks = []
+        progress = None
+        try:
+            while True:
+                kind, payload, tag = self._queue.get_nowait()
+                if kind == 'progress':
+                    progress = payload
+                else:
+                    chunks.extend((payload, (tag,) if tag else ()))
+        except queue.Empty:
+            pass
+
+        if chunks:
+            # Text.insert takes (chars, tags) pairs: one Tk call for the whole batch
+            self.text_widget.insert(tk.END, *chunks)
+            self._trim()
+            self.text_widget.see(tk.END)
+
+        if progress is not None and self.on_progress is not None:
+            self.on_progress(progress)
+
+    def _trim(self):
+        # Trim in steps of a tenth of max_lines so most drains do not delete anything
+        lines = int(self.text_widget.index('end-1c').split('.')[0])
+        if lines > self.max_lines + self.max_lines // 10:
+            self.text_widget.delete('1.0', f'{lines - self.max_lines + 1}.0')
+
+    def _drain(self):
+        try:
+            self.drain()
+        except tk.TclError:
+            return  # Widget destroyed: the window is closing
+        except Exception as e:
+            print(f"Error writing log batch: {e}")
+        self.root.after(self.interval_ms, self._drain)
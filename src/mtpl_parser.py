@@ -1,6 +1,9 @@
 import re
 import csv
+import hashlib
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 import file_functions as fi
 
 file_path = "C:/Users/burtonr/applications.manufacturing.ate-test.torch.server.dmr.sort.dab/Modules/PTH_FIVROPS/PTH_FIVROPS.mtpl"
@@ -10,51 +13,160 @@ def read_mtpl_file(path):
     with open(path, 'r', encoding='utf-8') as file:
         return file.read()
 
+# Single-pass scanner: each match runs over plain text, quoted strings and comments
+# up to the next brace (or the end of the text), so braces inside strings and
+# comments never affect the block structure. Unterminated strings and comments
+# are consumed to the end of their line/the text, so a match can never fail.
+SCAN_PATTERN = re.compile(r'(?:[^{}"/]+|"(?:[^"\\\n]|\\.)*"?|//[^\n]*|/\*.*?(?:\*/|\Z)|/)*([{}]|\Z)', re.DOTALL)
+# Statement tokenizer for the text between two braces
+TOKEN_PATTERN = re.compile(r'"(?:[^"\\\n]|\\.)*"|//[^\n]*|/\*.*?(?:\*/|\Z)|;', re.DOTALL)
+TEST_HEADER_PATTERN = re.compile(r'CSharpTest\s+(\w+)\s+(\w+)\s*$')
+FLOW_HEADER_PATTERN = re.compile(r'(?:DUT)?Flow\s+\w+')
+FLOWITEM_HEADER_PATTERN = re.compile(r'(?:DUT)?FlowItem\s+(\w+)\s+\w+')
+RESULT_PATTERN = re.compile(r'Result\s+(-?\d+)')
+
+# Instance parameters written to the instance table (first occurrence wins)
+INSTANCE_FIELDS = ['ConfigurationFile', 'BasicTestConfiguration', 'Mode', 'BypassPort']
+
+
+def _split_statements(segment):
+    """Split the text between two braces into ';' statements and the unterminated rest (comments removed)."""
+    if ';' not in segment and '"' not in segment and '/' not in segment:
+        return [], segment.strip()
+    statements = []
+    pieces = []
+    start = 0
+    for token in TOKEN_PATTERN.finditer(segment):
+        kind = token.group()
+        if kind[0] == '"':
+            continue
+        pieces.append(segment[start:token.start()])
+        start = token.end()
+        if kind == ';':
+            statements.append(''.join(pieces).strip())
+            pieces = []
+    pieces.append(segment[start:])
+    return statements, ''.join(pieces).strip()
+
+
+def parse_mtpl(text):
+    """
+    Parse MTPL text in a single pass, walking the braces once.
+    
+    Test instances, their parameters and the FlowItem Result ports are all
+    collected in the same traversal, instead of separate regex scans per
+    block type. Only block headers outside tests and flow items, and the text
+    directly inside CSharpTest blocks, are split into statements.
+    
+    Args:
+        text (str): The content of the MTPL file
+        
+    Returns:
+        dict: {
+            'instances': rows for save_instance_to_csv (one per configuration file),
+            'ports': [FlowItemName, ResultNumber] rows for save_port_to_csv,
+            'parameters': {TestName: {parameter: value}} for every CSharpTest,
+            'blocks': one dict per top-level block with its character offsets
+                      ('start' is the end of the preceding block, 'end' is after
+                      its closing brace), the cumulative 'instances'/'ports' row
+                      counts after it and the names of the 'tests' it contains,
+            'complete': False if the text ends inside a block
+        }
+    """
+    instances = []
+    ports = []
+    parameters = {}
+    blocks = []
+    stack = []            # kind of each open block: 'test', 'flow', 'flowitem' or None
+    test = None           # (decoder_type, test_name, params, config files) of the open CSharpTest
+    flow_depth = 0        # number of open Flow blocks
+    flowitem = None       # name of the open FlowItem
+    statement_depth = -1  # depth whose statements are parsed (the open test or FlowItem body)
+    top_start = 0         # start offset of the open top-level block
+    top_tests = []        # tests inside the open top-level block
+
+    for token in SCAN_PATTERN.finditer(text):
+        brace = token.group(1)
+        if len(stack) == statement_depth:
+            segment = text[token.start():token.start(1)]
+            if test is not None:
+                for statement in _split_statements(segment)[0]:
+                    _add_parameter(test, statement)
+            elif 'Result' in segment:
+                # Result statements and Result block headers directly inside the FlowItem (comments removed)
+                statements, rest = _split_statements(segment)
+                ports.extend([flowitem, number] for number in RESULT_PATTERN.findall(' '.join(statements + [rest])))
+
+        if not brace:
+            break
+
+        if brace == '{':
+            block = None
+            if not stack:
+                top_start = token.start()
+                top_tests = []
+            if test is None and flowitem is None:
+                header = _split_statements(text[token.start():token.start(1)])[1]
+                test_match = TEST_HEADER_PATTERN.match(header)
+                if test_match:
+                    test = (test_match.group(1), test_match.group(2), {}, [])
+                    block = 'test'
+                    statement_depth = len(stack) + 1
+                elif flow_depth and FLOWITEM_HEADER_PATTERN.match(header):
+                    flowitem = FLOWITEM_HEADER_PATTERN.match(header).group(1)
+                    block = 'flowitem'
+                    statement_depth = len(stack) + 1
+                elif FLOW_HEADER_PATTERN.match(header):
+                    flow_depth += 1
+                    block = 'flow'
+            stack.append(block)
+
+        elif stack:
+            block = stack.pop()
+            if block == 'test':
+                decoder_type, test_name, params, config_files = test
+                parameters[test_name] = params
+                top_tests.append(test_name)
+                instances.extend(_instance_rows(decoder_type, test_name, params, config_files))
+                test = None
+                statement_depth = -1
+            elif block == 'flowitem':
+                flowitem = None
+                statement_depth = -1
+            elif block == 'flow':
+                flow_depth -= 1
+            if not stack:
+                blocks.append({'start': top_start, 'end': token.end(), 'instances': len(instances),
+                               'ports': len(ports), 'tests': top_tests})
+
+    return {'instances': instances, 'ports': ports, 'parameters': parameters, 'blocks': blocks,
+            'complete': not stack}
+
+
+def _add_parameter(test, statement):
+    """Record one 'Name = value' statement of a CSharpTest body."""
+    if '=' not in statement:
+        return
+    key, value = statement.split('=', 1)
+    key = key.split()[-1] if key.split() else ''
+    value = value.strip().replace('\n', ' ')
+    if key.startswith('ConfigurationFile_'):
+        # CLKUTILSLoader lists several configuration files (one row each)
+        test[3].append(value)
+    test[2].setdefault(key, value)
+
+
+def _instance_rows(decoder_type, test_name, params, config_files):
+    """Instance table rows of one CSharpTest (none if it has no configuration file)."""
+    basic_test_config, mode, bypass = (params.get(field) for field in INSTANCE_FIELDS[1:])
+    config_files = config_files or ([params['ConfigurationFile']] if params.get('ConfigurationFile') else [])
+    return [[decoder_type, test_name, config_file, basic_test_config, mode, bypass]
+            for config_file in config_files]
+
+
 def parse_mtpl_instance_content(text):
-    # Step 1: Extract all CSharpTest blocks
-    block_pattern = re.compile(
-        r'CSharpTest\s+(\w+)\s+(\w+)\s*\{(.*?)\}',
-        re.DOTALL
-    )
-    blocks = block_pattern.findall(text)
-
-    extracted_data = []
-
-    for decoder_type, test_name, body in blocks:
-        # Step 2: Extract fields within the body (order doesn't matter)
-        config_file_match = re.search(r'ConfigurationFile\s*=\s*(.+?);', body)
-        config_file_list = re.findall(r'ConfigurationFile_\w+\s*=\s*(.+?);', body) # for CLKUTILSLoader (make multiple lines)
-        basic_test_config_match = re.search(r'BasicTestConfiguration\s*=\s*(.+?);', body)
-        mode_match = re.search(r'\sMode\s*=\s*(.+?);', body)
-        bypass_match = re.search(r'\sBypassPort\s*=\s*(.+?);', body)
-
-        config_cleaned = config_file_match.group(1).strip().replace('\n', ' ') if config_file_match else None
-        basic_test_config = basic_test_config_match.group(1).strip() if basic_test_config_match else None
-        mode = mode_match.group(1).strip() if mode_match else None
-        bypass = bypass_match.group(1).strip() if bypass_match else None
-        if config_cleaned or config_file_list:
-            if config_file_list:
-                for config_file in config_file_list:
-                    config_cleaned = config_file.strip().replace('\n', ' ')
-                    extracted_data.append([
-                        decoder_type.strip(),
-                        test_name.strip(),
-                        config_cleaned,
-                        basic_test_config,
-                        mode,
-                        bypass
-                    ])
-            else:
-                extracted_data.append([
-                    decoder_type.strip(),
-                    test_name.strip(),
-                    config_cleaned,
-                    basic_test_config,
-                    mode,
-                    bypass
-                ])
-
-    return extracted_data
+    """Return the instance table rows of an MTPL (see parse_mtpl)."""
+    return parse_mtpl(text)['instances']
 
 def parse_mtpl_flow_items(text):
     """
@@ -66,56 +178,162 @@ def parse_mtpl_flow_items(text):
     Returns:
         list: List of [FlowItemName, ResultNumber] pairs
     """
-    # Extract all Flow blocks first
-    flow_pattern = re.compile(
-        r'Flow\s+\w+.*?\{(.*?)\n\}',  # Match Flow blocks
-        re.DOTALL
-    )
-    
-    # Find all FlowItem declarations within flows
-    flowitem_pattern = re.compile(
-        r'FlowItem\s+(\w+)\s+\w+.*?\{(.*?)\n\t\}',  # Match FlowItem blocks
-        re.DOTALL
-    )
+    return parse_mtpl(text)['ports']
+
+
+
+# Parse cache: one JSON file per MTPL path in the app data folder
+CACHE_VERSION = 2
+
+
+def _cache_path(file_path):
+    key = hashlib.sha1(os.path.abspath(file_path).lower().encode('utf-8')).hexdigest()
+    return os.path.join(fi.get_app_data_dir('mtpl_cache'), f'{key}.json')
+
+
+def _content_hash(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def _load_cache(file_path):
+    try:
+        with open(_cache_path(file_path), 'r', encoding='utf-8') as cache_file:
+            cache = json.load(cache_file)
+        return cache if cache.get('version') == CACHE_VERSION else None
+    except (OSError, ValueError):
+        return None
+
+
+def _save_cache(file_path, cache):
+    try:
+        with open(_cache_path(file_path), 'w', encoding='utf-8') as cache_file:
+            json.dump(cache, cache_file)
+    except OSError as e:
+        print(f"Could not save MTPL parse cache for {file_path}: {e}")
+
+
+def _cache_entries(text, parsed, offset=0):
+    """Split a parse_mtpl() result into one cache entry per top-level block."""
+    entries = []
+    instance_start = port_start = 0
+    for block in parsed['blocks']:
+        entries.append({
+            'start': block['start'] + offset,
+            'end': block['end'] + offset,
+            'hash': _content_hash(text[block['start']:block['end']]),
+            'instances': parsed['instances'][instance_start:block['instances']],
+            'ports': parsed['ports'][port_start:block['ports']],
+        })
+        instance_start, port_start = block['instances'], block['ports']
+    return entries
+
+
+def _entry_matches(text, entry, shift):
+    start, end = entry['start'] + shift, entry['end'] + shift
+    return start >= 0 and end <= len(text) and _content_hash(text[start:end]) == entry['hash']
+
+
+def _patch_entries(text, cache):
+    """
+    Re-parse only the changed region of an MTPL against its cached blocks.
     
-    # Extract Result numbers
-    result_pattern = re.compile(
-        r'Result\s+(-?\d+)',  # Match Result declarations with numbers
-        re.MULTILINE
-    )
+    Blocks are unchanged from the front (same offsets) and from the back (offsets
+    shifted by the change in length); the region between them is parsed again.
     
-    extracted_data = []
+    Returns:
+        tuple: (entries, number of re-parsed blocks), or None if the changed region
+               does not parse as whole blocks (the caller then parses everything)
+    """
+    old_entries = cache['blocks']
+    shift = len(text) - cache['length']
+    front = 0
+    while front < len(old_entries) and _entry_matches(text, old_entries[front], 0):
+        front += 1
+    back = len(old_entries)
+    while back > front and _entry_matches(text, old_entries[back - 1], shift):
+        back -= 1
+
+    region_start = old_entries[front - 1]['end'] if front else 0
+    region_end = old_entries[back]['start'] + shift if back < len(old_entries) else len(text)
+    if region_end < region_start:
+        return None
+    region = text[region_start:region_end]
+    parsed = parse_mtpl(region)
+    if not parsed['complete']:
+        return None
+    if back < len(old_entries) and region.strip() and (not parsed['blocks'] or parsed['blocks'][-1]['end'] != len(region)):
+        # Text left between the last new block and the next cached block would belong to its header
+        return None
+
+    shifted = [dict(entry, start=entry['start'] + shift, end=entry['end'] + shift) for entry in old_entries[back:]]
+    return old_entries[:front] + _cache_entries(region, parsed, region_start) + shifted, len(parsed['blocks'])
+
+
+def load_mtpl(file_path, use_cache=True):
+    """
+    Parse an MTPL, re-parsing only the top-level blocks that changed since the last load.
     
-    # Find all flows in the text
-    flows = flow_pattern.findall(text)
+    The cache (per MTPL path, in the app data folder) keeps the file size and
+    modification time, and for every top-level block its offsets, content hash and
+    parsed rows. An unchanged file is not read at all; an edited file is read once
+    and only the region between the unchanged leading and trailing blocks is parsed
+    again, then patched into the cached instance table. A file that ends inside a
+    block (truncated or unbalanced braces) is parsed in full and not cached.
     
-    for flow_content in flows:
-        # Find all FlowItems within this flow
-        flowitems = flowitem_pattern.findall(flow_content)
+    Args:
+        file_path (str): Path to the .mtpl file
+        use_cache (bool): False forces a full parse (the cache is still refreshed)
         
-        for flowitem_name, flowitem_body in flowitems:
-            # Extract all result numbers for this FlowItem
-            results = result_pattern.findall(flowitem_body)
-            
-            # Create a row for each FlowItem-Result combination
-            for result_num in results:
-                extracted_data.append([
-                    flowitem_name.strip(),  # FlowItem name
-                    result_num.strip()      # Result number
-                ])
-    
-    return extracted_data
-
-
-def save_instance_to_csv(data, csv_path):
-    headers = ['TestType', 'TestName', 'ConfigurationFile', 'BasicTestConfiguration','Mode','BypassPort']
+    Returns:
+        dict: 'instances' and 'ports' as returned by parse_mtpl(), plus 'blocks'
+              (top-level block count) and 'reparsed' (blocks parsed this time)
+    """
+    stat = os.stat(file_path)
+    cache = _load_cache(file_path) if use_cache else None
+    entries = None
+    if cache and cache['size'] == stat.st_size and cache['mtime'] == stat.st_mtime:
+        entries, reparsed = cache['blocks'], 0
+    else:
+        text = read_mtpl_file(file_path)
+        if cache and cache['hash'] == _content_hash(text):
+            entries, reparsed = cache['blocks'], 0
+        elif cache:
+            patched = _patch_entries(text, cache)
+            if patched:
+                entries, reparsed = patched
+        if entries is None:
+            parsed = parse_mtpl(text)
+            if not parsed['complete']:
+                # The rows of the unclosed last block belong to no cache entry: use the parse as is, uncached
+                blocks = len(parsed['blocks']) + 1
+                return {'instances': parsed['instances'], 'ports': parsed['ports'], 'blocks': blocks, 'reparsed': blocks}
+            entries = _cache_entries(text, parsed)
+            reparsed = len(entries)
+        cache = {'version': CACHE_VERSION, 'path': os.path.abspath(file_path), 'size': stat.st_size,
+                 'mtime': stat.st_mtime, 'length': len(text), 'hash': _content_hash(text), 'blocks': entries}
+        _save_cache(file_path, cache)
+
+    result = {'instances': [], 'ports': [], 'blocks': len(entries), 'reparsed': reparsed}
+    for entry in entries:
+        result['instances'].extend(entry['instances'])
+        result['ports'].extend(entry['ports'])
+    return result
+
+
+INSTANCE_HEADERS = ['TestType', 'TestName', 'ConfigurationFile', 'BasicTestConfiguration','Mode','BypassPort']
+PORT_HEADERS = ['Instance', 'Port']
+
+def write_instance_rows(data, file, headers=INSTANCE_HEADERS):
+    """Write instance rows with their header to an open text file (or io.StringIO)."""
+    writer = csv.writer(file)
+    writer.writerow(headers)
+    writer.writerows(data)
+
+def save_instance_to_csv(data, csv_path, headers=INSTANCE_HEADERS):
     with open(csv_path, 'w', newline='', encoding='utf-8') as file:
-        writer = csv.writer(file)
-        writer.writerow(headers)
-        writer.writerows(data)
+        write_instance_rows(data, file, headers)
 
-def save_port_to_csv(data, csv_path):
-    headers = ['Instance', 'Port']
+def save_port_to_csv(data, csv_path, headers=PORT_HEADERS):
     with open(csv_path, 'w', newline='', encoding='utf-8') as file:
         writer = csv.writer(file)
         writer.writerow(headers)
@@ -124,8 +342,7 @@ def save_port_to_csv(data, csv_path):
 
 # Main execution
 def mtpl_test_to_csv(file_path,place_in=''):
-    text = read_mtpl_file(file_path)
-    parsed_data = parse_mtpl_instance_content(text)
+    parsed_data = load_mtpl(file_path)['instances']
     output_csv = f"{place_in}{os.path.basename(file_path)}.csv"
     output_csv = fi.check_write_permission(output_csv)
     save_instance_to_csv(parsed_data,output_csv)
@@ -134,8 +351,7 @@ def mtpl_test_to_csv(file_path,place_in=''):
     return output_csv
 
 def mtpl_port_to_csv(file_path, place_in=''):
-    text = read_mtpl_file(file_path)
-    parsed_data = parse_mtpl_flow_items(text)
+    parsed_data = load_mtpl(file_path)['ports']
     output_csv = f"{place_in}{os.path.basename(file_path)}.port.csv"
     output_csv = fi.check_write_permission(output_csv)
     save_port_to_csv(parsed_data, output_csv)
@@ -143,6 +359,172 @@ def mtpl_port_to_csv(file_path, place_in=''):
     print(f"Extracted {len(parsed_data)} entries and saved to '{output_csv}'.")
     return output_csv
 
+def mtpl_to_csv(file_path, place_in=''):
+    """
+    Read and parse an MTPL once, writing both the instance and the port CSV.
+    
+    Same outputs as mtpl_test_to_csv() followed by mtpl_port_to_csv(), without
+    reading the (possibly remote) file twice. Goes through the parse cache of
+    load_mtpl(), so an unchanged file is not read at all.
+    
+    Returns:
+        tuple: (instance csv path, port csv path)
+    """
+    parsed = load_mtpl(file_path)
+    test_csv = fi.check_write_permission(f"{place_in}{os.path.basename(file_path)}.csv")
+    save_instance_to_csv(parsed['instances'], test_csv)
+    port_csv = fi.check_write_permission(f"{place_in}{os.path.basename(file_path)}.port.csv")
+    save_port_to_csv(parsed['ports'], port_csv)
+
+    print(f"Extracted {len(parsed['instances'])} instance entries to '{test_csv}' "
+          f"and {len(parsed['ports'])} port entries to '{port_csv}'.")
+    return test_csv, port_csv
+
+
+# Whole test program loading: <TP>/Modules/<Module>/<Module>.mtpl (+ .usrv)
+MODULE_COLUMN = 'Module'
+
+def find_tp_dir(path):
+    """
+    Return the test program base directory for an MTPL path (or any path inside the TP).
+    
+    The base directory is the folder holding 'Modules'; a path that is already a
+    TP directory (it contains a Modules folder) is returned unchanged.
+    """
+    path = os.path.normpath(path)
+    if os.path.isdir(os.path.join(path, 'Modules')):
+        return path
+    parts = path.split(os.sep)
+    if 'Modules' in parts:
+        return os.sep.join(parts[:len(parts) - 1 - parts[::-1].index('Modules')]) or os.sep
+    return None
+
+def discover_tp_modules(tp_dir):
+    """
+    Find the module MTPLs and user variable files of a test program.
+    
+    Args:
+        tp_dir (str): Test program base directory (the folder holding 'Modules')
+        
+    Returns:
+        list: One dict per Modules/<folder>/*.mtpl, sorted by module name:
+              {'module', 'mtpl', 'usrv' (the module's own .usrv or None), 'usrv_files'}
+    """
+    modules_dir = os.path.join(tp_dir, 'Modules')
+    modules = []
+    for folder in sorted(os.listdir(modules_dir)):
+        module_dir = os.path.join(modules_dir, folder)
+        if not os.path.isdir(module_dir):
+            continue
+        names = sorted(os.listdir(module_dir))
+        usrv_files = [os.path.join(module_dir, name) for name in names if name.lower().endswith('.usrv')]
+        for name in names:
+            if not name.lower().endswith('.mtpl'):
+                continue
+            module = os.path.splitext(name)[0]
+            own_usrv = os.path.join(module_dir, f"{module}.usrv")
+            modules.append({'module': module, 'mtpl': os.path.join(module_dir, name),
+                            'usrv': own_usrv if own_usrv in usrv_files else (usrv_files[0] if usrv_files else None),
+                            'usrv_files': usrv_files})
+    return sorted(modules, key=lambda module: module['module'])
+
+def _load_module(mtpl_file, use_cache=True):
+    # Runs in a pool worker process: must stay a picklable top-level function
+    try:
+        return load_mtpl(mtpl_file, use_cache), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+def load_test_program(tp_dir, max_workers=None, use_cache=True, progress_callback=None):
+    """
+    Parse every module MTPL of a test program on a process pool.
+    
+    Each module goes through load_mtpl() (single-pass parser plus the per-file
+    parse cache) in a worker process, so the CPU-bound parsing of 60+ modules runs
+    on all cores. If worker processes cannot be started the modules are parsed
+    one after the other instead. A module that fails to parse is reported in
+    'errors' and left out of the tables; the other modules are still returned.
+    
+    Args:
+        tp_dir (str): Test program base directory (the folder holding 'Modules')
+        max_workers (int, optional): Worker processes (default: one per CPU, at most one per module)
+        use_cache (bool): False forces a full parse of every module
+        progress_callback (callable, optional): Called as (done, total, module) after each module
+        
+    Returns:
+        dict: {
+            'instances': instance rows (INSTANCE_HEADERS) followed by the module name,
+            'ports': port rows (Instance, Port) followed by the module name,
+            'modules': the discover_tp_modules() entries with 'instances', 'blocks',
+                       'reparsed' and 'error' added,
+            'errors': {module: error message}
+        }
+    
+    Example:
+        >>> program = load_test_program("C:/hdmtprogs/WW32.4_EIO_TP8")
+        >>> save_instance_to_csv(program['instances'], 'TP8.csv', TP_INSTANCE_HEADERS)
+    """
+    modules = discover_tp_modules(tp_dir)
+    results = {}
+    done = 0
+
+    def collect(module, outcome):
+        nonlocal done
+        results[module['module']] = outcome
+        done += 1
+        if progress_callback:
+            progress_callback(done, len(modules), module['module'])
+
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(modules)))
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [(module, executor.submit(_load_module, module['mtpl'], use_cache)) for module in modules]
+                for module, future in futures:
+                    collect(module, future.result())
+        except Exception as e:
+            print(f"Process pool unavailable ({e}), loading the remaining modules one by one")
+    for module in modules:
+        if module['module'] not in results:
+            collect(module, _load_module(module['mtpl'], use_cache))
+
+    program = {'instances': [], 'ports': [], 'modules': modules, 'errors': {}}
+    for module in modules:
+        parsed, error = results[module['module']]
+        module['error'] = error
+        if error:
+            program['errors'][module['module']] = error
+            print(f"Could not parse {module['mtpl']}: {error}")
+            continue
+        module.update(instances=len(parsed['instances']), blocks=parsed['blocks'], reparsed=parsed['reparsed'])
+        program['instances'].extend(row + [module['module']] for row in parsed['instances'])
+        program['ports'].extend(row + [module['module']] for row in parsed['ports'])
+    return program
+
+TP_INSTANCE_HEADERS = INSTANCE_HEADERS + [MODULE_COLUMN]
+TP_PORT_HEADERS = PORT_HEADERS + [MODULE_COLUMN]
+
+def test_program_to_csv(tp_dir, place_in='', max_workers=None):
+    """
+    Load a whole test program and write the unified instance and port CSVs.
+    
+    Same layout as mtpl_to_csv(), plus a Module column; the files are named after
+    the TP folder (<TP>.tp.csv and <TP>.tp.port.csv).
+    
+    Returns:
+        tuple: (instance csv path, port csv path, load_test_program() result)
+    """
+    program = load_test_program(tp_dir, max_workers)
+    tp_name = os.path.basename(os.path.normpath(tp_dir))
+    test_csv = fi.check_write_permission(f"{place_in}{tp_name}.tp.csv")
+    save_instance_to_csv(program['instances'], test_csv, TP_INSTANCE_HEADERS)
+    port_csv = fi.check_write_permission(f"{place_in}{tp_name}.tp.port.csv")
+    save_port_to_csv(program['ports'], port_csv, TP_PORT_HEADERS)
+
+    print(f"Extracted {len(program['instances'])} instance entries from {len(program['modules'])} modules "
+          f"to '{test_csv}' and {len(program['ports'])} port entries to '{port_csv}'.")
+    return test_csv, port_csv, program
+
 
 
 if __name__ == "__main__":
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Osmosis - Batch Processing
+Headless entry point: runs the same processing pipeline as the GUI (pipeline.Pipeline)
+without Tk, for scheduled runs on a batch host.
+
+Usage:
+    python osmosis_batch.py --mtpl C:/TP/Modules/EIO_UCIE/EIO_UCIE.mtpl --material material.csv --output C:/output
+    python osmosis_batch.py --test-program C:/TP --material material.csv --tests TEST_A,TEST_B
+    python osmosis_batch.py --material material.csv --tests-file clkutils_tests.txt --clkutils
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add the application directory (and its parent, for PyUber) to the Python path
+app_dir = Path(__file__).parent.absolute()
+sys.path.insert(0, str(app_dir))
+if str(app_dir.parent) not in sys.path:
+    sys.path.insert(1, str(app_dir.parent))
+
+import pipeline as pl
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run Osmosis CTV processing without the GUI")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--mtpl', help="MTPL file to process the tests of")
+    source.add_argument('--test-program', help="Test program directory (all module MTPLs are loaded)")
+    parser.add_argument('--material', help="Material CSV/Excel file (Lot, Wafer, Program, Prefetch, Database, tests)")
+    parser.add_argument('--tests', help="Comma-separated test instances (default: the material file test columns)")
+    parser.add_argument('--tests-file', help="Text file with one test instance per line")
+    parser.add_argument('--output', default='', help="Output folder (default: <program>_output in the working directory)")
+    parser.add_argument('--clkutils', action='store_true', help="Process CLKUTILS tests from the ClkUtils config")
+    parser.add_argument('--clkutils-config', default=pl.DEFAULT_OPTIONS['clkutils_config'], help="ClkUtils config JSON")
+    parser.add_argument('--query-profile', default='', help="Query tuning profile from config.json")
+    parser.add_argument('--compact-stacking', action='store_true', help="Stack outputs into compact files")
+    parser.add_argument('--jmp', metavar='MODE', choices=['unified', 'unified_threaded', 'preloaded', 'parallel', 'adaptive'],
+                        help="Open the stacked files in JMP with this mode")
+    parser.add_argument('--max-workers', type=int, default=pl.DEFAULT_OPTIONS['max_workers'],
+                        help="Concurrent JMP instances (default: 3 in parallel mode, sized to free memory and CPU in adaptive mode)")
+    parser.add_argument('--summary-charts', action='store_true', help="Use summary charts in JMP")
+    parser.add_argument('--keep-intermediary', action='store_true', help="Keep the intermediary files")
+    parser.add_argument('--cpu-workers', type=int, help="Decode/index/stack worker processes (config.json pipeline.cpu_workers)")
+    parser.add_argument('--query-workers', type=int, help="Concurrent queries (config.json pipeline.query_workers)")
+    parser.add_argument('--datasource-limit', type=int, help="Concurrent queries per datasource (config.json pipeline.datasource_limit)")
+    parser.add_argument('--no-combine-programs', dest='combine_programs', action='store_false', default=None,
+                        help="Query each program separately instead of once per test (config.json pipeline.combine_programs)")
+    return parser.parse_args(argv)
+
+
+def read_test_list(args, material_tests):
+    tests = []
+    if args.tests:
+        tests.extend(test.strip() for test in args.tests.split(',') if test.strip())
+    if args.tests_file:
+        with open(args.tests_file, 'r') as tests_file:
+            tests.extend(line.strip() for line in tests_file if line.strip() and not line.startswith('#'))
+    return tests or material_tests
+
+
+def log(message, level='info'):
+    stream = sys.stderr if level in ('warning', 'error') else sys.stdout
+    print(f"[{time.strftime('%H:%M:%S')}] {level.upper()}: {message}", file=stream, flush=True)
+
+
+def progress(current, total, description):
+    if current == int(current):
+        print(f"[{time.strftime('%H:%M:%S')}] Progress: {int(current)}/{total} - {description}", flush=True)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    material, material_tests = ({}, [])
+    if args.material:
+        material, material_tests = pl.read_material_file(args.material)
+        log(f"Material file: {args.material}")
+    test_list = read_test_list(args, material_tests)
+    if not test_list:
+        log("No tests to process - use --tests, --tests-file or a material file with a test column", "error")
+        return 2
+
+    mtpl_df, mtpl_path, tp_modules = None, '', None
+    if args.test_program:
+        tp_dir = pl.normalize_unc_path(args.test_program)
+        mtpl_df, program = pl.load_test_program_table(tp_dir)
+        for error in program['errors']:
+            log(f"Could not parse {error}", "warning")
+        tp_modules = {module['module']: module for module in program['modules']}
+        # The pipeline derives the TP base directory from the text before 'Modules'
+        mtpl_path = os.path.join(tp_dir, 'Modules')
+        log(f"Loaded {len(mtpl_df)} test instances from {len(tp_modules)} modules")
+    elif args.mtpl:
+        mtpl_path = pl.normalize_unc_path(args.mtpl)
+        mtpl_df = pl.load_mtpl_table(mtpl_path)[0]
+        log(f"Loaded {len(mtpl_df)} test instances from {mtpl_path}")
+    elif not args.clkutils:
+        log("An MTPL (--mtpl or --test-program) is required unless only CLKUTILS tests are processed", "error")
+        return 2
+
+    options = {
+        'run_clkutils': args.clkutils,
+        'clkutils_config': args.clkutils_config,
+        'query_profile': args.query_profile,
+        'compact_stacking': args.compact_stacking,
+        'run_jmp': bool(args.jmp),
+        'jmp_mode': args.jmp or pl.DEFAULT_OPTIONS['jmp_mode'],
+        'max_workers': args.max_workers,
+        'summary_charts': args.summary_charts,
+        'delete_files': not args.keep_intermediary,
+    }
+    settings = {key: getattr(args, key, None) for key in pl.DEFAULT_SETTINGS}
+    settings = {key: value for key, value in settings.items() if value is not None}
+    pipeline = pl.Pipeline(mtpl_df, mtpl_path, material, options, tp_modules, log=log, progress=progress, settings=settings)
+    start_time = time.time()
+    try:
+        results = pipeline.run(test_list, args.output)
+    except KeyboardInterrupt:
+        log("Interrupted", "error")
+        return 130
+    except Exception as e:
+        log(f"Processing failed: {e}", "error")
+        return 1
+
+    for program, result in results.items():
+        log(f"{program}: {len(result['completed'])} tests processed, {len(result['skipped'])} skipped, "
+            f"{len(result['output_files'])} output files", "success")
+    log(f"Processing completed in {time.time() - start_time:.1f} seconds", "success")
+    return 0
+
+
+if __name__ == "__main__":
+    # Worker processes (whole test program MTPL loading, ClkUtils indexing) re-launch this script
+    multiprocessing.freeze_support()
+    sys.exit(main())
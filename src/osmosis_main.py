@@ -2,16 +2,45 @@
 """
 Osmosis - Data Processing Application
 Main entry point for the standalone application
+
+Run with --startup-timing (or OSMOSIS_STARTUP_TIMING=1) to print a breakdown of the
+time to the first window draw, including the import time of each package (see
+startup_timing.py); `python -X importtime osmosis_main.py` gives the per-module detail.
 """
 
 import sys
 import os
+import multiprocessing
+from contextlib import nullcontext
 from pathlib import Path
 
+if __name__ == "__main__":
+    # Worker processes (whole test program MTPL loading) re-launch the bundled executable
+    multiprocessing.freeze_support()
+
 # Add the application directory to Python path
 app_dir = Path(__file__).parent.absolute()
 sys.path.insert(0, str(app_dir))
 
+timer = None
+if __name__ == "__main__" and ('--startup-timing' in sys.argv or os.environ.get('OSMOSIS_STARTUP_TIMING') == '1'):
+    import startup_timing
+    timer = startup_timing.StartupTimer()
+
+def report_startup_timing(timer):
+    """Print the startup timing report and save it with the other per-user Osmosis files"""
+    timer.mark("first window draw")
+    report = timer.report()
+    print(report)
+    try:
+        import file_functions as fi
+        report_path = os.path.join(fi.get_app_data_dir(), 'startup_timing.txt')
+        with open(report_path, 'w') as report_file:
+            report_file.write(report + '\n')
+        print(f"Startup timing saved to {report_path}")
+    except OSError as e:
+        print(f"Could not save the startup timing: {e}")
+
 # Import and run the GUI
 try:
     # Check if running as a bundled executable
@@ -25,8 +54,11 @@ try:
         os.chdir(app_dir)
         sys.path.insert(0, str(app_dir))
     
-    # Import the main GUI module
-    import ctvlist_gui
+    # Import the main GUI module (PyUber and JMP support are imported on first use)
+    with timer.track_imports() if timer else nullcontext():
+        import ctvlist_gui
+    if timer:
+        timer.mark("import ctvlist_gui")
     
     # Create and run the GUI
     import tkinter as tk
@@ -35,7 +67,13 @@ try:
         root = tk.Tk()
         # Update title to reflect Osmosis branding
         root.title("Osmosis - Data Processing Application")
+        if timer:
+            timer.mark("create Tk root")
         app = ctvlist_gui.CTVListGUI(root)
+        if timer:
+            timer.mark("build GUI")
+            # Runs once the window has been mapped and drawn
+            root.after_idle(report_startup_timing, timer)
         root.mainloop()
         
 except ImportError as e:
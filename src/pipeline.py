@@ -0,0 +1,1046 @@
+"""
+Osmosis Processing Pipeline
+
+The end-to-end CTV flow - MTPL lookup, SmartCTV/CTV decode, index_CTV, uber_request,
+stacking and JMP - without any Tk dependency, so the same run can be started from the
+GUI (CTVListGUI.process_data) or headless from osmosis_batch.py on a batch host.
+
+Progress is reported through callbacks:
+- log(message, level): 'info', 'success', 'warning' or 'error' messages
+- progress(current, total, description): per-test progress (fractions within a test)
+- should_stop(): polled between tests and programs; returning True ends the run
+
+Example:
+    >>> mtpl_df = load_mtpl_table('C:/TP/Modules/EIO_UCIE/EIO_UCIE.mtpl')[0]
+    >>> material, tests = read_material_file('C:/runs/material.csv')
+    >>> pipeline = Pipeline(mtpl_df, 'C:/TP/Modules/EIO_UCIE/EIO_UCIE.mtpl', material)
+    >>> results = pipeline.run(tests, 'C:/output/')
+"""
+
+import io
+import os
+from concurrent.futures import FIRST_COMPLETED, BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+import pandas as pd
+import file_functions as fi
+import mtpl_parser as mt
+import index_ctv as ind
+import smart_json_parser as sm
+import clkutils_config_json_to_csv as clk
+import query_trace as qtr
+import query_tuning as qt
+
+DEFAULT_MATERIAL = {
+    'Lot': ['Not Null'],
+    'Wafer': ['Not Null'],
+    'Program': ['DAB%', 'DAC%'],
+    'Prefetch': 3,
+    'Database': ['D1D_PROD_XEUS', 'F24_PROD_XEUS']
+}
+
+# Same defaults as the Output tab of the GUI
+DEFAULT_OPTIONS = {
+    'run_clkutils': False,
+    'clkutils_config': 'configFile_DMR.json',
+    'query_profile': '',
+    'compact_stacking': False,
+    'run_jmp': False,
+    'jmp_mode': 'unified_threaded',
+    'max_workers': 0,  # JMP instance cap (0: 3 in parallel mode, sized to the machine in adaptive mode)
+    'summary_charts': False,
+    'delete_files': True,
+}
+
+# Scheduler settings, from the "pipeline" section of config.json
+DEFAULT_SETTINGS = {
+    'cpu_workers': 0,        # Decode/index/stack worker processes (0: one per CPU, at most 4)
+    'query_workers': 4,      # Concurrent uber_request calls
+    'datasource_limit': 2,   # Concurrent uber_request calls per datasource
+    'combine_programs': True,  # One query for all programs of a test, split by program afterwards
+}
+
+STOP_POLL_SECONDS = 0.1
+
+TEST_COLUMN_KEYWORDS = ['test', 'testname', 'test_name', 'testinstance', 'test_instance', 'tests', 'test_list']
+
+
+def _print_log(message, level='info'):
+    print(f"{level.upper()}: {message}")
+
+
+def normalize_unc_path(path):
+    """
+    Normalize a path, keeping exactly two leading backslashes on UNC paths, and
+    strip any quotation marks around it.
+    """
+    if not path:
+        return path
+    # Strip quotation marks (single and double) from the beginning and end
+    path = path.strip().strip('"\'')
+    if path.startswith('\\\\'):
+        # UNC path - os.path.normpath mangles the leading \\, so only collapse doubled separators
+        return '\\\\' + path.lstrip('\\').replace('\\\\', '\\')
+    return os.path.normpath(path)
+
+
+def instance_table(rows, headers=mt.INSTANCE_HEADERS):
+    """DataFrame of mtpl_parser instance rows, typed like a pd.read_csv of the .mtpl.csv."""
+    # Round-trip through an in-memory CSV so the column types match the .mtpl.csv the table used to be read from
+    buffer = io.StringIO()
+    mt.write_instance_rows(rows, buffer, headers)
+    buffer.seek(0)
+    return pd.read_csv(buffer)
+
+
+def load_mtpl_table(mtpl_path):
+    """
+    Parse one MTPL (through the incremental parse cache) into an instance table.
+
+    Returns:
+        tuple: (DataFrame, mtpl_parser.load_mtpl() result)
+    """
+    parsed = mt.load_mtpl(mtpl_path)
+    return instance_table(parsed['instances']), parsed
+
+
+def load_test_program_table(tp_dir, max_workers=None, progress_callback=None):
+    """
+    Parse every module MTPL of a test program into one instance table with a Module column.
+
+    Returns:
+        tuple: (DataFrame, mtpl_parser.load_test_program() result)
+    """
+    program = mt.load_test_program(tp_dir, max_workers, progress_callback=progress_callback)
+    return instance_table(program['instances'], mt.TP_INSTANCE_HEADERS), program
+
+
+def material_from_row(row):
+    """
+    Material settings from the first row of a material file.
+
+    Comma-separated cells become lists and Prefetch an integer; missing or empty
+    columns fall back to DEFAULT_MATERIAL.
+    """
+    material = {}
+    for col, default in DEFAULT_MATERIAL.items():
+        if col not in row:
+            material[col] = default
+        elif col == 'Prefetch':
+            value = row.get(col, default)
+            material[col] = int(value) if str(value).strip().isdigit() else default
+        else:
+            value = row.get(col, '')
+            parsed_value = [] if pd.isna(value) else [item.strip() for item in str(value).split(',') if item.strip()]
+            material[col] = parsed_value if parsed_value else default
+    return material
+
+
+def material_tests(material_df):
+    """Sorted unique test instances listed in the test columns of a material table."""
+    test_instances = set()
+    for col in material_df.columns:
+        if any(keyword in col.lower() for keyword in TEST_COLUMN_KEYWORDS):
+            for value in material_df[col].dropna():
+                test_instances.update(test.strip() for test in str(value).split(',') if test.strip())
+    return sorted(test_instances)
+
+
+def read_material_file(path):
+    """
+    Read a material CSV/Excel file as the GUI's Material tab does.
+
+    Returns:
+        tuple: (material dict for Pipeline, list of test instances from its test columns)
+    """
+    if path.lower().endswith(('.xlsx', '.xls')):
+        material_df = pd.read_excel(path, dtype=str)
+    else:
+        material_df = pd.read_csv(path, dtype=str)
+    if material_df.empty:
+        return dict(DEFAULT_MATERIAL), []
+    return material_from_row(material_df.iloc[0]), material_tests(material_df)
+
+
+def tp_base_dir(mtpl_path):
+    """Test program base directory of an MTPL path (the text before 'Modules')."""
+    if 'Modules' in mtpl_path:
+        base_dir = mtpl_path.split('Modules')[0].rstrip(os.sep)
+        # Ensure we have a valid directory path
+        if not base_dir or base_dir == '.' or len(base_dir) < 3:
+            # Fallback to parent directory of MTPL file
+            base_dir = os.path.dirname(os.path.dirname(mtpl_path))
+    else:
+        base_dir = os.path.dirname(mtpl_path)
+    return os.path.normpath(base_dir)
+
+
+def find_clkutils_config(config_file, log=_print_log):
+    """
+    Locate the ClkUtils config file: as given, next to the sources, or in the working directory.
+
+    Returns:
+        str: Path of the config file (None if it was not found; the reason is logged)
+    """
+    if not config_file:
+        # Fallback to default if empty
+        config_file = DEFAULT_OPTIONS['clkutils_config']
+        log(f"No config file specified, using default: {config_file}")
+    if os.path.exists(config_file):
+        log(f"Using config file: {os.path.abspath(config_file)}")
+        return config_file
+    if os.path.isabs(config_file):
+        log(f"Error: Config file '{config_file}' not found!\n"
+            f"Please specify a valid config file path in the CLKUtils tab.", "error")
+        return None
+    script_dir_config = os.path.join(os.path.dirname(os.path.abspath(__file__)), config_file)
+    if os.path.exists(script_dir_config):
+        log(f"Using config file from script directory: {script_dir_config}")
+        return script_dir_config
+    cwd_config = os.path.join(os.getcwd(), config_file)
+    if os.path.exists(cwd_config):
+        log(f"Using config file from current directory: {cwd_config}")
+        return cwd_config
+    log(f"Error: Config file '{config_file}' not found!\n"
+        f"Checked locations:\n"
+        f"  • Specified path: {config_file}\n"
+        f"  • Script directory: {script_dir_config}\n"
+        f"  • Current directory: {cwd_config}\n"
+        f"Please specify a valid config file path in the CLKUtils tab.", "error")
+    return None
+
+
+def parse_usrv_file(usrv_file_path, log=_print_log):
+    """
+    Parse a .usrv file and extract user variable definitions.
+
+    Args:
+        usrv_file_path: Path to the .usrv file
+        log: Logging callback
+
+    Returns:
+        Dictionary with namespace -> {variable_name: value}
+    """
+    user_vars = {}
+    current_namespace = None
+
+    try:
+        with open(usrv_file_path, 'r', encoding='utf-8') as file:
+            content = file.read()
+
+        # Split into lines and process
+        lines = content.split('\n')
+        in_namespace = False
+        brace_count = 0
+
+        for line in lines:
+            line = line.strip()
+
+            # Skip empty lines and comments
+            if not line or line.startswith('//') or line.startswith('#'):
+                continue
+
+            # Check for namespace declaration like "UserVars SIO_PCIE"
+            if line.startswith('UserVars ') and '{' in line:
+                namespace_line = line.replace('UserVars ', '').replace('{', '').strip()
+                current_namespace = namespace_line
+                user_vars[current_namespace] = {}
+                in_namespace = True
+                brace_count = 1
+                continue
+            elif line.startswith('UserVars '):
+                namespace_line = line.replace('UserVars ', '').strip()
+                current_namespace = namespace_line
+                user_vars[current_namespace] = {}
+                in_namespace = False
+                continue
+
+            # Handle opening braces
+            if '{' in line and not in_namespace:
+                in_namespace = True
+                brace_count = line.count('{')
+                continue
+
+            # Handle closing braces
+            if '}' in line:
+                brace_count -= line.count('}')
+                if brace_count <= 0:
+                    in_namespace = False
+                    current_namespace = None
+                continue
+
+            # Parse variable definitions inside namespace
+            if in_namespace and current_namespace and '=' in line:
+                # Remove semicolon and split by =
+                line = line.rstrip(';')
+
+                # Handle different variable declaration formats
+                if 'String ' in line:
+                    var_part = line.replace('String ', '').strip()
+                elif 'Const String ' in line:
+                    var_part = line.replace('Const String ', '').strip()
+                else:
+                    var_part = line.strip()
+
+                if '=' in var_part:
+                    var_name, var_value = var_part.split('=', 1)
+                    var_name = var_name.strip()
+                    var_value = var_value.strip(' "\'')  # Remove quotes and spaces
+                    user_vars[current_namespace][var_name] = var_value
+
+        log(f"Parsed .usrv file: {len(user_vars)} namespaces found")
+        for ns, vars_dict in user_vars.items():
+            log(f"  Namespace {ns}: {len(vars_dict)} variables")
+
+        return user_vars
+
+    except Exception as e:
+        log(f"Error parsing .usrv file {usrv_file_path}: {str(e)}")
+        return {}
+
+
+def resolve_sio_config_path(config_expression, usrv_file_path, base_dir, log=_print_log):
+    """
+    Parse the .usrv file and resolve the SIO configuration file path.
+
+    Args:
+        config_expression: String like 'GetEnvironmentVariable("~HDMT_TP_BASE_DIR") + SIO_PCIE.inputFilePath + UCC.DNELB'
+        usrv_file_path: Path to the .usrv file
+        base_dir: Base directory for the test program
+        log: Logging callback
+
+    Returns:
+        Resolved file path or None if resolution fails
+    """
+    try:
+        # Parse the .usrv file to extract variable definitions
+        user_vars = parse_usrv_file(usrv_file_path, log)
+
+        # Clean the config expression
+        config_expr = config_expression.strip().strip('"\'')
+
+        log(f"Resolving SIO config: {config_expr}")
+        log(f"Base directory: {base_dir}")
+
+        # Handle GetEnvironmentVariable("~HDMT_TP_BASE_DIR") - replace with base_dir
+        if 'GetEnvironmentVariable("~HDMT_TP_BASE_DIR")' in config_expr:
+            # Normalize the base_dir for UNC paths
+            normalized_base_dir = normalize_unc_path(base_dir)
+            config_expr = config_expr.replace('GetEnvironmentVariable("~HDMT_TP_BASE_DIR")', f'"{normalized_base_dir}"')
+            log(f"After base_dir replacement: {config_expr}")
+
+        # Split the expression by '+' and process each part
+        parts = [part.strip() for part in config_expr.split('+')]
+        resolved_parts = []
+
+        log(f"Processing parts: {parts}")
+
+        for part in parts:
+            part = part.strip(' "\'')
+            log(f"Processing part: '{part}'")
+
+            if part.startswith('"') and part.endswith('"'):
+                # It's a literal string
+                literal_value = part.strip('"')
+                resolved_parts.append(literal_value)
+                log(f"  -> Literal string: '{literal_value}'")
+            elif '.' in part and not part.startswith('\\\\'):
+                # It's a variable reference like SIO_PCIE.inputFilePath or UCC.DNELB
+                # But not a UNC path (which starts with \\)
+                namespace, var_name = part.split('.', 1)
+                if namespace in user_vars and var_name in user_vars[namespace]:
+                    var_value = user_vars[namespace][var_name].strip(' "\'')
+                    resolved_parts.append(var_value)
+                    log(f"  -> Variable {namespace}.{var_name}: '{var_value}'")
+                else:
+                    log(f"Warning: Variable {part} not found in .usrv file")
+                    return None
+            else:
+                # Direct reference or literal (including UNC paths that might have been substituted)
+                resolved_parts.append(part)
+                log(f"  -> Direct reference: '{part}'")
+
+        # Join all parts to form the final path
+        resolved_path = ''.join(resolved_parts)
+        log(f"Joined path: '{resolved_path}'")
+
+        # Normalize path separators and make it absolute
+        resolved_path = resolved_path.replace('/', os.sep)
+
+        if not os.path.isabs(resolved_path):
+            resolved_path = os.path.join(base_dir, resolved_path)
+
+        # Final normalization for UNC paths
+        resolved_path = normalize_unc_path(resolved_path)
+
+        log(f"SIO config resolution: {config_expression} -> {resolved_path}")
+
+        return resolved_path
+
+    except Exception as e:
+        log(f"Error resolving SIO config path: {str(e)}")
+        return None
+
+
+def _uber_request(*args, **kwargs):
+    # Imported on first use: PyUber is only needed once a query actually runs
+    import pyuber_query as py
+    return py.uber_request(*args, **kwargs)
+
+
+def _uber_request_programs(*args, **kwargs):
+    import pyuber_query as py
+    return py.uber_request_programs(*args, **kwargs)
+
+
+def load_settings(config_path=None):
+    """Return the pipeline settings from config.json merged over the defaults."""
+    return fi.load_config_section('pipeline', DEFAULT_SETTINGS, config_path)
+
+
+def _query_job(indexed_file, test, test_type, csv_identifier, tag_header_names, config_number='', mode=''):
+    return {'indexed_file': indexed_file, 'test': test, 'test_type': test_type, 'csv_identifier': csv_identifier,
+            'config_number': config_number, 'mode': mode, 'tag_header_names': tag_header_names,
+            'outputs': {}, 'stacked': {}}
+
+
+def prepare_test(spec):
+    """
+    Decode and index one MTPL test - the CPU stage, run in a worker process.
+
+    Args:
+        spec (dict): test, test_type, mode, config_value (MTPL column 3), test_file,
+                     module_name, base_dir and place_in of the test
+
+    Returns:
+        dict: 'queries' (one uber_request job per indexed file), 'intermediary_files',
+              'messages' ((message, level) pairs for the caller's log) and 'status'
+              ('completed' or the progress description of a skipped/failed test)
+    """
+    messages = []
+    result = {'queries': [], 'intermediary_files': [], 'messages': messages, 'status': 'completed'}
+    test, test_type, mode = spec['test'], spec['test_type'], spec['mode']
+    test_file, module_name, base_dir, place_in = spec['test_file'], spec['module_name'], spec['base_dir'], spec['place_in']
+    try:
+        if "ctvdecoder" in test_type.lower():  # simple CTV indexing
+            messages.append((f"Processing CtvDecoderSpm for test: {test}", 'info'))
+            indexed_file, csv_identifier, tag_header_names = ind.index_CTV(test_file, test, module_name, place_in)
+            result['intermediary_files'].append(indexed_file)
+            result['queries'].append(_query_job(indexed_file, test, test_type, csv_identifier, tag_header_names))
+
+        elif "smartctv" in test_type.lower():  # SMART CTV loop/check logic and indexing
+            if "ctvtag" in mode.lower():
+                mode = mode.strip('\"\'')
+                config_number = ''
+                messages.append((f"Processing CTV Tag SmartCtvDc for test: {test}", 'info'))
+                messages.append((f"Config number: {config_number}", 'info'))
+                try:
+                    ctv_files, ITUFF_suffixes, config_numbers = sm.process_SmartCTV(base_dir, test_file, config_number, place_in)
+                    for ctv_file, ITUFF_suffix in zip(ctv_files, ITUFF_suffixes):
+                        result['intermediary_files'].append(ctv_file)
+                        suffixed_test = test + ITUFF_suffix
+                        indexed_file, csv_identifier, tag_header_names = ind.index_CTV(ctv_file, suffixed_test, module_name, place_in, mode, config_number)
+                        result['intermediary_files'].append(indexed_file)
+                        result['queries'].append(_query_job(indexed_file, suffixed_test, test_type, csv_identifier,
+                                                            tag_header_names, config_number, mode))
+                except Exception as e:
+                    messages.append((f"❌ Error in SmartCTV processing for test {test}: {str(e)}", 'info'))
+                    result['status'] = f"Failed test: {test} (SmartCTV error)"
+            else:
+                config_number = str(int(spec['config_value']))
+                try:
+                    ctv_file, ITUFF_suffixes, config_numbers = sm.process_SmartCTV(base_dir, test_file, config_number, place_in)
+                    if isinstance(ctv_file, list):
+                        ctv_file = ctv_file[0]  # Use the first file if multiple are returned
+                        test = test + ITUFF_suffixes[0]
+                except:
+                    ctv_file = sm.process_SmartCTV(base_dir, test_file, config_number, place_in)
+                    if isinstance(ctv_file, tuple):
+                        ctv_file = ctv_file[0][0]
+                # When config_number is provided, process_SmartCTV returns only the ctv_file path
+                result['intermediary_files'].append(ctv_file)
+                indexed_file, csv_identifier, tag_header_names = ind.index_CTV(ctv_file, test, module_name, place_in)
+                result['intermediary_files'].append(indexed_file)
+                result['queries'].append(_query_job(indexed_file, test, test_type, csv_identifier, tag_header_names))
+        else:
+            messages.append((f"Unknown test type: {test_type}", 'info'))
+            result['status'] = f"Skipped test: {test} (unknown type)"
+    except Exception as test_error:
+        messages.append((f"Error processing test {test}: {str(test_error)}", 'info'))
+    return result
+
+
+def stack_output(output_file, tag_header_names, compact=False):
+    """Stack one query output for JMP - the CPU stage after a query, run in a worker process."""
+    import jmp_python as jmp
+    if compact:
+        return jmp.stack_to_compact_files(output_file, tag_header_names)
+    return jmp.stack_and_split_file(output_file, tag_header_names)
+
+
+class Pipeline:
+    """
+    One processing run of a test list, for every program of the material data.
+
+    The tests are pipelined: decode/index and stacking (CPU stages) run on a process
+    pool, uber_request (database stage) on a thread pool limited per datasource, so
+    the CPU work of one test overlaps the query wait of another. A stage starts as
+    soon as the stage it depends on finishes; the output, stacked and intermediary
+    file lists keep the test order regardless of completion order.
+
+    Decode/index does not depend on the program, so it runs once per test and its
+    files are shared by every program. With several programs the query of a test
+    covers all of them at once (uber_request_programs) unless the combine_programs
+    setting is off, in which case each program is queried separately. Each program's
+    outputs are then optionally opened in JMP and the intermediary files cleaned up -
+    the flow of the GUI's Start Processing button.
+
+    Args:
+        mtpl_df (DataFrame): Instance table (see load_mtpl_table); may be None for ClkUtils-only runs
+        mtpl_path (str): Loaded MTPL file (or <TP>/Modules for a whole test program);
+                         the TP base directory and the .usrv lookup derive from it
+        material (dict): Lot/Wafer/Program/Prefetch/Database (DEFAULT_MATERIAL for missing keys)
+        options (dict, optional): Overrides for DEFAULT_OPTIONS
+        tp_modules (dict, optional): Module name -> mtpl_parser.discover_tp_modules() entry,
+                                     for tables with a Module column
+        log (callable, optional): log(message, level) callback (prints by default)
+        progress (callable, optional): progress(current, total, description) callback
+        should_stop (callable, optional): Returns True to stop the run; queued stages are
+                                          cancelled and running ones allowed to finish
+        settings (dict, optional): Overrides for the config.json "pipeline" settings
+    """
+
+    def __init__(self, mtpl_df, mtpl_path, material=None, options=None, tp_modules=None,
+                 log=None, progress=None, should_stop=None, settings=None):
+        self.mtpl_df = mtpl_df
+        self.mtpl_path = normalize_unc_path(mtpl_path or '')
+        self.material = dict(DEFAULT_MATERIAL, **(material or {}))
+        self.options = dict(DEFAULT_OPTIONS, **(options or {}))
+        self.tp_modules = tp_modules or {}
+        self.log = log or _print_log
+        self.progress = progress or (lambda current, total, description: None)
+        self.should_stop = should_stop or (lambda: False)
+        self.settings = dict(load_settings(), **(settings or {}))
+        self.base_dir = ''
+        self.stopped = False
+
+    def material_lists(self):
+        """Lot, wafer, program, prefetch and database settings, wafers as integers where numeric."""
+        material = self.material
+        wafer_list = []
+        for w in material['Wafer']:
+            if str(w).strip() and str(w).strip().isdigit():
+                wafer_list.append(int(w))
+            else:
+                wafer_list.append(str(w))  # Keep as string if not numeric
+        return material['Lot'], wafer_list, material['Program'], material['Prefetch'], material['Database']
+
+    def cpu_workers(self):
+        """Worker processes for the decode/index/stack stages (config 0: one per CPU, at most 4)."""
+        return max(1, int(self.settings['cpu_workers'] or min(4, os.cpu_count() or 1)))
+
+    def run(self, test_list, place_in=''):
+        """
+        Process the tests for every program.
+
+        Args:
+            test_list (list): Test instance names (and/or CLKUTILS tests)
+            place_in (str): Output folder ('' creates <program>_output in the working directory)
+
+        Returns:
+            dict: program -> {'output_files', 'stacked_files', 'intermediary_files', 'completed', 'skipped'}
+        """
+        trace = qtr.start_run(place_in)
+        self.log(f"Query timing trace: {trace.path}")
+        try:
+            lot_list, wafer_list, program_list, prefetch, databases = self.material_lists()
+            self.log(f"Using material data - Lot: {lot_list}, Wafer: {wafer_list}, Program: {program_list}, "
+                     f"Prefetch: {prefetch}, Database: {databases}")
+
+            if self.mtpl_path:
+                self.base_dir = tp_base_dir(self.mtpl_path)
+                self.log(f"Base directory: {self.base_dir}")
+                # Validate base directory exists
+                if not os.path.exists(self.base_dir):
+                    raise ValueError(f"Base directory does not exist: {self.base_dir}")
+                if not os.path.isdir(self.base_dir):
+                    raise ValueError(f"Base path is not a directory: {self.base_dir}")
+
+            if not program_list:
+                return {}
+            folders = {}
+            for program in program_list:
+                folders[program] = self.program_folder(place_in, program, len(program_list) > 1)
+                self.log(f"Output directory for {program}: {folders[program]}")
+            # Decoded and indexed files are shared: the output folder itself, or the first program's
+            shared_place_in = self.program_folder(place_in, program_list[0], False)
+
+            entries = self.plan_tests(test_list, shared_place_in)
+            self.schedule(entries, folders)
+
+            results = {}
+            for program in program_list:
+                self.log(f"Processing program: {program}")
+                results[program] = self.program_results(entries, program, folders[program])
+            if self.options['delete_files']:
+                intermediary_files = []
+                for result in results.values():
+                    intermediary_files.extend(f for f in result['intermediary_files'] if f not in intermediary_files)
+                self.cleanup(intermediary_files)
+            return results
+        finally:
+            for line in qtr.end_run().splitlines():
+                self.log(line)
+
+    @staticmethod
+    def program_folder(place_in, program, multiple_programs):
+        """Create and return the output folder of one program (with a trailing separator)."""
+        if place_in:
+            place_in = os.path.abspath(place_in)
+            os.makedirs(place_in, exist_ok=True)
+            place_in = place_in + os.sep
+            if multiple_programs:
+                place_in = os.path.normpath(place_in + f'{program}_output')
+                os.makedirs(place_in, exist_ok=True)
+                place_in = place_in + os.sep
+        else:
+            place_in = os.path.normpath(os.getcwd() + os.sep + f'{program}_output')
+            os.makedirs(place_in, exist_ok=True)
+            place_in = place_in + os.sep
+        return place_in
+
+    def program_results(self, entries, program, place_in):
+        """Collect the files of one program from the scheduled tests, then run JMP on them."""
+        # Collect the results in test order, whatever order the stages finished in
+        result = {'output_files': [], 'stacked_files': [], 'intermediary_files': [], 'completed': [], 'skipped': []}
+        for entry in entries:
+            result['intermediary_files'].extend(entry['intermediary_files'])
+            for query in entry['queries']:
+                if program not in query['outputs']:
+                    continue
+                datainput_file, output_file = query['outputs'][program]
+                result['intermediary_files'].append(datainput_file)
+                result['output_files'].append(output_file)
+                if output_file in query['stacked']:
+                    result['stacked_files'].append(query['stacked'][output_file])
+            result['completed' if entry['status'] == 'completed' else 'skipped'].append(entry['test'])
+        if result['stacked_files']:
+            self.log(f"Successfully stacked {len(result['stacked_files'])} files")
+
+        if self.options['run_jmp']:
+            if self.stopped:
+                self.log("Processing stopped - skipping JMP", "warning")
+            elif result['stacked_files']:
+                try:
+                    self.run_jmp(result['stacked_files'], place_in)
+                except Exception as e:
+                    self.log(f"Error running JMP: {str(e)}", "error")
+                    self.log(f"Error type: {type(e).__name__}", "error")
+            else:
+                self.log("No stacked files available - cannot run JMP", "warning")
+        return result
+
+    def plan_tests(self, test_list, place_in):
+        """
+        Look up every test (MTPL row, SIO config, config file) before any stage runs.
+
+        CLKUTILS tests are indexed here in one batch, so they go straight to their queries.
+
+        Returns:
+            list: One entry per test, in test order: test, status (None until finished),
+                  spec (decode/index job, MTPL tests), queries, intermediary_files
+        """
+        entries = []
+        clkutils_indexed = None
+        for index, test in enumerate(test_list):
+            entry = {'index': index, 'test': test, 'status': None, 'spec': None, 'queries': [],
+                     'intermediary_files': [], 'pending': 0}
+            entries.append(entry)
+            if str(test).lower() == 'nan':
+                entry['status'] = "Skipped invalid test entry"
+            elif self.options['run_clkutils']:
+                if 'CLKUTILS' not in test.upper():
+                    entry['status'] = f"Skipped test: {test} (not a ClkUtils test)"
+                    continue
+                if clkutils_indexed is None:
+                    clkutils_indexed = self.index_clkutils_tests(test_list, place_in)
+                if clkutils_indexed.get(test):
+                    indexed_file, tag_header_names = clkutils_indexed[test]
+                    entry['intermediary_files'].append(indexed_file)
+                    entry['queries'].append(_query_job(indexed_file, test, 'ClkUtils', '', tag_header_names))
+                else:
+                    entry['status'] = f"Skipped test: {test} (not indexed)"
+            else:
+                spec = self.test_spec(test, place_in)
+                if isinstance(spec, str):
+                    entry['status'] = spec
+                else:
+                    entry['spec'] = spec
+        return entries
+
+    def index_clkutils_tests(self, test_list, place_in):
+        """Index every CLKUTILS test of the list in one pass (shared config and expansions).
+
+        Tests that fail to index are left out, so plan_tests marks them as not indexed.
+        """
+        config_file = find_clkutils_config(self.options['clkutils_config'].strip(), self.log)
+        if not config_file:
+            return {}
+        bitbased = True
+        clkutils_tests = [t for t in test_list if 'CLKUTILS' in str(t).upper()]
+        self.log(f"Indexing {len(clkutils_tests)} ClkUtils tests")
+        return clk.process_tests_to_csv(config_file, clkutils_tests, place_in, bitbased, max_workers=self.cpu_workers())
+
+    def resolve_test_file(self, test, row):
+        """
+        Configuration file of an MTPL instance row, resolving SIO user variables.
+
+        Returns:
+            tuple: (config path relative to the TP, absolute test file) or None if skipped
+        """
+        config_expression = row.iloc[2]
+        if 'sio' not in config_expression.lower():
+            # Original processing for non-SIO tests
+            config_path = fi.process_file_input(config_expression[config_expression.find('Modules'):].strip('\"'))
+            return config_path, os.path.join(self.base_dir, config_path)
+
+        self.log(f"Processing SIO for test: {test}")
+        # Extract the module name from the MTPL path to find the .usrv file
+        mtpl_dir = os.path.dirname(self.mtpl_path)
+        usrv_file_path = os.path.join(mtpl_dir, f"{os.path.basename(mtpl_dir)}.usrv")
+        if self.tp_modules and mt.MODULE_COLUMN in row.index:
+            # Whole test program: each row knows its own module
+            usrv_file_path = self.tp_modules.get(row[mt.MODULE_COLUMN], {}).get('usrv') or usrv_file_path
+
+        if not (usrv_file_path and os.path.exists(usrv_file_path)):
+            self.log(f"Warning: .usrv file not found: {usrv_file_path}")
+            # Fall back to original processing
+            config_path = fi.process_file_input(config_expression[config_expression.find('Modules'):].strip('\"'))
+            return config_path, os.path.join(self.base_dir, config_path)
+
+        self.log(f"Found .usrv file: {usrv_file_path}")
+        resolved_config_path = resolve_sio_config_path(config_expression, usrv_file_path, self.base_dir, self.log)
+        if not resolved_config_path:
+            self.log(f"Failed to resolve SIO config path for: {config_expression}")
+            return None
+        self.log(f"Resolved SIO config path: {resolved_config_path}")
+        # Override the config_path for SIO processing
+        config_path = resolved_config_path.replace(self.base_dir, "").lstrip(os.sep)
+        config_path = config_path.replace("\\", "/")  # Normalize path separators
+        return config_path, os.path.join(self.base_dir, config_path)
+
+    def test_spec(self, test, place_in):
+        """
+        Decode/index job of one MTPL test instance (see prepare_test).
+
+        Returns:
+            dict or str: The job, or the progress description of a skipped test
+        """
+        if self.mtpl_df is None:
+            self.log(f"No MTPL loaded - cannot process test: {test}", "error")
+            return f"Skipped test: {test} (no MTPL loaded)"
+        # Find matching row in MTPL dataframe
+        matching_rows = self.mtpl_df[self.mtpl_df.iloc[:, 1] == test]  # Test name is in column 1
+        if matching_rows.empty:
+            self.log(f"No matching MTPL entry found for test: {test}")
+            return f"Skipped test: {test} (no MTPL entry)"
+        row = matching_rows.iloc[0]
+
+        try:
+            resolved = self.resolve_test_file(test, row)
+        except Exception as e:
+            self.log(f"Error processing SIO config: {str(e)}")
+            return f"Skipped test: {test} (SIO processing error)"
+        if resolved is None:
+            return f"Skipped test: {test} (SIO config resolution failed)"
+        config_path, test_file = resolved
+
+        if not os.path.exists(test_file):
+            self.log(f"Config file not found: {test_file}")
+            return f"Skipped test: {test} (config file not found)"
+        self.log(f"Found config file: {test_file}")
+        return {
+            'test': test,
+            'test_type': row.iloc[0],  # Test type is in column 0
+            'mode': str(row.iloc[4]),  # Mode is in column 4
+            'config_value': row.iloc[3],
+            'test_file': os.path.abspath(test_file),
+            'module_name': fi.get_module_name(config_path).strip('\\').strip('//'),
+            'base_dir': os.path.abspath(self.base_dir),
+            'place_in': place_in,
+        }
+
+    def cpu_executor(self):
+        """Process pool for the CPU stages (a single thread if processes are unavailable)."""
+        workers = self.cpu_workers()
+        if workers > 1:
+            try:
+                return ProcessPoolExecutor(max_workers=workers)
+            except Exception as e:
+                self.log(f"Process pool unavailable ({e}), running decode/index stages in a thread", "warning")
+        return ThreadPoolExecutor(max_workers=1)
+
+    def query_groups(self, folders):
+        """Programs queried together: all at once, or one by one if combine_programs is off."""
+        if len(folders) > 1 and self.settings['combine_programs']:
+            return [folders]
+        return [{program: folder} for program, folder in folders.items()]
+
+    def run_query(self, folders, query):
+        """
+        uber_request for one indexed file (each datasource query holds one of that datasource's slots).
+
+        Returns:
+            dict: program -> (intermediary file, output file), None if stopped
+        """
+        lot_list, wafer_list, _, prefetch, databases = self.material_lists()
+        databases = list(dict.fromkeys(databases))
+        if self.stopped:
+            return None
+        if len(folders) > 1:
+            self.log(f"Performing data request for test: {query['test']} (programs: {', '.join(folders)})")
+            return _uber_request_programs(
+                query['indexed_file'], query['test'], query['test_type'], folders, query['csv_identifier'],
+                lot_list, wafer_list, prefetch, databases, query['config_number'], query['mode'],
+                query_profile=self.options['query_profile'])
+        (program, place_in), = folders.items()
+        self.log(f"Performing data request for test: {query['test']}")
+        return {program: _uber_request(
+            query['indexed_file'], query['test'], query['test_type'], place_in, program, query['csv_identifier'],
+            lot_list, wafer_list, prefetch, databases, query['config_number'], query['mode'],
+            query_profile=self.options['query_profile'])}
+
+    def schedule(self, entries, folders):
+        """
+        Run the decode/index -> query -> stack stages of the tests concurrently.
+
+        Decode/index jobs are started in test order, at most one per config file at a
+        time (SmartCTV reuses decoded files by name). Each query starts when its test
+        is indexed and each stack when its query returns, one per program output.
+        """
+        total = len(entries)
+        finished = [0]
+        # Per-datasource limit, applied by execute_pyuber_query around each datasource's queries
+        qt.set_datasource_limit(self.settings['datasource_limit'])
+        query_pool = ThreadPoolExecutor(max_workers=max(1, int(self.settings['query_workers'])))
+        cpu_pool = self.cpu_executor()
+        cpu_slots = self.cpu_workers()
+        running = {}  # future -> (stage, entry, query, fn, args)
+        waiting = [entry for entry in entries if entry['spec']]
+        busy_files = set()
+        stacking = [True]  # False once jmp_python turned out to be missing
+
+        def finish(entry):
+            if entry['status'] is None:
+                entry['status'] = 'completed'
+            finished[0] += 1
+            if entry['status'] == 'completed':
+                self.log(f"Completed processing for test: {entry['test']}")
+            self.progress(finished[0], total, f"Completed test: {entry['test']}" if entry['status'] == 'completed' else entry['status'])
+
+        def submit(pool, stage, entry, query, fn, *args):
+            running[pool.submit(fn, *args)] = (stage, entry, query, fn, args)
+
+        def submit_cpu(stage, entry, query, fn, *args):
+            nonlocal cpu_pool, cpu_slots
+            try:
+                submit(cpu_pool, stage, entry, query, fn, *args)
+            except (BrokenExecutor, RuntimeError) as e:
+                self.log(f"Process pool failed ({e}), running the remaining CPU stages in a thread", "warning")
+                cpu_pool.shutdown(wait=False)
+                cpu_pool, cpu_slots = ThreadPoolExecutor(max_workers=1), 1
+                submit(cpu_pool, stage, entry, query, fn, *args)
+
+        def start_queries(entry):
+            for query in entry['queries']:
+                for group in self.query_groups(folders):
+                    entry['pending'] += 1
+                    submit(query_pool, 'query', entry, query, self.run_query, group, query)
+            if not entry['pending']:
+                finish(entry)
+
+        def handle(future, stage, entry, query, fn, args):
+            try:
+                outcome = future.result()
+            except BrokenExecutor:
+                # A worker process died: run the stage again (submit_cpu falls back to a thread)
+                submit_cpu(stage, entry, query, fn, *args)
+                return
+            except Exception as e:
+                outcome, error = None, e
+            else:
+                error = None
+
+            if stage == 'prepare':
+                busy_files.discard(entry['spec']['test_file'])
+                if error is not None:
+                    outcome = {'queries': [], 'intermediary_files': [], 'status': 'completed',
+                               'messages': [(f"Error processing test {entry['test']}: {str(error)}", 'info')]}
+                for message, level in outcome['messages']:
+                    self.log(message, level)
+                entry['intermediary_files'].extend(outcome['intermediary_files'])
+                entry['queries'] = outcome['queries']
+                if outcome['status'] != 'completed':
+                    entry['status'] = outcome['status']
+                start_queries(entry)
+                return
+
+            if stage == 'query' and error is None and outcome:
+                query['outputs'].update(outcome)
+                for datainput_file, datacombine_file in outcome.values():
+                    if stacking[0] and not self.stopped and os.path.exists(datacombine_file):
+                        self.log(f"Stacking file: {os.path.basename(datacombine_file)}")
+                        entry['pending'] += 1
+                        submit_cpu('stack', entry, query, stack_output, datacombine_file, query['tag_header_names'],
+                                   self.options['compact_stacking'])
+            elif stage == 'query' and error is not None:
+                self.log(f"Error processing test {query['test']}: {str(error)}")
+            elif stage == 'stack' and error is None:
+                query['stacked'][args[0]] = outcome
+                self.log(f"Created stacked file: {os.path.basename(outcome)}")
+            elif stage == 'stack' and isinstance(error, ImportError):
+                stacking[0] = False
+                self.log("Warning: jmp_python module not found - cannot stack files", "warning")
+            elif stage == 'stack':
+                self.log(f"Error stacking files: {str(error)}", "error")
+            entry['pending'] -= 1
+            if not entry['pending']:
+                finish(entry)
+
+        try:
+            for entry in entries:
+                if entry['status'] is not None:
+                    finish(entry)
+                elif entry['queries']:
+                    self.log(f"Processing test: {entry['test']} ({entry['index'] + 1}/{total})")
+                    start_queries(entry)
+
+            while waiting or running:
+                if self.should_stop():
+                    self.stopped = True
+                    break
+                # Keep the CPU workers busy with the next tests, one decode per config file at a time
+                in_flight = sum(1 for stage, *_ in running.values() if stage == 'prepare')
+                for entry in list(waiting):
+                    if in_flight >= cpu_slots:
+                        break
+                    if entry['spec']['test_file'] in busy_files:
+                        continue
+                    waiting.remove(entry)
+                    busy_files.add(entry['spec']['test_file'])
+                    in_flight += 1
+                    self.log(f"Processing test: {entry['test']} ({entry['index'] + 1}/{total})")
+                    submit_cpu('prepare', entry, None, prepare_test, entry['spec'])
+
+                done, _ = wait(list(running), timeout=STOP_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                for future in done:
+                    handle(future, *running.pop(future))
+        finally:
+            if self.stopped:
+                cancelled = sum(future.cancel() for future in running)
+                self.log(f"Stopping: cancelled {cancelled + len(waiting)} queued stages, "
+                         f"waiting for {len(running) - cancelled} running ones", "warning")
+            query_pool.shutdown(wait=True)
+            cpu_pool.shutdown(wait=True)
+            qt.set_datasource_limit(None)
+            for future, (stage, entry, query, fn, args) in running.items():
+                if future.cancelled() or future.exception() is not None or not future.result():
+                    continue
+                # Finished while stopping: keep the files so they are listed and cleaned up
+                if stage == 'prepare':
+                    entry['intermediary_files'].extend(future.result()['intermediary_files'])
+                elif stage == 'query':
+                    query['outputs'].update(future.result())
+
+    def run_jmp(self, stacked_files, place_in):
+        """Open the stacked files in JMP with the configured jmp_mode; returns True on success."""
+        jmp_mode = self.options['jmp_mode'] or "unified_threaded"
+        max_workers = self.options['max_workers'] or None
+        self.log(f"🚀 Starting JMP analysis in {jmp_mode} mode...")
+        if jmp_mode == "parallel":
+            max_workers = max_workers or 3
+            self.log(f"🔧 Using {max_workers} concurrent JMP instances")
+        elif jmp_mode == "adaptive" and max_workers:
+            self.log(f"🔧 Using up to {max_workers} concurrent JMP instances, sized to free memory and CPU")
+        elif jmp_mode == "adaptive":
+            self.log("🔧 Sizing concurrent JMP instances to free memory and CPU")
+
+        try:
+            import jmp_python as jmp
+        except ImportError:
+            self.log("Warning: Required modules not found - cannot run JMP", "warning")
+            return False
+        jmp_executable_path = fi.find_latest_jmp_pro_path()
+        if not jmp_executable_path:
+            self.log("JMP executable path not found - cannot run JMP", "warning")
+            self.log("Please ensure JMP Pro is installed and accessible", "warning")
+            return False
+        self.log(f"Found JMP executable: {jmp_executable_path}")
+        if not os.path.exists(jmp_executable_path):
+            self.log(f"Error: JMP executable not found at {jmp_executable_path}", "error")
+            return False
+
+        # Test JMP executable access
+        try:
+            import subprocess
+            subprocess.run([jmp_executable_path, "-h"], capture_output=True, timeout=10)
+            self.log("JMP executable access test passed")
+        except subprocess.TimeoutExpired:
+            self.log("JMP executable test timed out (this may be normal)")
+        except PermissionError as pe:
+            self.log(f"Permission error accessing JMP: {pe}", "error")
+            self.log("Try running as administrator or check JMP permissions", "warning")
+            return False
+        except Exception as test_e:
+            self.log(f"JMP access test warning: {test_e}", "warning")
+
+        def jmp_progress_callback(current, total, description):
+            self.log(f"📊 JMP Progress: {current}/{total} ({(current / total) * 100:.1f}%) - {description}")
+
+        try:
+            if jmp_mode in ["parallel", "adaptive"]:
+                self.log(f"📊 Running {len(stacked_files)} JMP instances in parallel...")
+                results = jmp.run_jmp_with_options(stacked_files, jmp_executable_path, mode=jmp_mode,
+                                                   max_workers=max_workers, progress_callback=jmp_progress_callback,
+                                                   use_summary=self.options['summary_charts'])
+                success_count = sum(1 for r in results.values() if r["status"] == "success")
+                total_count = len(results)
+                if not success_count:
+                    self.log("❌ No files were processed successfully", "error")
+                    return False
+                self.log(f"✅ JMP Parallel Execution completed!")
+                self.log(f"📊 Successfully processed: {success_count}/{total_count} files")
+                self.log(f"🖥️ {success_count} JMP windows opened")
+                if success_count < total_count:
+                    self.log(f"⚠️ {total_count - success_count} files failed to process", "warning")
+                if jmp_mode == "adaptive":
+                    for csv_file, result in results.items():
+                        rss_text = f"{result['peak_rss_mb']:.0f} MB" if result.get('peak_rss_mb') is not None else "n/a"
+                        self.log(f"   {os.path.basename(csv_file)}: {result['status']} in "
+                                 f"{result['wall_seconds']}s, peak RSS {rss_text}")
+                return True
+
+            self.log(f"📊 Processing {len(stacked_files)} files for unified JMP session...")
+            success = jmp.run_jmp_with_options(stacked_files, jmp_executable_path, mode=jmp_mode,
+                                               progress_callback=jmp_progress_callback,
+                                               use_summary=self.options['summary_charts'])
+            if success:
+                self.log("🎯 JMP Unified Session launched successfully!")
+                self.log("💡 All your stacked files are now analyzed in one organized JMP session")
+                self.log(f"📊 {len(stacked_files)} datasets each have their own analysis window")
+                self.log("⚡ Resource efficient: Single JMP process instead of multiple instances")
+            else:
+                self.log("❌ Failed to launch JMP Unified Session", "error")
+            return bool(success)
+        except Exception as jmp_e:
+            self.log(f"Error during JMP execution: {jmp_e}", "error")
+            return False
+
+    def cleanup(self, intermediary_files):
+        """Delete intermediary files, keeping decoded CSVs and stacked data."""
+        self.log("Cleaning up intermediary files...")
+        for intermediary in intermediary_files:
+            try:
+                if os.path.exists(intermediary) and not ('decoded.csv' in intermediary or "datastack" in intermediary):
+                    os.remove(intermediary)
+                    self.log(f"Deleted: {os.path.basename(intermediary)}")
+            except Exception as e:
+                self.log(f"Could not delete {intermediary}: {str(e)}")
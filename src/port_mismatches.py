@@ -6,6 +6,9 @@ import os
 import pandas as pd
 import json
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import mtpl_parser as mtpl #Make code to process mtpl
 import file_functions as fi
 
@@ -34,249 +37,294 @@ def load_json_with_comma_fix(file_path):
             print(f"Could not fix JSON: {e}")
             raise
 
-def find_port_mismatches(mtpl_csv, port_csv,base_dir):
-    base_dir = base_dir + '\\'
-    #base_dir = r"\\alpfile4.al.intel.com\hop\program\1276\eng\hdmtprogs\dmr_dab_hop\savirine\WW32\WW32.4_EIO_TP8/"
-    mtpl_df = pd.read_csv(mtpl_csv,index_col=False,dtype={'BasicTestConfiguration': 'str'})
-    port_df = pd.read_csv(port_csv,index_col=False)
+VERIFY_WORKERS = 8
+
+
+def config_relative_path(config_file_path):
+    """Path of an MTPL ConfigurationFile expression relative to the test program directory."""
+    if ' + ' in config_file_path:
+        # Format: "base_path" + "relative_path"
+        return config_file_path.split(' + ')[1].strip(' \"').replace('./', '').replace('\"+\"', '').replace('\\\\', '\\')
+    elif '+' in config_file_path:
+        # Format: GetEnvironmentVariable("~HDMT_TP_BASE_DIR")+"\\\\path\\\\file"
+        # Extract the path after the environment variable part
+        env_part, path_part = config_file_path.split('+"', 1)
+        return path_part.strip('\"').replace('\"+\"', '').replace('\\\\', '\\')
+    # Direct path
+    return config_file_path.strip(' \"').replace('./', '').replace('\\\\', '\\')
+
+
+def read_port_csv(csv_path, skip_bad_lines=True):
+    """Read a configuration/decoder CSV, retrying malformed files as tab-separated (and skipping bad lines)."""
+    try:
+        return pd.read_csv(csv_path)
+    except pd.errors.ParserError:
+        try:
+            return pd.read_csv(csv_path, sep='\t')
+        except pd.errors.ParserError:
+            if not skip_bad_lines:
+                raise
+            try:
+                return pd.read_csv(csv_path, on_bad_lines='skip')
+            except TypeError:
+                # Fallback for older pandas versions
+                return pd.read_csv(csv_path, error_bad_lines=False, warn_bad_lines=True)
+
+
+class ExitPortResolver:
+    """
+    Exit ports of MTPL configuration files, memoized for one verification run.
     
-    mismatches = []
+    Results are kept per (ConfigurationFile, BasicTestConfiguration, Mode), and every
+    configuration CSV, SmartCTV JSON and decoder CSV is read at most once, however
+    many instances share it. resolve() is safe to call from several threads.
     
-    # Iterate through each row of mtpl_df
-    for index, row in mtpl_df.iterrows():
-        test_name = str(row['TestName'])
-        config_file_path = str(row['ConfigurationFile'])
-        basic_test_config = row['BasicTestConfiguration']
-        mode = str(row.get('Mode', '')).strip('\"\'')  # Get mode, default to empty string if not present
-        bypass = str(row.get('BypassPort', '')).strip('\"\'')  # Get bypass, default to empty string if not present
-        # Get list of exit ports from configuration files
-        exit_ports = []
-        if 'ctv' not in row["TestType"].lower():
-            continue
-        # Handle path construction based on config_file_path format
-        #print(f"DEBUG: config_file_path = {config_file_path}")
-        if ' + ' in config_file_path:
-            # Format: "base_path" + "relative_path"
-            relative_path = config_file_path.split(' + ')[1].strip(' \"').replace('./', '').replace('\"+\"', '').replace('\\\\', '\\')
-            #print(f"DEBUG: Found '+', relative_path = {relative_path}")
-        elif '+' in config_file_path:
-            # Format: GetEnvironmentVariable("~HDMT_TP_BASE_DIR")+"\\\\path\\\\file"
-            # Extract the path after the environment variable part
-            env_part, path_part = config_file_path.split('+"', 1)
-            relative_path = path_part.strip('\"').replace('\"+\"', '').replace('\\\\', '\\')
-            #print(f"DEBUG: GetEnvironmentVariable format, relative_path = {relative_path}")
-        else:
-            # Direct path
-            relative_path = config_file_path.strip(' \"').replace('./', '').replace('\\\\', '\\')
-            #print(f"DEBUG: Direct path format, relative_path = {relative_path}")
-        missing_config_flag = False
-        missing_decoder_flag = False
-        config_missing = ''
-        decoder_missing = []
+    Args:
+        base_dir (str): Test program directory, ending with a path separator
+    """
+
+    def __init__(self, base_dir):
+        self.base_dir = base_dir
+        self._results = {}
+        self._files = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, cache, key, load):
+        with self._lock:
+            if key in cache:
+                return cache[key]
+        # Loaded outside the lock so other files are read in parallel (a rare duplicate read is harmless)
+        value = load()
+        with self._lock:
+            return cache.setdefault(key, value)
+
+    def _file_ports(self, csv_path, label, skip_bad_lines):
+        def load():
+            try:
+                port_df = read_port_csv(csv_path, skip_bad_lines)
+            except Exception as e:
+                print(f"Error reading {label} {csv_path}: {e}")
+                return []
+            if 'ExitPort' not in port_df.columns:
+                print(f"No ExitPort column found in {csv_path}")
+                return []
+            # Non-numeric entries (like "-") become NaN and are dropped
+            exit_port_values = set(pd.to_numeric(port_df['ExitPort'], errors='coerce').dropna().astype(int).tolist())
+            return [str(value).strip() for value in exit_port_values]
+        return self._cached(self._files, ('csv', csv_path, skip_bad_lines), load)
+
+    def _smart_config(self, json_path):
+        def load():
+            try:
+                return load_json_with_comma_fix(json_path), None
+            except Exception as e:
+                return None, e
+        return self._cached(self._files, ('json', json_path), load)
+
+    def _decoder_ports(self, decoder_config, result):
+        # Exit ports of one SmartCTV test configuration's decoder
+        decoder_csv = decoder_config.get('ConfigurationFile', '')
+        if decoder_config.get('ExitPortOffset', ''):
+            return [decoder_config.get('ExitPortOffset', '')]
+        if not decoder_csv.endswith('.csv'):
+            return []
+        decoder_csv_path = self.base_dir + decoder_csv.strip('\"').replace('./', '').replace('\\\\\\', '\\')
+        if not os.path.exists(os.path.normpath(decoder_csv_path)):
+            print("Decoder not found")
+            result['missing_decoder'] = True
+            result['decoder_missing'].append(decoder_csv_path)
+            return []
+        return self._file_ports(decoder_csv_path, 'decoder CSV', skip_bad_lines=False)
+
+    def resolve(self, config_file_path, basic_test_config, mode):
+        """
+        Exit ports expected for one instance configuration.
+        
+        Returns:
+            dict: 'exit_ports' (list of str), 'missing_config'/'missing_decoder' flags,
+                  'config_missing' (path) and 'decoder_missing' (list of paths)
+        """
+        return self._cached(self._results, (config_file_path, basic_test_config, mode),
+                            lambda: self._resolve(config_file_path, basic_test_config, mode))
+
+    def _resolve(self, config_file_path, basic_test_config, mode):
+        result = {'exit_ports': [], 'missing_config': False, 'missing_decoder': False,
+                  'config_missing': '', 'decoder_missing': []}
+        relative_path = config_relative_path(config_file_path)
         if '.csv' in config_file_path:
-            #if csv
-            #print(base_dir)
-            #open csv and makes list of all non nan, blank, or noninteger values
-            csv_path = base_dir + relative_path
-            csv_path = csv_path.replace('\\\\\\', '\\')
+            csv_path = (self.base_dir + relative_path).replace('\\\\\\', '\\')
             if os.path.exists(os.path.normpath(csv_path)):
-                try:
-                    # Try multiple CSV parsing approaches for malformed files
-                    try:
-                        config_df = pd.read_csv(csv_path)
-                    except pd.errors.ParserError:
-                        #print(f"Parser error with {csv_path}, trying tab-separated parsing...")
-                        try:
-                            config_df = pd.read_csv(csv_path, sep='\t')
-                        except pd.errors.ParserError:
-                            #print(f"Tab-separated parsing failed, trying with error skipping...")
-                            # Try with error_bad_lines=False (pandas <1.3) or on_bad_lines='skip' (pandas >=1.3)
-                            try:
-                                config_df = pd.read_csv(csv_path, on_bad_lines='skip')
-                            except TypeError:
-                                # Fallback for older pandas versions
-                                config_df = pd.read_csv(csv_path, error_bad_lines=False, warn_bad_lines=True)
-                    
-                    if 'ExitPort' in config_df.columns:
-                        # Convert ExitPort to numeric, coercing errors (like "-") to NaN
-                        config_df['ExitPort'] = pd.to_numeric(config_df['ExitPort'], errors='coerce')
-                        
-                        # Get all non-NaN values and convert to integers
-                        exit_port_values = config_df['ExitPort'].dropna().astype(int)
-                        exit_port_values = set(exit_port_values.tolist())
-                        
-                        # Filter out integer values
-                        for value in exit_port_values:
-                            exit_ports.append(str(value).strip())
-                    else:
-                        print('No ExitPort column found!')
-                except Exception as e:
-                    print(f"Error reading CSV {csv_path}: {e}")
+                result['exit_ports'] = list(self._file_ports(csv_path, 'CSV', skip_bad_lines=True))
             else:
                 print(f"\nCSV file not found: {csv_path}")
-                missing_config_flag = True
-                config_missing = csv_path
+                result['missing_config'] = True
+                result['config_missing'] = csv_path
 
         elif '.json' in config_file_path:
-            #if smart.json
-            #open smart.json
-            json_path = base_dir + relative_path
-            json_path = json_path.replace('\\\\\\', '\\')
-            if os.path.exists(os.path.normpath(json_path)):
-                try:
-                    smart_config = load_json_with_comma_fix(json_path)
+            json_path = (self.base_dir + relative_path).replace('\\\\\\', '\\')
+            if not os.path.exists(os.path.normpath(json_path)):
+                print(f"\nJSON file not found: {json_path}")
+                result['missing_config'] = True
+                result['config_missing'] = json_path
+                return result
+            smart_config, error = self._smart_config(json_path)
+            if error is not None:
+                print(f"Error reading JSON {json_path}: {error}")
+                return result
+            try:
+                test_configs = smart_config.get('TestConfigurations', {})
+                if mode == 'CtvTag':
+                    # CtvTag instances use the decoders of all configurations
+                    exit_ports = []
+                    for config_data in test_configs.values():
+                        exit_ports.extend(str(port) for port in self._decoder_ports(config_data.get('Decoder', {}), result))
+                    result['exit_ports'] = list(set(exit_ports))  # Remove duplicates
+                elif basic_test_config in test_configs:
+                    # Otherwise only the decoder of the instance's own configuration
+                    decoder_config = dict(test_configs[basic_test_config].get('Decoder', {}))
+                    decoder_config['ConfigurationFile'] = decoder_config.get('ConfigurationFile', '').replace('~HDMT_TPL_DIR', '')
+                    result['exit_ports'] = list(self._decoder_ports(decoder_config, result))
+            except Exception as e:
+                print(f"Error reading JSON {json_path}: {e}")
+        return result
 
-                    if mode == 'CtvTag':
-                        #If row[Mode] == "CtvTag": use all configurations and open the csv in each configuration to get list of exit ports
-                        test_configs = smart_config.get('TestConfigurations', {})
-                        for config_num, config_data in test_configs.items():
-                            decoder_config = config_data.get('Decoder', {})
-                            decoder_csv = decoder_config.get('ConfigurationFile', '')
-                            if decoder_config.get('ExitPortOffset',''):
-                                    exit_ports.append(str(decoder_config.get('ExitPortOffset','')))
-                                    #exit_ports = [str(int(x)+int(port_offset for x in exit_ports]
-                            elif decoder_csv.endswith('.csv'):
-                                decoder_csv_path = base_dir + decoder_csv.strip('\"').replace('./', '').replace('\\\\\\', '\\') 
-                                if os.path.exists(os.path.normpath(decoder_csv_path)):
-                                    try:
-                                        # Try multiple CSV parsing approaches for malformed files
-                                        try:
-                                            decoder_df = pd.read_csv(decoder_csv_path)
-                                        except pd.errors.ParserError:
-                                            #print(f"Parser error with {decoder_csv_path}, trying tab-separated parsing...")
-                                            # Try parsing as tab-separated file instead of comma-separated
-                                            try:
-                                                decoder_df = pd.read_csv(decoder_csv_path, sep='\t')
-                                            except pd.errors.ParserError:
-                                                pass
-                                        if 'ExitPort' in decoder_df.columns:
-                                            # Convert ExitPort to numeric, coercing errors to NaN
-                                            decoder_df['ExitPort'] = pd.to_numeric(decoder_df['ExitPort'], errors='coerce')
-                                            exit_port_values = decoder_df['ExitPort'].dropna().astype(int)
-                                            exit_port_values = set(exit_port_values.tolist())
-                            
-                                            for value in exit_port_values:
-                                                exit_ports.append(str(value).strip())
-                                            #if(exit_port_values):
-                                                #print(decoder_df['ExitPort'])
-                                        else:
-                                            print(f"No ExitPort column found in {decoder_csv_path}\n")
-                                    except Exception as e:
-                                        print(f"Error reading decoder CSV {decoder_csv_path}: {e}")
-                                else:
-                                    print("Decoder not found")
-                                    missing_decoder_flag = True
-                                    decoder_missing.append(decoder_csv_path)
-                        exit_ports = list(set(exit_ports))  # Remove duplicates
-                    else:
-                        #else: use one configuration and open the csv for that configuration to get list of exit ports
-                        test_configs = smart_config.get('TestConfigurations', {})
-                        if basic_test_config in test_configs:
-                            config_data = test_configs[basic_test_config]
-                            decoder_config = config_data.get('Decoder', {})
-                            decoder_csv = decoder_config.get('ConfigurationFile', '')
-                            decoder_csv = decoder_csv.replace('~HDMT_TPL_DIR', '')
-                            if decoder_config.get('ExitPortOffset',''):
-                                    exit_ports.append(decoder_config.get('ExitPortOffset',''))
-                                    #exit_ports = [str(int(x)+int(port_offset for x in exit_ports]
-                            elif decoder_csv.endswith('.csv'):
-                                decoder_csv_path = base_dir + decoder_csv.strip('\"').replace('./', '').replace('\\\\\\', '\\') 
-                                if os.path.exists(os.path.normpath(decoder_csv_path)):
-                                    try:
-                                        # Try multiple CSV parsing approaches for malformed files
-                                        try:
-                                            decoder_df = pd.read_csv(decoder_csv_path)
-                                        except pd.errors.ParserError:
-                                            try:
-                                                decoder_df = pd.read_csv(decoder_csv_path, sep='\t')
-                                            except pd.errors.ParserError:
-                                                pass
-                                        
-                                        if 'ExitPort' in decoder_df.columns:
-                                            # Convert ExitPort to numeric, coercing errors to NaN
-                                            decoder_df['ExitPort'] = pd.to_numeric(decoder_df['ExitPort'], errors='coerce')
-                                            exit_port_values = decoder_df['ExitPort'].dropna().astype(int)
-                                            exit_port_values = set(exit_port_values.tolist())
 
-                                            for value in exit_port_values:
-                                                exit_ports.append(str(value).strip())
-                                    except Exception as e:
-                                        print(f"Error reading decoder CSV {decoder_csv_path}: {e}")
-                                else:
-                                    print("Decoder not found")
-                                    missing_decoder_flag = True
-                                    decoder_missing.append(decoder_csv_path)
-                except Exception as e:
-                    print(f"Error reading JSON {json_path}: {e}")
-            else:
-                print(f"\nJSON file not found: {json_path}")
-                missing_config_flag = True
-                config_missing = json_path
-        # Make a filtered_df out of port_df that is only rows that match the current mtpl_df row's Test Name
-        filtered_df = port_df[port_df['Instance'] == test_name].copy()
+def find_port_mismatches(mtpl_csv, port_csv, base_dir, max_workers=VERIFY_WORKERS):
+    """
+    Compare the ports of every CTV instance against the exit ports of its configuration.
+    
+    Ports are grouped by instance (and module, for whole test program tables) in one
+    pass, and exit ports are resolved once per distinct (ConfigurationFile,
+    BasicTestConfiguration, Mode) on a thread pool through ExitPortResolver, so
+    configuration and decoder files shared by many instances are only read once.
+    
+    Args:
+        mtpl_csv (str): Instance CSV from mtpl_parser (optionally with a Module column)
+        port_csv (str): Port CSV from mtpl_parser (optionally with a Module column)
+        base_dir (str): Test program directory the configuration paths are relative to
+        max_workers (int): Threads reading configuration files
         
-        if not filtered_df.empty and exit_ports:
-            # Compare the filtered_df Port column to the list of exit ports from the configuration files
-            if 'Port' in filtered_df.columns:
-                port_values = filtered_df['Port'].dropna().astype(str).str.strip().tolist()
-                
-                # Find mismatches - ports in filtered_df that are not in exit_ports
-                missing_ports = [port for port in exit_ports if port not in port_values]
-                #extra_ports = [port for port in exit_ports if port not in port_values]
-
-                if missing_ports or missing_config_flag or missing_decoder_flag:# or extra_ports:
-                    mismatch_info = {
-                        'test_name': test_name,
-                        'config_path': config_file_path,
-                        'config_miss': config_missing,
-                        'decoder_miss': decoder_missing,
-                        'basic_test_config': basic_test_config,
-                        'mode': mode,
-                        'bypass': bypass,
-                        'ports_in_data_not_in_config': missing_ports,
-                        #'ports_in_config_not_in_data': extra_ports,
-                        'expected_ports': exit_ports,
-                        'actual_ports': port_values
-                    }
-                    mismatches.append(mismatch_info)
-                    print(f"  Mismatch found for {test_name}        Ports:{missing_ports}")
-                    #print(f"    Missing from config: {missing_ports}")
-                    #print(f"    Extra in config: {extra_ports}")
-                else:
-                    print(f"  No mismatches found for {test_name}")
-            else:
+    Returns:
+        list: One dict per instance with missing ports or missing configuration files
+    """
+    start_time = time.time()
+    base_dir = base_dir + '\\'
+    mtpl_df = pd.read_csv(mtpl_csv,index_col=False,dtype={'BasicTestConfiguration': 'str'})
+    port_df = pd.read_csv(port_csv,index_col=False)
+    
+    mismatches = []
+    # Whole test program tables carry a Module column; instance names are only unique within a module
+    by_module = mtpl.MODULE_COLUMN in mtpl_df.columns and mtpl.MODULE_COLUMN in port_df.columns
+    key_columns = ['Instance', mtpl.MODULE_COLUMN] if by_module else ['Instance']
+    
+    # Ports of every instance, grouped once instead of scanning port_df per instance
+    has_port_column = 'Port' in port_df.columns
+    ports_by_instance = {}
+    for key, group in port_df.groupby(key_columns, sort=False):
+        key = key if isinstance(key, tuple) else (key,)
+        ports_by_instance[key] = group['Port'].dropna().astype(str).str.strip().tolist() if has_port_column else None
+    
+    ctv_rows = mtpl_df[mtpl_df['TestType'].str.lower().str.contains('ctv', na=False)].to_dict('records')
+    instances = []
+    for row in ctv_rows:
+        basic_test_config = row['BasicTestConfiguration']
+        instances.append({
+            'row': row,
+            'test_name': str(row['TestName']),
+            'config_file_path': str(row['ConfigurationFile']),
+            'basic_test_config': None if pd.isna(basic_test_config) else basic_test_config,
+            'mode': str(row.get('Mode', '')).strip('\"\''),  # Get mode, default to empty string if not present
+            'bypass': str(row.get('BypassPort', '')).strip('\"\''),  # Get bypass, default to empty string if not present
+        })
+    
+    # Resolve each distinct configuration once, in parallel (the files usually live on a network share)
+    resolver = ExitPortResolver(base_dir)
+    config_keys = list(dict.fromkeys((instance['config_file_path'], instance['basic_test_config'], instance['mode'])
+                                     for instance in instances))
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        resolved = dict(zip(config_keys, executor.map(lambda key: resolver.resolve(*key), config_keys)))
+    
+    for instance in instances:
+        row, test_name = instance['row'], instance['test_name']
+        config = resolved[(instance['config_file_path'], instance['basic_test_config'], instance['mode'])]
+        exit_ports = config['exit_ports']
+        missing_files = config['missing_config'] or config['missing_decoder']
+        port_key = (test_name, row[mtpl.MODULE_COLUMN]) if by_module else (test_name,)
+        mismatch_info = {
+            'module': row[mtpl.MODULE_COLUMN] if by_module else '',
+            'test_name': test_name,
+            'config_path': instance['config_file_path'],
+            'config_miss': config['config_missing'],
+            'decoder_miss': config['decoder_missing'],
+            'basic_test_config': row['BasicTestConfiguration'],
+            'mode': instance['mode'],
+            'bypass': instance['bypass'],
+            'ports_in_data_not_in_config': [],
+            'expected_ports': [],
+            'actual_ports': []
+        }
+        
+        if port_key in ports_by_instance and exit_ports:
+            port_values = ports_by_instance[port_key]
+            if port_values is None:
                 print(f"  'Port' column not found in port_df for {test_name}")
-        else:
-            if missing_config_flag or missing_decoder_flag:
-                mismatch_info = {
-                    'test_name': test_name,
-                    'config_path': config_file_path,
-                    'config_miss': config_missing,
-                    'decoder_miss': decoder_missing,
-                    'basic_test_config': basic_test_config,
-                    'mode': mode,
-                    'bypass': bypass,
-                    'ports_in_data_not_in_config': [],
-                    #'ports_in_config_not_in_data': extra_ports,
-                    'expected_ports': [],
-                    'actual_ports': []
-                }
+                continue
+            # Find mismatches - exit ports of the configuration that are not used by the instance
+            missing_ports = [port for port in exit_ports if port not in port_values]
+            if missing_ports or missing_files:
+                mismatch_info.update(ports_in_data_not_in_config=missing_ports, expected_ports=exit_ports,
+                                     actual_ports=port_values)
                 mismatches.append(mismatch_info)
-                print(f"  Missing configuration or decoder for {test_name}\n")
-            elif filtered_df.empty:
-                print(f"  No matching rows found in port_df for {test_name}")
-            elif not exit_ports:
-                print(f"\n  No exit ports found in configuration for {test_name}")
+                print(f"  Mismatch found for {test_name}        Ports:{missing_ports}")
+            else:
+                print(f"  No mismatches found for {test_name}")
+        elif missing_files:
+            mismatches.append(mismatch_info)
+            print(f"  Missing configuration or decoder for {test_name}\n")
+        elif port_key not in ports_by_instance:
+            print(f"  No matching rows found in port_df for {test_name}")
+        else:
+            print(f"\n  No exit ports found in configuration for {test_name}")
     
+    print(f"Verified {len(instances)} CTV instances against {len(config_keys)} distinct configurations "
+          f"in {time.time() - start_time:.2f} seconds")
     return mismatches
 
 
 def mtpl_verification(mtpl_file,place_in=''):
     base_dir = os.path.dirname(os.path.dirname(os.path.dirname(mtpl_file)))
-    test_csv = mtpl.mtpl_test_to_csv(mtpl_file,place_in)
-    port_csv = mtpl.mtpl_port_to_csv(mtpl_file,place_in)
+    test_csv, port_csv = mtpl.mtpl_to_csv(mtpl_file,place_in)
     mismatches = find_port_mismatches(test_csv, port_csv,base_dir)
     output_csv = f"{place_in}{os.path.basename(mtpl_file)}.mismatches.csv"
+    return save_mismatches(mismatches, output_csv)
+
+
+def tp_verification(tp_dir, place_in='', max_workers=None):
+    """
+    Run the port verification over every module of a test program in one go.
+    
+    All module MTPLs are parsed in parallel (mtpl_parser.load_test_program), and the
+    mismatches of the whole program are written to one <TP>.mismatches.csv with a
+    Module column.
+    
+    Args:
+        tp_dir (str): Test program base directory (the folder holding 'Modules')
+        place_in (str): Output folder prefix
+        max_workers (int, optional): Parser worker processes
+        
+    Returns:
+        str: Path of the mismatches CSV (None if no mismatches were found)
+    """
+    test_csv, port_csv, program = mtpl.test_program_to_csv(tp_dir, place_in, max_workers)
+    for module, error in program['errors'].items():
+        print(f"Module {module} skipped: {error}")
+    mismatches = find_port_mismatches(test_csv, port_csv, os.path.normpath(tp_dir))
+    output_csv = f"{place_in}{os.path.basename(os.path.normpath(tp_dir))}.mismatches.csv"
+    return save_mismatches(mismatches, output_csv, with_module=True)
+
+
+def save_mismatches(mismatches, output_csv, with_module=False):
+    """Write the find_port_mismatches() results to a CSV; returns its path (None if there are none)."""
     output_csv = fi.check_write_permission(output_csv)
     if mismatches:
         results_df = pd.DataFrame([
@@ -289,6 +337,8 @@ def mtpl_verification(mtpl_file,place_in=''):
             }
             for mismatch in mismatches
         ])
+        if with_module:
+            results_df.insert(0, 'Module', [mismatch['module'] for mismatch in mismatches])
 
         results_df.to_csv(output_csv, index=False)
 
@@ -26,12 +26,16 @@ import time
 import sys
 import os
 import file_functions as fi
+import query_tuning as qt
+import query_trace as qtr
+import adaptive_chunking as ac
+import token_index as ti
 # For regex pattern matching and data processing
 import re
 from collections import defaultdict
 
 
-def execute_pyuber_query(token_chunks, lot_condition, wafer_condition, program_condition, prefetch, databases, intermediary_file, module_name=''):
+def execute_pyuber_query(token_chunks, lot_condition, wafer_condition, program_condition, prefetch, databases, intermediary_file, module_name='', query_profile='', trace=None):
     """
     Execute PyUber database query with comprehensive parameter handling and data extraction.
     
@@ -48,6 +52,10 @@ def execute_pyuber_query(token_chunks, lot_condition, wafer_condition, program_c
         databases (list): List of database names to query
         intermediary_file (str): Path for intermediate CSV output
         module_name (str, optional): Module name for test filtering
+        query_profile (str, optional): Query tuning profile from config.json ('' = active
+                                       profile, 'auto' = auto-tuned settings per database)
+        trace (QueryTrace, optional): Trace to record chunk timings into (defaults to the
+                                      active run trace, or a trace for this call only)
         
     Returns:
         bool: True if data was found and processed, False otherwise
@@ -55,6 +63,9 @@ def execute_pyuber_query(token_chunks, lot_condition, wafer_condition, program_c
     Features:
         - Multi-database support with automatic failover
         - Chunked data processing for memory efficiency
+        - Server-side query splitting/compression settings via tuning profiles
+        - Per-chunk timing trace (server, transfer, conversion, CSV write) in JSON lines
+        - Optional adaptive chunk sizing per datasource (see adaptive_chunking.py)
         - Comprehensive SQL query construction with multiple joins
         - Error handling with detailed logging
         - CSV output generation for downstream processing
@@ -75,92 +86,149 @@ def execute_pyuber_query(token_chunks, lot_condition, wafer_condition, program_c
     data_found = False
     finish_loops = False
     first_iteration = True
+    own_trace = trace is None and qtr.active_trace() is None
+    if own_trace:
+        trace = qtr.QueryTrace(os.path.dirname(intermediary_file))
+    elif trace is None:
+        trace = qtr.active_trace()
+    # Adaptive chunking re-sizes the token chunks from the observed latency (opt-in via config.json)
+    adaptive = any(token_chunks) and ac.is_enabled()
 
     for database in databases:
-        missing_counter = 0 #remove this if data gets too big #yet another flaw with the quick hardcoded route
-        for token_chunk in token_chunks:
-            if token_chunk:
-                token_condition = f"t0.test_name IN ('{token_chunk}')"
-            else:
-                token_condition = f"t0.test_name LIKE 'TESTTIME_{module_name}%'"
-            # place tokens into SQL query
-            print('Running Query')
-            query = f"""
-            /*BEGIN SQL*/
-            SELECT /*+  use_nl (dt) */
-                    v0.lot AS lot
-                    ,v0.operation AS operation
-                    ,v0.program_name AS program_name
-                    ,v0.wafer_id AS wafer_id
-                    ,dt.sort_x AS sort_x
-                    ,dt.sort_y AS sort_y
-                    ,dt.interface_bin AS interface_bin
-                    ,dt.functional_bin AS functional_bin
-                    ,t0.test_name AS test_name
-                    ,Replace(Replace(Replace(Replace(Replace(Replace(str.string_result,',',';'),chr(9),' '),chr(10),' '),chr(13),' '),chr(34),''''),chr(7),' ') AS string_result
-            FROM 
-            A_Testing_Session v0
-            INNER JOIN A_Test t0 ON t0.devrevstep = v0.devrevstep AND (t0.program_name = v0.program_name or t0.program_name is null or v0.program_name is null)  AND (t0.temperature = v0.temperature OR (t0.temperature IS NULL AND v0.temperature IS NULL))
-            INNER JOIN A_Device_Testing dt ON v0.lao_start_ww + 0 = dt.lao_start_ww AND v0.ts_id + 0 = dt.ts_id
-            LEFT JOIN A_String_Result str ON v0.lao_start_ww = str.lao_start_ww AND v0.ts_id = str.ts_id AND dt.dt_id = str.dt_id AND t0.t_id = str.t_id
-            WHERE 1=1
-            AND      v0.valid_flag = 'Y' 
-            AND      {lot_condition}
-            AND      {wafer_condition}
-            AND      {token_condition}
-
-            AND      str.string_result IS NOT NULL
-            AND      v0.test_end_date_time >= TRUNC(SYSDATE) - {str(int(prefetch))}
-            AND      {program_condition}
-            /*END SQL*/
-            """
-                    #,dt.functional_bin AS functional_bin
-            #AND      t0.test_name LIKE '{test_name}'
-            query_out = fi.check_write_permission("query.txt")
-            with open(query_out,'w') as queryfile:
-                queryfile.write(query)
-
-            start_time = time.time()
-            #connect to database and execute query
-            conn = PyUber.connect(datasource=database)
-            cursor = conn.execute(query)
-
-            # Record the end time and calculate the duration
-            end_time = time.time()
-            duration = end_time - start_time
-            print(f"Query executed in {duration:.2f} seconds.")
-
-
-            results = cursor.fetchall()
-            if results:
-                columns = [col[0] for col in cursor.description]
-                missing_counter = 0
-                # Open the file in write mode if it's the first iteration, otherwise append mode
-                mode = 'w' if first_iteration else 'a'
-                with open(intermediary_file, mode, newline='') as outfile:
-                    writer = csv.writer(outfile)
-                    if first_iteration:  # Write headers only once
-                        writer.writerow(columns)
-                        first_iteration = False  # Set flag to False after first write
-                    for row in results:
-                        writer.writerow(row)
-                    data_found = True
-            else:
-                print('Problem with query! Likely no data.')
-                missing_counter += 1
-                if first_iteration:  # Only create empty file on first iteration
-                    intermediary_file = fi.check_write_permission(intermediary_file)
-                    with open(intermediary_file,'w', newline='') as outfile:
+        # One query at a time per datasource slot (limited by the pipeline, unlimited otherwise)
+        with qt.datasource_slot(database):
+            missing_counter = 0 #remove this if data gets too big #yet another flaw with the quick hardcoded route
+            # One connection per database, configured with the selected tuning profile
+            connection_settings = qt.get_connection_settings(query_profile, database)
+            if connection_settings:
+                print(f"Using query tuning settings for {database}: {connection_settings}")
+            conn = PyUber.connect(datasource=database, **connection_settings)
+            chunker = ac.AdaptiveChunker(database, token_chunks) if adaptive else None
+            for chunk_index, token_chunk in enumerate(chunker if chunker else token_chunks):
+                if token_chunk:
+                    token_condition = f"t0.test_name IN ('{token_chunk}')"
+                else:
+                    token_condition = f"t0.test_name LIKE 'TESTTIME_{module_name}%'"
+                # place tokens into SQL query
+                print('Running Query')
+                query = f"""
+                /*BEGIN SQL*/
+                SELECT /*+  use_nl (dt) */
+                        v0.lot AS lot
+                        ,v0.operation AS operation
+                        ,v0.program_name AS program_name
+                        ,v0.wafer_id AS wafer_id
+                        ,dt.sort_x AS sort_x
+                        ,dt.sort_y AS sort_y
+                        ,dt.interface_bin AS interface_bin
+                        ,dt.functional_bin AS functional_bin
+                        ,t0.test_name AS test_name
+                        ,Replace(Replace(Replace(Replace(Replace(Replace(str.string_result,',',';'),chr(9),' '),chr(10),' '),chr(13),' '),chr(34),''''),chr(7),' ') AS string_result
+                FROM 
+                A_Testing_Session v0
+                INNER JOIN A_Test t0 ON t0.devrevstep = v0.devrevstep AND (t0.program_name = v0.program_name or t0.program_name is null or v0.program_name is null)  AND (t0.temperature = v0.temperature OR (t0.temperature IS NULL AND v0.temperature IS NULL))
+                INNER JOIN A_Device_Testing dt ON v0.lao_start_ww + 0 = dt.lao_start_ww AND v0.ts_id + 0 = dt.ts_id
+                LEFT JOIN A_String_Result str ON v0.lao_start_ww = str.lao_start_ww AND v0.ts_id = str.ts_id AND dt.dt_id = str.dt_id AND t0.t_id = str.t_id
+                WHERE 1=1
+                AND      v0.valid_flag = 'Y' 
+                AND      {lot_condition}
+                AND      {wafer_condition}
+                AND      {token_condition}
+
+                AND      str.string_result IS NOT NULL
+                AND      v0.test_end_date_time >= TRUNC(SYSDATE) - {str(int(prefetch))}
+                AND      {program_condition}
+                /*END SQL*/
+                """
+                        #,dt.functional_bin AS functional_bin
+                #AND      t0.test_name LIKE '{test_name}'
+                chunk_info = {
+                    'datasource': database,
+                    'chunk_index': chunk_index,
+                    'token_count': token_chunk.count("',\n'") + 1 if token_chunk else 0,
+                    'sql_bytes': len(query),
+                }
+                start_time = time.time()
+                #execute query
+                try:
+                    cursor = conn.execute(query)
+                except Exception as e:
+                    trace.record(status='error', error=str(e), server_seconds=time.time() - start_time, **chunk_info)
+                    if not chunker:
+                        raise
+                    # Failed chunks are split and retried by the chunker instead of failing the test
+                    chunker.report(time.time() - start_time, error=e)
+                    if not chunker.remaining() and data_found:
+                        finish_loops = True
+                        break
+                    continue
+
+                # Record the end time and calculate the duration
+                end_time = time.time()
+                duration = end_time - start_time
+                print(f"Query executed in {duration:.2f} seconds.")
+
+
+                fetch_start = time.time()
+                results = cursor.fetchall()
+                fetch_duration = time.time() - fetch_start
+                cursor_stats = getattr(cursor, 'stats', {})
+                bytes_written = 0
+                write_start = time.time()
+                if results:
+                    columns = [col[0] for col in cursor.description]
+                    missing_counter = 0
+                    # Open the file in write mode if it's the first iteration, otherwise append mode
+                    mode = 'w' if first_iteration else 'a'
+                    with open(intermediary_file, mode, newline='') as outfile:
+                        start_position = outfile.tell()
                         writer = csv.writer(outfile)
-                        writer.writerow(['LOT','WAFER_ID','SORT_X','SORT_Y','INTERFACE_BIN','FUNCTIONAL_BIN'])
-                if missing_counter >= 5:
+                        if first_iteration:  # Write headers only once
+                            writer.writerow(columns)
+                            first_iteration = False  # Set flag to False after first write
+                        for row in results:
+                            writer.writerow(row)
+                        bytes_written = outfile.tell() - start_position
+                        data_found = True
+                write_duration = time.time() - write_start
+                # Server time excludes metadata activation, which the cursor times separately
+                activate_duration = cursor_stats.get('activate_seconds', 0.0)
+                transfer_duration = cursor_stats.get('fetch_seconds', 0.0)
+                trace.record(status='ok' if results else 'empty',
+                             server_seconds=cursor_stats.get('server_seconds', duration - activate_duration),
+                             activate_seconds=activate_duration,
+                             fetch_seconds=transfer_duration,
+                             convert_seconds=max(fetch_duration - transfer_duration, 0.0),
+                             write_seconds=write_duration,
+                             rows=len(results),
+                             bytes=bytes_written,
+                             server_chunks=cursor_stats.get('chunks', 0),
+                             **chunk_info)
+                if chunker:
+                    chunker.report(duration + fetch_duration, len(results))
+                if not results:
+                    print('Problem with query! Likely no data.')
+                    missing_counter += 1
+                    if first_iteration:  # Only create empty file on first iteration
+                        intermediary_file = fi.check_write_permission(intermediary_file)
+                        with open(intermediary_file,'w', newline='') as outfile:
+                            writer = csv.writer(outfile)
+                            writer.writerow(['LOT','WAFER_ID','SORT_X','SORT_Y','INTERFACE_BIN','FUNCTIONAL_BIN'])
+                    if missing_counter >= 5:
+                        break
+                last_chunk = not chunker.remaining() if chunker else token_chunk == token_chunks[-1]
+                if last_chunk and data_found:
+                    finish_loops = True
                     break
-            if token_chunk == token_chunks[-1] and data_found:
-                finish_loops = True
-                break
+            if chunker:
+                chunker.save()
+                if chunker.failed_tokens:
+                    print(f"{len(chunker.failed_tokens)} tokens could not be queried on {database}")
         if finish_loops:
             break
     
+    if own_trace:
+        print(trace.summary())
     return data_found
 
 
@@ -223,7 +291,7 @@ def pivot_data(intermediary_file):
     return df_pivot
 
 #def uber_request(indexed_input, test_name_file,test_type, output_folder,extra_identifier=''):
-def uber_request(indexed_input, test_name_file, test_type='', output_folder='', program='DAC%', extra_identifier='', lot = ['Not Null'], wafer_id = ['Not Null'], prefetch = '1', databases = ['D1D_PROD_XEUS','F24_PROD_XEUS'],config_number = '',mode=''):
+def uber_request(indexed_input, test_name_file, test_type='', output_folder='', program='DAC%', extra_identifier='', lot = ['Not Null'], wafer_id = ['Not Null'], prefetch = '1', databases = ['D1D_PROD_XEUS','F24_PROD_XEUS'],config_number = '',mode='',query_profile=''):
     """
     Main CTV data extraction and processing function for PyUber database queries.
     
@@ -244,6 +312,7 @@ def uber_request(indexed_input, test_name_file, test_type='', output_folder='',
         databases (list, optional): Database names to query (default: ['D1D_PROD_XEUS','F24_PROD_XEUS'])
         config_number (str, optional): Configuration number for file naming
         mode (str, optional): Processing mode ('CtvTag' for special handling)
+        query_profile (str, optional): Query tuning profile name (see query_tuning.py)
     
     Returns:
         tuple: (intermediary_file_path, final_output_file_path)
@@ -252,6 +321,7 @@ def uber_request(indexed_input, test_name_file, test_type='', output_folder='',
         - Comprehensive CTV data extraction from PyUber databases
         - Support for multiple test types (ClkUtils, standard MTPL)
         - Advanced token generation and modification for database queries
+        - Token variants filtered against a cached A_Test test name index
         - Data cleaning and column combination operations
         - Statistical processing with PASS/FAIL result consolidation
         - Intelligent file naming with ItuffToken extraction
@@ -292,6 +362,120 @@ def uber_request(indexed_input, test_name_file, test_type='', output_folder='',
     test_name = test_name_file
     #print(output_folder)
     indexed_input = fi.process_file_input(indexed_input)
+    intermediary_file, data_out_file = request_files(decoder_df, indexed_input, test_name_file, output_folder,
+                                                     extra_identifier, config_number, mode)
+    if '::' in test_name_file:
+        test_name_file = test_name_file.split('::')[1]
+    token_names_list = request_tokens(decoder_df, test_type)
+    max_bytes = 63000 #Estimated max number of bytes for a smaller SQL query system
+
+    lot_condition, wafer_condition = material_conditions(lot, wafer_id)
+    # Determine the condition for program
+    program_condition = build_program_condition([program])
+    if not prefetch or prefetch=='nan':
+        prefetch = 3
+    if not databases:
+        databases = ['D1D_PROD_XEUS','F24_PROD_XEUS']
+    
+    # Drop token variants that do not exist in A_Test for this program before chunking
+    token_names_list = ti.filter_tokens(token_names_list, databases, program, query_profile, prefetch=prefetch)
+    token_chunks = list(split_by_byte_size(token_names_list, max_bytes))
+
+    execute_pyuber_query(token_chunks, lot_condition, wafer_condition, program_condition, prefetch, databases, intermediary_file,test_name+'%',query_profile)
+    return process_pulled_data(intermediary_file, data_out_file, decoder_df, test_type, test_name_file)
+
+
+def uber_request_programs(indexed_input, test_name_file, test_type='', output_folders=None, extra_identifier='', lot = ['Not Null'], wafer_id = ['Not Null'], prefetch = '1', databases = ['D1D_PROD_XEUS','F24_PROD_XEUS'],config_number = '',mode='',query_profile=''):
+    """
+    uber_request for several programs with a single database query.
+
+    The token list is built once and queried once with the program conditions
+    OR'ed together. The pulled rows are then split by their program_name
+    into each program's datapulled file and post-processed exactly as
+    uber_request does, so each program gets the same output files it would
+    get from its own uber_request call.
+
+    Like execute_pyuber_query, the combined query stops at the first database
+    that returns data. That database may only have held data for the other
+    programs, so a program left without rows after the split is queried again on
+    its own, against the databases after it. When no database returned any data,
+    nothing is queried again.
+
+    Args:
+        indexed_input (str): Path to the indexed CTV decoder CSV file
+        test_name_file (str): Test name identifier for query filtering
+        test_type (str, optional): Type of test processing ('ClkUtils' or standard)
+        output_folders (dict): Program name/pattern -> output folder (with trailing separator)
+        extra_identifier, lot, wafer_id, prefetch, databases, config_number, mode, query_profile:
+            As for uber_request
+
+    Returns:
+        dict: program -> (intermediary_file_path, final_output_file_path)
+
+    Example:
+        >>> outputs = uber_request_programs('decoder.csv', 'CLK_PLL_BASE::TEST_MODULE', 'ClkUtils',
+        ...                                 {'DAB%': 'C:/out/DAB%_output/', 'DAC%': 'C:/out/DAC%_output/'})
+        >>> intermediary, output = outputs['DAC%']
+    """
+    programs = list(output_folders)
+    decoder_df = pd.read_csv(indexed_input)
+    test_name = test_name_file
+    indexed_input = fi.process_file_input(indexed_input)
+    files = {program: request_files(decoder_df, indexed_input, test_name_file, output_folders[program],
+                                    extra_identifier, config_number, mode)
+             for program in programs}
+    if '::' in test_name_file:
+        test_name_file = test_name_file.split('::')[1]
+    token_names_list = request_tokens(decoder_df, test_type)
+    max_bytes = 63000 #Estimated max number of bytes for a smaller SQL query system
+
+    lot_condition, wafer_condition = material_conditions(lot, wafer_id)
+    if not prefetch or prefetch=='nan':
+        prefetch = 3
+    if not databases:
+        databases = ['D1D_PROD_XEUS','F24_PROD_XEUS']
+
+    # Keep the token variants that exist in A_Test for any of the programs
+    kept_tokens = set()
+    for program in programs:
+        kept_tokens.update(ti.filter_tokens(token_names_list, databases, program, query_profile, prefetch=prefetch))
+    token_names_list = [token for token in token_names_list if token in kept_tokens]
+    token_chunks = list(split_by_byte_size(token_names_list, max_bytes))
+
+    pulled_file = files[programs[0]][0].replace('_datapulled.csv', '_allprograms_datapulled.csv')
+    pulled_file = fi.check_write_permission(pulled_file)
+    # One database at a time, to know which databases the programs without rows were not searched in
+    remaining_databases = []
+    for position, database in enumerate(databases):
+        if execute_pyuber_query(token_chunks, lot_condition, wafer_condition, build_program_condition(programs), prefetch, [database], pulled_file,test_name+'%',query_profile):
+            remaining_databases = databases[position + 1:]
+            break
+    row_counts = split_pulled_data(pulled_file, {program: files[program][0] for program in programs})
+    os.remove(pulled_file)
+
+    outputs = {}
+    for program in programs:
+        intermediary_file, data_out_file = files[program]
+        if row_counts[program] == 0 and remaining_databases:
+            print(f"No rows for {program} in the combined query - querying it on its own in {', '.join(remaining_databases)}")
+            program_tokens = ti.filter_tokens(token_names_list, remaining_databases, program, query_profile,
+                                              prefetch=prefetch)
+            execute_pyuber_query(list(split_by_byte_size(program_tokens, max_bytes)), lot_condition, wafer_condition,
+                                 build_program_condition([program]), prefetch, remaining_databases, intermediary_file,test_name+'%',query_profile)
+        outputs[program] = process_pulled_data(intermediary_file, data_out_file, decoder_df, test_type, test_name_file)
+    return outputs
+
+
+def request_files(decoder_df, indexed_input, test_name_file, output_folder='', extra_identifier='', config_number='', mode=''):
+    """
+    Datapulled (intermediary) and dataoutput file paths of an uber_request.
+
+    Named after the test and its first ItuffToken; the output folder defaults to
+    the folder of the indexed input. The intermediary file is created empty.
+
+    Returns:
+        tuple: (intermediary_file, data_out_file)
+    """
     if output_folder == '':
         output_folder = os.path.dirname(indexed_input)
         if output_folder != '':
@@ -323,9 +507,17 @@ def uber_request(indexed_input, test_name_file, test_type='', output_folder='',
     else:
         data_out_file = f'{output_folder}{test_name_file}{ituff_suffix}_dataoutput.csv'
         data_out_file = data_out_file.replace('decoded','')
-    # load decoder csv to get token names
-    #decoder_name = input("Enter name of decoder file:")#input argument or just feed the output file #make index CTV return a file path#remove percent signs
-    
+    return intermediary_file, data_out_file
+
+
+def request_tokens(decoder_df, test_type=''):
+    """
+    Test name tokens to query for an indexed CTV: every decoder Name (and its upper
+    case form) plus the numeric (ClkUtils) or PASS/FAIL suffix variants.
+
+    Returns:
+        list: Token names
+    """
     token_names = decoder_df['Name'].tolist()
     #print(token_names)
     token_set = set(token_names)
@@ -334,8 +526,6 @@ def uber_request(indexed_input, test_name_file, test_type='', output_folder='',
     token_names.extend(token_names_upper)
     token_names = list(set(token_names))
 
-    max_bytes = 63000 #Estimated max number of bytes for a smaller SQL query system
-    
     #print(token_names)
     if test_type == 'ClkUtils':
         token_1 = modify_tokens(token_names, "1")
@@ -470,11 +660,12 @@ def uber_request(indexed_input, test_name_file, test_type='', output_folder='',
         token_20 = token_names_FAIL_20 + token_names_PASS_20 + token_names_pass_20 + token_names_fail_20
         token_names_list = token_names_FAIL + token_names_PASS + token_names_pass + token_names_fail + token_names_missing + token_1 + token_2 + token_3 + token_4 + token_5 + token_6 + token_7 + token_8 + token_9 + token_10 + token_11 + token_12 + token_13 + token_14 + token_15 + token_16 + token_17 + token_18 + token_19 + token_20
         #token_names_string = "',\n'".join(token_names)
-    token_chunks = list(split_by_byte_size(token_names_list, max_bytes))
     #print(token_names_string) #Useful for testing if indexed_SmartCTV was correct
+    return token_names_list
 
-    #settle for 1-9 and regular
 
+def material_conditions(lot, wafer_id):
+    """SQL conditions for the lot and wafer_id lists ('Not Null' or empty: any value)."""
     # Determine the condition for lot
     if lot == ['Not Null'] or not lot or lot == ['']:
         lot_condition = "v0.lot IS NOT NULL"
@@ -487,19 +678,76 @@ def uber_request(indexed_input, test_name_file, test_type='', output_folder='',
         wafer_condition = "v0.wafer_id IS NOT NULL"
     else:
         wafer_condition = "v0.wafer_id IN ({})".format(','.join("'{}'".format(w) for w in wafer_id))
-    # Determine the condition for program
-    if '%' in program:
-        program_condition = f"v0.program_name LIKE '{program}'"
-    else:
-        program_condition = f"v0.program_name = '{program}'"
-    if not prefetch or prefetch=='nan':
-        prefetch = 3
-    if not databases:
-        databases = ['D1D_PROD_XEUS','F24_PROD_XEUS']
-    
-    
+    return lot_condition, wafer_condition
+
+
+def build_program_condition(programs):
+    """SQL condition matching any of the program names / LIKE patterns."""
+    conditions = []
+    for program in programs:
+        if '%' in program:
+            conditions.append(f"v0.program_name LIKE '{program}'")
+        else:
+            conditions.append(f"v0.program_name = '{program}'")
+    if len(conditions) == 1:
+        return conditions[0]
+    return '(' + ' OR '.join(conditions) + ')'
+
+
+def program_matches(program_name, program):
+    """True if program_name matches a program name or SQL LIKE pattern ('%' and '_' wildcards)."""
+    if '%' not in program:
+        return program_name == program
+    pattern = ''.join('.*' if char == '%' else '.' if char == '_' else re.escape(char) for char in program)
+    return re.fullmatch(pattern, program_name) is not None
+
+
+def split_pulled_data(pulled_file, program_files):
+    """
+    Split the rows of a multi-program datapulled file by their PROGRAM_NAME.
 
-    execute_pyuber_query(token_chunks, lot_condition, wafer_condition, program_condition, prefetch, databases, intermediary_file,test_name+'%')
+    A row goes to every program whose name or LIKE pattern it matches. Files without
+    a PROGRAM_NAME column (the header-only file written when no data was found) are
+    copied to every program unchanged.
+
+    Args:
+        pulled_file (str): Raw execute_pyuber_query output for all programs
+        program_files (dict): Program name/pattern -> datapulled file to write
+
+    Returns:
+        dict: program -> number of data rows written
+    """
+    row_counts = {program: 0 for program in program_files}
+    with open(pulled_file, 'r', newline='') as infile:
+        reader = csv.reader(infile)
+        header = next(reader, [])
+        upper_header = [column.upper() for column in header]
+        program_index = upper_header.index('PROGRAM_NAME') if 'PROGRAM_NAME' in upper_header else None
+        outfiles = {program: open(path, 'w', newline='') for program, path in program_files.items()}
+        try:
+            writers = {program: csv.writer(outfile) for program, outfile in outfiles.items()}
+            for writer in writers.values():
+                writer.writerow(header)
+            for row in reader:
+                for program, writer in writers.items():
+                    if program_index is None or program_matches(row[program_index], program):
+                        writer.writerow(row)
+                        row_counts[program] += 1
+        finally:
+            for outfile in outfiles.values():
+                outfile.close()
+    return row_counts
+
+
+def process_pulled_data(intermediary_file, data_out_file, decoder_df, test_type, test_name_file):
+    """
+    Turn the pulled rows of one test into its dataoutput file: pivot, combine the
+    numeric-suffix and PASS/FAIL columns, drop TDO columns, sort and map the columns
+    to the decoder combined_string names.
+
+    Returns:
+        tuple: (intermediary_file, data_out_file)
+    """
     df_pivot = pivot_data(intermediary_file)
     # Read CSV
     df = pd.read_csv(intermediary_file)###this is the the datainput file
@@ -991,7 +1239,7 @@ def sorting_key(name):
     # Return the name minus the last integer part and the integer itself
     return (parts[0], last_int)
 
-def get_testtimes(module_name, lot, wafer_id, programs, prefetch, databases, place_in=''):
+def get_testtimes(module_name, lot, wafer_id, programs, prefetch, databases, place_in='', query_profile=''):
     """
     Retrieve test time data for a specific module from PyUber databases.
     
@@ -1008,6 +1256,7 @@ def get_testtimes(module_name, lot, wafer_id, programs, prefetch, databases, pla
         prefetch (str): Number of days to look back for test data (default: '3')
         databases (list): List of database names to query (e.g., ['D1D_PROD_XEUS'])
         place_in (str, optional): Output directory path for generated CSV files
+        query_profile (str, optional): Query tuning profile name (see query_tuning.py)
     
     Returns:
         None: Generates CSV files with processed test time data
@@ -1075,7 +1324,7 @@ def get_testtimes(module_name, lot, wafer_id, programs, prefetch, databases, pla
             program_condition = f"v0.program_name = '{program}'"
         
         testtime_output = f'{place_in}testtime_{program}_{module_name}.csv'
-        execute_pyuber_query(token_chunks, lot_condition, wafer_condition, program_condition, prefetch, databases, testtime_output,module_name)
+        execute_pyuber_query(token_chunks, lot_condition, wafer_condition, program_condition, prefetch, databases, testtime_output,module_name,query_profile)
         df1 = pivot_data(testtime_output)
 
         for col in df1.columns:
@@ -0,0 +1,125 @@
+"""
+PyUber Query Trace
+
+This module records structured timing for every query chunk sent through
+execute_pyuber_query. Each chunk becomes one JSON line in a per-run trace file
+(query_trace_<run_id>.jsonl), and a summary table is printed when the run ends,
+showing whether the time went to the Uber server, the data transfer or the
+Python-side row conversion and CSV writing.
+
+Recorded fields per chunk:
+- datasource, chunk_index, token_count, sql_bytes
+- server_seconds: ExecuteJob call (query execution on the Uber server)
+- activate_seconds: column metadata retrieval
+- fetch_seconds: waiting for result chunks from the backend (transfer)
+- convert_seconds: Python row conversion (fetchall time minus fetch_seconds)
+- write_seconds: writing the rows to the intermediary CSV
+- rows, bytes (CSV bytes written), server_chunks (result chunks received)
+- status: 'ok', 'empty' or 'error'
+
+Example:
+    >>> trace = start_run('C:/output/')
+    >>> ...  # uber_request / get_testtimes calls record into the active trace
+    >>> print(end_run())
+"""
+
+import json
+import os
+import threading
+import time
+import file_functions as fi
+
+TIMING_FIELDS = ['server_seconds', 'activate_seconds', 'fetch_seconds', 'convert_seconds', 'write_seconds']
+
+_active_trace = None
+_active_lock = threading.Lock()
+
+
+class QueryTrace:
+    """JSON-lines trace of the query chunks executed during one run."""
+
+    def __init__(self, folder='', run_id=None):
+        self.run_id = run_id or time.strftime('%Y%m%d_%H%M%S')
+        folder = folder or fi.get_app_data_dir('traces')
+        self.path = os.path.join(folder, f'query_trace_{self.run_id}.jsonl')
+        self.records = []
+        self._lock = threading.Lock()
+        self.start_time = time.time()
+
+    def record(self, **fields):
+        """Append one chunk record to the trace file and keep it for the summary."""
+        fields = dict(run_id=self.run_id, timestamp=time.strftime('%Y-%m-%dT%H:%M:%S'), **fields)
+        for key in TIMING_FIELDS:
+            if key in fields:
+                fields[key] = round(fields[key], 4)
+        with self._lock:
+            self.records.append(fields)
+            try:
+                with open(self.path, 'a') as trace_file:
+                    trace_file.write(json.dumps(fields) + '\n')
+            except OSError as e:
+                print(f"Could not write query trace to {self.path}: {e}")
+        return fields
+
+    def totals(self):
+        """Aggregate the records per datasource (plus an 'ALL' row)."""
+        totals = {}
+        for record in self.records:
+            for group in (record.get('datasource', ''), 'ALL'):
+                entry = totals.setdefault(group, dict({key: 0.0 for key in TIMING_FIELDS},
+                                                      queries=0, empty=0, errors=0, rows=0, bytes=0))
+                entry['queries'] += 1
+                entry['empty'] += record.get('status') == 'empty'
+                entry['errors'] += record.get('status') == 'error'
+                entry['rows'] += record.get('rows', 0)
+                entry['bytes'] += record.get('bytes', 0)
+                for key in TIMING_FIELDS:
+                    entry[key] += record.get(key, 0.0)
+        return totals
+
+    def summary(self):
+        """Return a text table of the per-datasource totals."""
+        totals = self.totals()
+        if not totals:
+            return f"Query trace {self.run_id}: no queries recorded"
+
+        header = f"{'Datasource':<18}{'Queries':>8}{'Empty':>7}{'Errors':>7}{'Rows':>10}{'MB':>9}" \
+                 f"{'Server s':>10}{'Fetch s':>9}{'Convert s':>11}{'Write s':>9}"
+        lines = [f"Query trace {self.run_id} ({self.path})", header, '-' * len(header)]
+        for datasource, entry in sorted(totals.items(), key=lambda item: item[0] == 'ALL'):
+            lines.append(f"{datasource:<18}{entry['queries']:>8}{entry['empty']:>7}{entry['errors']:>7}"
+                         f"{entry['rows']:>10}{entry['bytes'] / 1048576:>9.2f}"
+                         f"{entry['server_seconds'] + entry['activate_seconds']:>10.2f}{entry['fetch_seconds']:>9.2f}"
+                         f"{entry['convert_seconds']:>11.2f}{entry['write_seconds']:>9.2f}")
+
+        overall = totals['ALL']
+        server = overall['server_seconds'] + overall['activate_seconds']
+        python_side = overall['convert_seconds'] + overall['write_seconds']
+        measured = server + overall['fetch_seconds'] + python_side
+        if measured:
+            lines.append(f"Time split: server {100 * server / measured:.0f}%, "
+                         f"transfer {100 * overall['fetch_seconds'] / measured:.0f}%, "
+                         f"python {100 * python_side / measured:.0f}% "
+                         f"(wall clock {time.time() - self.start_time:.1f} seconds)")
+        return '\n'.join(lines)
+
+
+def start_run(folder='', run_id=None):
+    """Start a new trace and make it the one execute_pyuber_query records into."""
+    global _active_trace
+    with _active_lock:
+        _active_trace = QueryTrace(folder, run_id)
+        return _active_trace
+
+
+def active_trace():
+    """Return the trace of the current run, or None if no run was started."""
+    return _active_trace
+
+
+def end_run():
+    """Stop the current trace and return its summary table (empty if none was active)."""
+    global _active_trace
+    with _active_lock:
+        trace, _active_trace = _active_trace, None
+    return trace.summary() if trace else ''
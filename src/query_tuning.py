@@ -0,0 +1,217 @@
+"""
+PyUber Query Tuning Profiles
+
+This module manages the Uber connection settings that control server-side query
+splitting and result transfer (MaxNumOfChildThreads,
+MinThresholdPeriodInSecondsForQueryBreakUp, EnableCompression, ChunkSizeInBytes).
+Named profiles live in the "query_tuning" section of config.json and are passed
+through uber_request/get_testtimes to PyUber.connect.
+
+Key Features:
+- Named tuning profiles stored in config.json
+- Per-run profile selection (GUI or function argument)
+- "auto" profile that uses the fastest settings measured per datasource
+- Auto-tuner that probes a few chunk-size/compression combinations
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+import file_functions as fi
+
+# Connection string parameters a profile is allowed to set (see PyUber.connect)
+CONNECTION_SETTINGS = (
+    'MaxNumOfChildThreads',
+    'MinThresholdPeriodInSecondsForQueryBreakUp',
+    'EnableCompression',
+    'ChunkSizeInBytes',
+    'IgnoreOrderBy',
+    'TimeOutInSeconds',
+)
+
+AUTO_PROFILE = 'auto'
+DEFAULT_PROFILE = 'default'
+TUNING_CACHE_FILE = 'query_tuning_cache.json'
+
+# Concurrent queries per datasource across threads (see set_datasource_limit); None = unlimited
+_datasource_limit = None
+_datasource_slots = {}
+_datasource_lock = threading.Lock()
+
+DEFAULT_PROBE_QUERY = """
+SELECT v0.lot, v0.wafer_id, v0.program_name, v0.test_end_date_time
+FROM A_Testing_Session v0
+WHERE v0.valid_flag = 'Y'
+AND v0.test_end_date_time >= TRUNC(SYSDATE) - 1
+AND ROWNUM <= 50000
+"""
+
+# Settings tried by auto_tune when config.json does not list any candidates
+DEFAULT_PROBE_CANDIDATES = [
+    {},
+    {'EnableCompression': True, 'ChunkSizeInBytes': 1048576},
+    {'EnableCompression': True, 'ChunkSizeInBytes': 4194304},
+    {'EnableCompression': False, 'ChunkSizeInBytes': 4194304},
+    {'EnableCompression': True, 'ChunkSizeInBytes': 4194304, 'MaxNumOfChildThreads': 8},
+]
+
+
+def load_query_tuning(config_path=None):
+    """
+    Read the "query_tuning" section of config.json.
+
+    Args:
+        config_path (str, optional): Explicit config.json path (searched for if omitted)
+
+    Returns:
+        dict: Section with at least 'active_profile' and 'profiles' keys
+    """
+    section = fi.load_config_section('query_tuning', config_path=config_path)
+    section.setdefault('active_profile', DEFAULT_PROFILE)
+    section.setdefault('profiles', {DEFAULT_PROFILE: {}})
+    return section
+
+
+def list_profiles(config_path=None):
+    """Return the profile names available for selection, including 'auto'."""
+    profiles = list(load_query_tuning(config_path)['profiles'])
+    if AUTO_PROFILE not in profiles:
+        profiles.append(AUTO_PROFILE)
+    return profiles
+
+
+def clean_settings(settings):
+    """Drop keys PyUber.connect should not receive from a profile."""
+    cleaned = {}
+    for key, value in (settings or {}).items():
+        if key in CONNECTION_SETTINGS:
+            cleaned[key] = value
+        else:
+            print(f"Ignoring unknown query tuning setting: {key}")
+    return cleaned
+
+
+def load_tuned_settings():
+    """Load the fastest settings remembered per datasource by auto_tune()."""
+    cache_path = os.path.join(fi.get_app_data_dir(), TUNING_CACHE_FILE)
+    if not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, 'r') as cache_file:
+            return json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_tuned_settings(tuned):
+    cache_path = os.path.join(fi.get_app_data_dir(), TUNING_CACHE_FILE)
+    with open(cache_path, 'w') as cache_file:
+        json.dump(tuned, cache_file, indent=2)
+
+
+def get_connection_settings(profile='', datasource='', config_path=None):
+    """
+    Resolve a profile name into keyword arguments for PyUber.connect.
+
+    Args:
+        profile (str): Profile name; empty uses the config's active_profile,
+                       'auto' uses the auto-tuned settings for the datasource
+        datasource (str): Datasource the connection is for (used by 'auto')
+        config_path (str, optional): Explicit config.json path
+
+    Returns:
+        dict: Connection settings (empty dict means PyUber defaults)
+    """
+    section = load_query_tuning(config_path)
+    profile = profile or section['active_profile']
+
+    if profile == AUTO_PROFILE:
+        tuned = load_tuned_settings().get(datasource)
+        if tuned:
+            return clean_settings(tuned.get('settings'))
+        # Nothing measured yet for this datasource - fall back to the default profile
+        profile = DEFAULT_PROFILE
+
+    if profile not in section['profiles']:
+        print(f"Query tuning profile '{profile}' not found, using PyUber defaults")
+        return {}
+    return clean_settings(section['profiles'][profile])
+
+
+def set_datasource_limit(limit):
+    """Limit the queries running at the same time on each datasource (None or 0: unlimited)."""
+    global _datasource_limit
+    with _datasource_lock:
+        _datasource_limit = max(1, int(limit)) if limit else None
+        _datasource_slots.clear()
+
+
+def datasource_slot(datasource):
+    """Context manager holding one of the datasource's query slots while a query runs on it."""
+    with _datasource_lock:
+        if _datasource_limit is None:
+            return nullcontext()
+        if datasource not in _datasource_slots:
+            _datasource_slots[datasource] = threading.BoundedSemaphore(_datasource_limit)
+        return _datasource_slots[datasource]
+
+
+def auto_tune(datasource, probe_query=None, candidates=None, repeats=1, config_path=None):
+    """
+    Run a probe query with several connection settings and remember the fastest.
+
+    Each candidate is timed end to end (job execution plus fetching all rows), which
+    is what the CTV queries pay for. The winner is stored per datasource and picked
+    up afterwards by the 'auto' profile.
+
+    Args:
+        datasource (str): Datasource to tune, e.g. 'D1D_PROD_XEUS'
+        probe_query (str, optional): Query to time (config.json probe_query or a default)
+        candidates (list, optional): List of settings dicts to compare
+        repeats (int): Number of timed runs per candidate (best run counts)
+        config_path (str, optional): Explicit config.json path
+
+    Returns:
+        dict: {'settings': {...}, 'seconds': float, 'rows': int, 'tuned_at': str}
+              or None if every candidate failed
+    """
+    import PyUber
+
+    section = load_query_tuning(config_path)
+    probe_query = probe_query or section.get('probe_query') or DEFAULT_PROBE_QUERY
+    candidates = candidates or section.get('probe_candidates') or DEFAULT_PROBE_CANDIDATES
+
+    best = None
+    for candidate in candidates:
+        settings = clean_settings(candidate)
+        fastest = None
+        row_count = 0
+        for _ in range(max(1, repeats)):
+            try:
+                start_time = time.time()
+                conn = PyUber.connect(datasource=datasource, **settings)
+                cursor = conn.execute(probe_query)
+                row_count = len(cursor.fetchall())
+                duration = time.time() - start_time
+            except Exception as e:
+                print(f"Probe failed on {datasource} with {settings}: {e}")
+                break
+            fastest = duration if fastest is None else min(fastest, duration)
+        if fastest is None:
+            continue
+        print(f"Probe on {datasource} with {settings or 'defaults'}: {fastest:.2f} seconds ({row_count} rows)")
+        if best is None or fastest < best['seconds']:
+            best = {'settings': settings, 'seconds': round(fastest, 3), 'rows': row_count}
+
+    if best is None:
+        print(f"Auto-tuning failed for {datasource}: no probe query succeeded")
+        return None
+
+    best['tuned_at'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    tuned = load_tuned_settings()
+    tuned[datasource] = best
+    save_tuned_settings(tuned)
+    print(f"Fastest settings for {datasource}: {best['settings'] or 'defaults'} ({best['seconds']:.2f} seconds)")
+    return best
@@ -25,7 +25,6 @@ import re    # Regular expression operations for pattern matching
 import pandas as pd  # Data manipulation and analysis library
 
 import time     # Time-related functions (not currently used)
-import chardet  # Character encoding detection (not currently used)
 import file_functions as fi  # Custom file handling utilities
 
 # TODO: Add functionality for CustomParameter that is simpler than iterator logic
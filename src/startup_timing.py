@@ -0,0 +1,111 @@
+"""
+Startup Timing
+
+Measures where the time goes between launching Osmosis and the first window
+draw: named startup phases (importing the GUI, creating the Tk root, building
+the widgets, the first draw) and, while imports are tracked, the load time of
+every top-level package imported for the first time - the same self/cumulative
+breakdown as `python -X importtime`, but also available in the frozen
+PyInstaller build, where interpreter options cannot be passed. Run the script
+with -X importtime for the per-submodule detail.
+
+Enabled with `osmosis_main.py --startup-timing` or OSMOSIS_STARTUP_TIMING=1.
+
+Example:
+    >>> timer = StartupTimer()
+    >>> with timer.track_imports():
+    ...     import ctvlist_gui
+    >>> timer.mark('import ctvlist_gui')
+    >>> print(timer.report())
+"""
+
+import builtins
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_MIN_MS = 5.0
+
+
+class StartupTimer:
+    """
+    Phase and import timings of one application start.
+
+    Times are measured from the creation of the timer, so create it as early as
+    possible in the entry point.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self._last_mark = self.start
+        self.phases = []    # (name, seconds) in order
+        self.imports = []   # (package, self seconds, cumulative seconds, depth) in completion order
+        self._stack = []    # [package, start, children seconds] of the imports in progress
+        self._thread = None
+
+    def mark(self, name):
+        """Record a phase that started where the previous one ended (or at the start) and ends now."""
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last_mark))
+        self._last_mark = now
+
+    @contextmanager
+    def track_imports(self):
+        """Time the first import of every top-level package inside the block (main thread only)."""
+        original_import = builtins.__import__
+        self._thread = threading.get_ident()
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            package = name.partition('.')[0]
+            # Relative imports, other threads and packages already loaded (or loading) are not timed
+            if level or package in sys.modules or threading.get_ident() != self._thread:
+                return original_import(name, globals, locals, fromlist, level)
+
+            entry = [package, time.perf_counter(), 0.0]
+            self._stack.append(entry)
+            try:
+                return original_import(name, globals, locals, fromlist, level)
+            finally:
+                self._stack.pop()
+                cumulative = time.perf_counter() - entry[1]
+                if self._stack:
+                    self._stack[-1][2] += cumulative
+                self.imports.append((package, cumulative - entry[2], cumulative, len(self._stack)))
+
+        builtins.__import__ = timed_import
+        try:
+            yield
+        finally:
+            builtins.__import__ = original_import
+
+    def report(self, min_ms=DEFAULT_MIN_MS):
+        """
+        Format the timings as a text table.
+
+        Args:
+            min_ms (float, optional): Packages whose cumulative import time is
+                                      below this are left out of the import table
+
+        Returns:
+            str: Phase table followed by the import table
+        """
+        lines = ["Startup timing", f"{'phase':<32}{'ms':>10}"]
+        for name, seconds in self.phases:
+            lines.append(f"{name:<32}{seconds * 1000:>10.1f}")
+        lines.append(f"{'total':<32}{(time.perf_counter() - self.start) * 1000:>10.1f}")
+
+        if self.imports:
+            lines.append("")
+            lines.append(f"{'self [ms]':>10} | {'cumulative':>10} | imported package (first import)")
+            shown = 0
+            for package, self_seconds, cumulative, depth in self.imports:
+                if cumulative * 1000 < min_ms:
+                    continue
+                shown += 1
+                lines.append(f"{self_seconds * 1000:>10.1f} | {cumulative * 1000:>10.1f} | {'  ' * depth}{package}")
+            hidden = len(self.imports) - shown
+            if hidden:
+                lines.append(f"({hidden} packages under {min_ms:g} ms not shown)")
+        return '\n'.join(lines)
+
@@ -0,0 +1,170 @@
+"""
+Indexed Table Filtering
+
+Search and column filters for the MTPL and ClkUtils test lists. TableIndex holds
+a table once in a searchable form:
+
+- the lowercase text of every row, joined into one newline-separated string, so
+  a search is a single C-level str.find scan that jumps from matching row to the
+  next row instead of a Python comparison per row
+- every column factorized into integer codes, with a boolean row bitmap per
+  filtered value (built on first use and cached)
+
+DebouncedFilter runs the filter in a worker thread once the input has been idle
+for a short delay and hands only the resulting row ids back to the Tk thread;
+results of superseded requests are dropped.
+
+Example:
+    >>> index = TableIndex(mtpl_df)
+    >>> rows = index.filter('pll', {'Module': 'EIO_UCIE'})
+    >>> debounced = DebouncedFilter(root, view.show_rows)
+    >>> debounced.set_index(index)
+    >>> debounced.request(search_var.get(), {'Module': 'EIO_UCIE'})
+"""
+
+import bisect
+import threading
+import numpy as np
+import pandas as pd
+
+DEFAULT_DELAY_MS = 150
+
+
+class TableIndex:
+    """
+    Search text and column bitmaps of a table, for row filtering.
+
+    Args:
+        table (DataFrame): Rows to index; row ids are positions in the table and
+                           values are compared as their str() form
+    """
+
+    def __init__(self, table):
+        table = table.astype(str)
+        self.size = len(table)
+        self.columns = list(table.columns)
+        if self.size and self.columns:
+            # Column-wise concatenation (vectorized) rather than a join per row
+            texts = table[self.columns[0]]
+            for column in self.columns[1:]:
+                texts = texts + ' ' + table[column]
+            texts = texts.str.lower().str.replace('\n', ' ', regex=False).tolist()
+        else:
+            texts = [''] * self.size
+        self._text = '\n'.join(texts)
+        self._row_starts = []
+        start = 0
+        for text in texts:
+            self._row_starts.append(start)
+            start += len(text) + 1
+        self._codes = {}
+        for column in self.columns:
+            codes, values = pd.factorize(table[column])
+            self._codes[column] = (codes, {value: code for code, value in enumerate(values)})
+        self._bitmaps = {}
+
+    def bitmap(self, column, value):
+        """Boolean mask of the rows whose column equals value (as a string)."""
+        key = (column, value)
+        if key not in self._bitmaps:
+            codes, value_codes = self._codes[column]
+            code = value_codes.get(value)
+            self._bitmaps[key] = codes == code if code is not None else np.zeros(self.size, dtype=bool)
+        return self._bitmaps[key]
+
+    def text_rows(self, text):
+        """Row ids whose lowercase text contains text (which must be lowercase)."""
+        if not text:
+            return np.arange(self.size)
+        rows = []
+        find = self._text.find
+        position = find(text)
+        while position != -1:
+            row = bisect.bisect_right(self._row_starts, position) - 1
+            rows.append(row)
+            if row + 1 >= self.size:
+                break
+            # One hit is enough: continue the scan at the next row
+            position = find(text, self._row_starts[row + 1])
+        return np.array(rows, dtype=np.int64)
+
+    def filter(self, text='', columns=None):
+        """
+        Row ids matching a search text and column filters.
+
+        Args:
+            text (str): Search text, matched case-insensitively anywhere in the row
+            columns (dict, optional): Column name -> required value
+
+        Returns:
+            ndarray: Matching row ids, in table order
+        """
+        text = text.strip().lower().replace('\n', ' ')
+        mask = None
+        for column, value in (columns or {}).items():
+            bitmap = self.bitmap(column, value)
+            mask = bitmap if mask is None else mask & bitmap
+        if text:
+            rows = self.text_rows(text)
+            return rows[mask[rows]] if mask is not None else rows
+        return np.flatnonzero(mask) if mask is not None else np.arange(self.size)
+
+
+class DebouncedFilter:
+    """
+    Filters a TableIndex off the Tk thread once the input has been idle.
+
+    Args:
+        root: Tk widget used to schedule the delay and the result callback
+        on_rows (callable): Called on the Tk thread with the row id list of the
+                            latest request
+        delay_ms (int, optional): Idle time before a request runs
+    """
+
+    def __init__(self, root, on_rows, delay_ms=DEFAULT_DELAY_MS):
+        self.root = root
+        self.on_rows = on_rows
+        self.delay_ms = delay_ms
+        self.index = None
+        self._generation = 0
+        self._pending = None
+
+    def set_index(self, index):
+        """Filter a new table; pending and running requests for the old one are dropped."""
+        self.cancel()
+        self.index = index
+
+    def cancel(self):
+        """Drop the pending request and any result still being computed."""
+        self._generation += 1
+        if self._pending is not None:
+            self.root.after_cancel(self._pending)
+            self._pending = None
+
+    def request(self, text='', columns=None, delay_ms=None):
+        """Filter with text and columns (see TableIndex.filter) after the input delay."""
+        self.cancel()
+        generation = self._generation
+        delay_ms = self.delay_ms if delay_ms is None else delay_ms
+        self._pending = self.root.after(delay_ms, lambda: self._start(generation, text, dict(columns or {})))
+
+    def _start(self, generation, text, columns):
+        self._pending = None
+        index = self.index
+        if index is None:
+            return
+
+        def run():
+            try:
+                rows = index.filter(text, columns).tolist()
+            except Exception as e:
+                print(f"Filtering failed: {e}")
+                return
+            self.root.after(0, lambda: self._deliver(generation, rows))
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _deliver(self, generation, rows):
+        # A newer request or index replaced this one while it ran
+        if generation == self._generation:
+            self.on_rows(rows)
@@ -0,0 +1,197 @@
+"""
+Test Name Index for Token Filtering
+
+uber_request generates many PASS/FAIL/_N variants for every CTV token, most of
+which never exist in A_Test for the chosen program. This module keeps a local
+index of the test_names present in A_Test per (datasource, program pattern) so
+token lists can be filtered before they are chunked into IN (...) lists.
+
+The index is stored in the per-user app data folder and refreshed incrementally
+(at most every refresh_minutes, so one run with many tests pays for a single
+refresh): tests with a t_id above the highest one already indexed are fetched,
+plus every test of a devrevstep that became active since the last refresh (its
+older tests have lower t_ids). The whole index is rebuilt every full_refresh_days,
+and whenever a query asks for a longer prefetch window than the index covers.
+
+Settings come from the "token_index" section of config.json.
+
+Example:
+    >>> tokens = filter_tokens(token_names_list, ['D1D_PROD_XEUS'], 'DAC%')
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import file_functions as fi
+import query_tuning as qt
+
+DEFAULT_SETTINGS = {
+    'enabled': True,
+    'refresh_minutes': 30,
+    'full_refresh_days': 7,
+    'lookback_days': 30,
+}
+
+# Oracle rejects IN lists of more than 1000 entries
+MAX_IN_LIST = 1000
+
+# One refresh at a time per (datasource, program): concurrent queries wait for it and reuse the result
+_index_locks = {}
+_index_locks_lock = threading.Lock()
+
+
+def load_settings(config_path=None):
+    """Return the token_index settings from config.json merged over the defaults."""
+    return fi.load_config_section('token_index', DEFAULT_SETTINGS, config_path)
+
+
+def _index_path(datasource, program):
+    safe_program = re.sub(r'[^A-Za-z0-9_]', '_', program.replace('%', 'ANY'))
+    return os.path.join(fi.get_app_data_dir('token_index'), f'{datasource}_{safe_program}.json')
+
+
+def _load_index(datasource, program):
+    try:
+        with open(_index_path(datasource, program), 'r') as index_file:
+            return json.load(index_file)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_index(index):
+    # Written to a temporary file and swapped in, so a reader never sees a partly written index
+    index_path = _index_path(index['datasource'], index['program'])
+    temp_path = f"{index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, 'w') as index_file:
+        json.dump(index, index_file)
+    os.replace(temp_path, index_path)
+
+
+def _index_lock(datasource, program):
+    with _index_locks_lock:
+        return _index_locks.setdefault((datasource, program), threading.Lock())
+
+
+def _index_query(program, last_t_id, devrevsteps, lookback_days):
+    if '%' in program:
+        program_condition = f"LIKE '{program}'"
+    else:
+        program_condition = f"= '{program}'"
+    # New tests of indexed devrevsteps, and all tests of devrevsteps not indexed yet
+    if devrevsteps:
+        quoted = ["'" + str(devrevstep).replace("'", "''") + "'" for devrevstep in devrevsteps]
+        not_indexed = ' AND '.join(f"t0.devrevstep NOT IN ({', '.join(quoted[i:i + MAX_IN_LIST])})"
+                                   for i in range(0, len(quoted), MAX_IN_LIST))
+        new_tests_condition = f"(t0.t_id > {int(last_t_id)} OR ({not_indexed}))"
+    else:
+        new_tests_condition = "1=1"
+    # Tests without a program_name join to every session of their devrevstep (see execute_pyuber_query)
+    return f"""
+    SELECT t0.t_id AS t_id, t0.test_name AS test_name, t0.devrevstep AS devrevstep
+    FROM A_Test t0
+    WHERE {new_tests_condition}
+    AND (t0.program_name {program_condition} OR t0.program_name IS NULL)
+    AND t0.devrevstep IN (
+        SELECT DISTINCT v0.devrevstep
+        FROM A_Testing_Session v0
+        WHERE v0.program_name {program_condition}
+        AND v0.test_end_date_time >= TRUNC(SYSDATE) - {int(lookback_days)}
+    )
+    """
+
+
+def get_test_names(datasource, program, query_profile='', settings=None, prefetch=0):
+    """
+    Return the set of test_names in A_Test for a datasource and program pattern.
+
+    Args:
+        datasource (str): Datasource to index, e.g. 'D1D_PROD_XEUS'
+        program (str): Program name or LIKE pattern, e.g. 'DAC%'
+        query_profile (str, optional): Query tuning profile for the connection
+        settings (dict, optional): Overrides for the config.json settings
+        prefetch (int, optional): Days of data the query will look back; the index
+                                  covers at least this many days of sessions
+
+    Returns:
+        set: Indexed test names (None if the index could not be built)
+    """
+    import PyUber
+
+    settings = settings or load_settings()
+    lookback_days = max(int(settings['lookback_days']), int(prefetch or 0))
+    # A thread waiting here finds the index just refreshed by the thread holding the lock
+    with _index_lock(datasource, program):
+        index = _load_index(datasource, program)
+        now = time.time()
+        # An index built for a shorter window misses the devrevsteps only tested before it
+        if (index is None or now - index.get('full_refresh_at', 0) > settings['full_refresh_days'] * 86400
+                or index.get('lookback_days', 0) < lookback_days):
+            index = {'datasource': datasource, 'program': program, 'last_t_id': 0, 'devrevsteps': [],
+                     'lookback_days': lookback_days, 'full_refresh_at': now, 'test_names': []}
+        elif now - index.get('refreshed_at', 0) < settings['refresh_minutes'] * 60:
+            return set(index['test_names'])
+
+        try:
+            start_time = time.time()
+            with qt.datasource_slot(datasource):
+                conn = PyUber.connect(datasource=datasource, **qt.get_connection_settings(query_profile, datasource))
+                cursor = conn.execute(_index_query(program, index['last_t_id'], index.get('devrevsteps', []),
+                                                   index['lookback_days']))
+                rows = cursor.fetchall()
+        except Exception as e:
+            print(f"Could not refresh test name index for {datasource} / {program}: {e}")
+            return set(index['test_names']) if index['last_t_id'] else None
+
+        test_names = set(index['test_names'])
+        devrevsteps = set(index.get('devrevsteps', []))
+        for t_id, test_name, devrevstep in rows:
+            test_names.add(test_name)
+            devrevsteps.add(devrevstep)
+            index['last_t_id'] = max(index['last_t_id'], int(t_id))
+        index['test_names'] = sorted(test_names)
+        index['devrevsteps'] = sorted(devrevsteps)
+        index['refreshed_at'] = now
+        _save_index(index)
+        print(f"Test name index for {datasource} / {program}: {len(rows)} new tests, "
+              f"{len(test_names)} total ({time.time() - start_time:.2f} seconds)")
+        return test_names
+
+
+def filter_tokens(tokens, databases, program, query_profile='', settings=None, prefetch=0):
+    """
+    Keep only the tokens that exist as test_names in A_Test for any of the databases.
+
+    Tokens are returned unfiltered when the index is disabled, cannot be built for
+    one of the databases, or matches none of the tokens (a stale index should never
+    cost data).
+
+    Args:
+        tokens (list): Candidate token names (all generated variants)
+        databases (list): Datasources the query will run against
+        program (str): Program name or LIKE pattern
+        query_profile (str, optional): Query tuning profile for the connection
+        settings (dict, optional): Overrides for the config.json settings
+        prefetch (int, optional): Days of data the query will look back
+
+    Returns:
+        list: Filtered tokens, in their original order
+    """
+    settings = settings or load_settings()
+    if not settings['enabled'] or not tokens:
+        return tokens
+
+    known_names = set()
+    for database in databases:
+        test_names = get_test_names(database, program, query_profile, settings, prefetch)
+        if test_names is None:
+            return tokens
+        known_names |= test_names
+
+    filtered = [token for token in tokens if token in known_names]
+    if not filtered:
+        print("No tokens found in the test name index - querying all token variants")
+        return tokens
+    print(f"Token index kept {len(filtered)} of {len(tokens)} token variants")
+    return filtered
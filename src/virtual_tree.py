@@ -0,0 +1,150 @@
+"""
+Virtualized Treeview
+
+A ttk.Treeview gets slow with thousands of rows: every insert creates a Tk item,
+and filtering used to delete and re-insert the whole table. VirtualTreeview keeps
+the rows in Python and only materializes the window of rows that fits in the
+widget; scrolling and filtering rewrite the values of those few Tk items in place.
+
+Rows are the item dicts of the MTPL and ClkUtils tabs: {'values': [...], 'tags':
+('checked',) or ('unchecked',)} and, for trees showing the #0 column, 'tree_text'.
+Filtering is done by table_filter, which hands the matching row ids to show_rows.
+
+Example:
+    >>> view = VirtualTreeview(tree, v_scrollbar)
+    >>> view.set_items(all_items)
+    >>> view.show_rows(table_index.filter('pll').tolist())
+    >>> item_data = view.item_for(tree.identify('item', x, y))
+"""
+
+from tkinter import ttk
+
+DEFAULT_ROW_HEIGHT = 20
+
+
+class VirtualTreeview:
+    """
+    Windowed view of a list of item dicts in a ttk.Treeview.
+
+    The view owns the vertical scrolling of the tree: the scrollbar, mouse wheel
+    and arrow/page keys move the window over the shown rows.
+
+    Args:
+        tree (ttk.Treeview): Tree with its columns configured
+        scrollbar (ttk.Scrollbar, optional): Vertical scrollbar of the tree
+    """
+
+    def __init__(self, tree, scrollbar=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.items = []
+        self.rows = []          # Positions in items of the shown rows, in display order
+        self.offset = 0         # First shown row in the window
+        self.slots = []         # Treeview item ids, reused for every window
+        self.window_rows = []   # Rows currently in the slots
+        self._positions = {}    # id(item dict) -> position in items
+
+        if scrollbar is not None:
+            scrollbar.configure(command=self.yview)
+        tree.bind('<MouseWheel>', lambda event: self.scroll(int(-1 * (event.delta / 120))))
+        tree.bind('<Button-4>', lambda event: self.scroll(-1))
+        tree.bind('<Button-5>', lambda event: self.scroll(1))
+        tree.bind('<Up>', lambda event: self._on_arrow(-1))
+        tree.bind('<Down>', lambda event: self._on_arrow(1))
+        tree.bind('<Prior>', lambda event: self.scroll(-self.page_size()) or 'break')
+        tree.bind('<Next>', lambda event: self.scroll(self.page_size()) or 'break')
+        tree.bind('<Configure>', lambda event: self.render(), add='+')
+
+    def set_items(self, items):
+        """Replace the rows (all shown); row ids are positions in items."""
+        self.items = items
+        self._positions = {id(item): position for position, item in enumerate(items)}
+        self.show_rows(range(len(items)))
+
+    def clear(self):
+        self.set_items([])
+
+    def show_rows(self, rows):
+        """Show the given rows (positions in items) from the top."""
+        self.rows = list(rows)
+        self.offset = 0
+        self.render()
+
+    def show_items(self, items):
+        """Show the given item dicts (which must be among the set items) from the top."""
+        if items is self.items:
+            self.show_rows(range(len(items)))
+        else:
+            self.show_rows(self._positions[id(item)] for item in items if id(item) in self._positions)
+
+    def visible_items(self):
+        """Item dicts of every shown row, including those scrolled out of the window."""
+        return [self.items[row] for row in self.rows]
+
+    def item_for(self, tree_item):
+        """Item dict displayed in a Treeview item (None for an unknown item id)."""
+        if tree_item not in self.slots:
+            return None
+        return self.items[self.window_rows[self.slots.index(tree_item)]]
+
+    def page_size(self):
+        """Number of rows that fit in the tree (its height option until it is mapped)."""
+        height = self.tree.winfo_height()
+        if height <= 1:
+            return max(1, int(self.tree.cget('height')))
+        row_height = ttk.Style().lookup('Treeview', 'rowheight')
+        row_height = int(row_height) if str(row_height).isdigit() else DEFAULT_ROW_HEIGHT
+        # One row of height goes to the headings
+        return max(1, height // row_height - 1)
+
+    def scroll(self, amount):
+        self.offset += amount
+        self.render()
+
+    def yview(self, *args):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', number, 'units'/'pages')."""
+        if args[0] == 'moveto':
+            self.offset = int(float(args[1]) * len(self.rows))
+        elif args[0] == 'scroll':
+            self.offset += int(args[1]) * (self.page_size() if args[2] == 'pages' else 1)
+        self.render()
+
+    def refresh(self):
+        """Redraw the window, e.g. after the checked state of items changed."""
+        self.render()
+
+    def render(self):
+        page = self.page_size()
+        self.offset = max(0, min(self.offset, len(self.rows) - page))
+        self.window_rows = self.rows[self.offset:self.offset + page]
+
+        # Grow or shrink the pool of Treeview items to the window
+        while len(self.slots) < len(self.window_rows):
+            self.slots.append(self.tree.insert('', 'end'))
+        while len(self.slots) > len(self.window_rows):
+            self.tree.delete(self.slots.pop())
+
+        for position, (slot, row) in enumerate(zip(self.slots, self.window_rows), self.offset):
+            item = self.items[row]
+            row_tag = 'evenrow' if position % 2 == 0 else 'oddrow'
+            state_tag = 'checked' if 'checked' in item['tags'] else 'unchecked'
+            self.tree.item(slot, values=item['values'], tags=(state_tag, row_tag))
+            if 'tree_text' in item:
+                self.tree.item(slot, text=item['tree_text'])
+
+        if self.scrollbar is not None:
+            if self.rows:
+                self.scrollbar.set(self.offset / len(self.rows), (self.offset + len(self.window_rows)) / len(self.rows))
+            else:
+                self.scrollbar.set(0, 1)
+
+    def _on_arrow(self, step):
+        # Inside the window the Treeview moves the focus itself; at its edges the window scrolls
+        focus = self.tree.focus()
+        if focus not in self.slots:
+            return None
+        position = self.slots.index(focus) + step
+        if 0 <= position < len(self.slots):
+            return None
+        self.scroll(step)
+        return 'break'